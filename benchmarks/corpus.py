@@ -0,0 +1,77 @@
+import random
+from typing import Dict, Any, List
+
+# Vocabulary the synthetic knowledge base is drawn from
+TOPICS = [
+    "campaign objectives", "ad set budgets", "audience targeting", "lookalike audiences",
+    "creative best practices", "bid strategies", "placements", "conversion tracking",
+    "special ad categories", "learning phase", "frequency capping", "video ads"
+]
+WORDS = (
+    "meta ads campaign audience budget bid creative placement conversion pixel reach "
+    "impressions clicks objective optimization delivery learning phase ad set targeting "
+    "interests behaviors lookalike custom retargeting frequency cost cpm cpc roas video "
+    "image carousel headline primary text call to action landing page link website sales "
+    "leads traffic awareness engagement app installs daily lifetime schedule advantage"
+).split()
+PRODUCTS = [
+    ("Trail Running Shoes", "Lightweight shoes with a grippy sole for off-road runners"),
+    ("Organic Skincare Set", "Cruelty-free cleanser, toner and moisturizer for sensitive skin"),
+    ("Smart Security Camera", "1080p indoor camera with motion alerts and night vision"),
+    ("Project Management App", "Kanban boards and time tracking for small agencies"),
+    ("Home Fitness Bike", "Quiet magnetic resistance bike with live classes")
+]
+OBJECTIVES = ["OUTCOME_SALES", "OUTCOME_TRAFFIC", "OUTCOME_AWARENESS", "OUTCOME_LEAD_GENERATION"]
+
+def make_documents(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic markdown knowledge-base documents.
+    
+    The same count and seed always produce the same documents, so results
+    from different runs measure the code rather than the corpus.
+    
+    Args:
+        count: Number of documents
+        seed: Random seed
+        
+    Returns:
+        List[Dict[str, Any]]: Documents with 'path' and 'text'
+    """
+    rng = random.Random(f"documents:{seed}:{count}")
+    documents = []
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        sections = [f"# {topic.title()} {i}"]
+        for _ in range(rng.randint(3, 8)):
+            sentences = [
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                for _ in range(rng.randint(2, 6))
+            ]
+            sections.append(" ".join(sentences))
+        documents.append({"path": f"knowledge_base/{topic.replace(' ', '_')}_{i}.md", "text": "\n\n".join(sections)})
+    return documents
+
+def make_briefs(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic campaign briefs in the shape the CLI collects.
+    
+    Args:
+        count: Number of briefs
+        seed: Random seed
+        
+    Returns:
+        List[Dict[str, Any]]: Campaign briefs
+    """
+    rng = random.Random(f"briefs:{seed}:{count}")
+    briefs = []
+    for i in range(count):
+        name, description = rng.choice(PRODUCTS)
+        briefs.append({
+            "product_name": f"{name} {i}",
+            "product_description": description,
+            "objective": rng.choice(OBJECTIVES),
+            "target_audience": f"Adults interested in {rng.choice(TOPICS)}",
+            "daily_budget": rng.choice([10, 20, 50, 100]),
+            "age_min": rng.choice([18, 25]),
+            "age_max": rng.choice([45, 65]),
+            "website": "https://example.com"
+        })
+    return briefs
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+"""
+Benchmark ingest, retrieval, generation and validation against local stand-ins
+"""
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Iterator
+
+import numpy as np
+import typer
+from rich.console import Console
+from rich.table import Table
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from benchmarks.corpus import make_documents, make_briefs
+from src.config.config import config
+from src.core.ingestion import chunk_text
+from src.database.local_index import LocalVectorIndex
+from src.database.vector_store import VectorStore
+from src.fakes.latency import LatencyModel
+from src.fakes.openai_server import FakeOpenAIServer, canned_campaign_spec, hash_embedding
+from src.utils.validators import CampaignValidator
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+BENCHMARK_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "latest.json"
+
+# Metric name suffixes and whether a larger value is an improvement
+HIGHER_IS_BETTER = ("_per_sec",)
+LOWER_IS_BETTER = ("_ms",)
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean of latencies given in seconds, in milliseconds."""
+    millis = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(millis, 50)), 3),
+        "p95_ms": round(float(np.percentile(millis, 95)), 3),
+        "p99_ms": round(float(np.percentile(millis, 99)), 3),
+        "mean_ms": round(float(millis.mean()), 3)
+    }
+
+def ops_per_second(operation: Callable[[], Any], min_seconds: float = 0.5) -> float:
+    """Call `operation` repeatedly for at least `min_seconds` and return its rate."""
+    operation()  # warm up
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        operation()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+@contextmanager
+def overridden(section: Any, **values: Any) -> Iterator[None]:
+    """Temporarily set attributes of a config section."""
+    previous = {name: getattr(section, name) for name in values}
+    for name, value in values.items():
+        setattr(section, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(section, name, value)
+
+@contextmanager
+def local_stand_ins(workdir: str, openai_latency_ms: float, seed: int) -> Iterator[FakeOpenAIServer]:
+    """Point OpenAI at the fake server and the vector store at a local index.
+    
+    Caches are disabled so every run measures the full pipeline.
+    """
+    import openai
+    
+    base_url = openai.base_url
+    server = FakeOpenAIServer(latency=LatencyModel("lognormal", openai_latency_ms), seed=seed)
+    with server, \
+            overridden(config.openai, base_url=server.url + "/", api_key="benchmark", rate_limit_enabled=False), \
+            overridden(config.vector_store, backend="local", local_path=os.path.join(workdir, "vector_index")), \
+            overridden(config.cache, directory=os.path.join(workdir, "cache"),
+                       embedding_cache_enabled=False, response_cache_enabled=False):
+        try:
+            yield server
+        finally:
+            openai.base_url = base_url
+
+def build_vector_store(path: str, documents: List[Dict[str, Any]], seed: int) -> VectorStore:
+    """Local vector store holding one vector per chunk of `documents`."""
+    store = VectorStore(backend=LocalVectorIndex(path, config.vector_store.dimension))
+    vectors = []
+    for document in documents:
+        for i, chunk in enumerate(chunk_text(document["text"])):
+            vectors.append({
+                "id": f"{document['path']}#{i}",
+                "values": hash_embedding(chunk, config.vector_store.dimension, seed).tolist(),
+                "metadata": {"text": chunk, "source": document["path"]}
+            })
+    store.upsert(vectors)
+    return store
+
+def bench_chunk_text(documents: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Throughput of `chunk_text` over the corpus."""
+    total_bytes = sum(len(document["text"].encode("utf-8")) for document in documents)
+    rate = ops_per_second(lambda: [chunk_text(document["text"]) for document in documents])
+    return {
+        "docs_per_sec": round(rate * len(documents), 1),
+        "mb_per_sec": round(rate * total_bytes / 1e6, 3)
+    }
+
+def bench_embeddings(documents: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Throughput of `OpenAIService.get_embeddings` against the fake server."""
+    from src.models.openai_service import OpenAIService
+    
+    service = OpenAIService()
+    texts = [chunk for document in documents for chunk in chunk_text(document["text"])]
+    service.get_embeddings(texts[:1])  # warm up the client and tokenizer
+    start = time.perf_counter()
+    embeddings = service.get_embeddings(texts)
+    elapsed = time.perf_counter() - start
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Embedded {len(embeddings)} of {len(texts)} texts")
+    return {"texts_per_sec": round(len(texts) / elapsed, 1), "texts": len(texts)}
+
+def bench_query(store: VectorStore, queries: int, seed: int, top_k: int) -> Dict[str, float]:
+    """Latency percentiles of `VectorStore.query`."""
+    briefs = make_briefs(queries, seed)
+    vectors = [
+        hash_embedding(f"{brief['product_description']} {brief['target_audience']}", config.vector_store.dimension, seed).tolist()
+        for brief in briefs
+    ]
+    store.query(vectors[0], top_k=top_k)  # load the index
+    samples = []
+    for vector in vectors:
+        start = time.perf_counter()
+        store.query(vector, top_k=top_k)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+def bench_generate(store: VectorStore, runs: int, seed: int) -> Dict[str, float]:
+    """End-to-end latency of `RAGService.generate_campaign`."""
+    from src.core.rag_service import RAGService
+    
+    rag = RAGService()
+    rag.vector_store = store
+    briefs = make_briefs(runs + 1, seed)
+    rag.generate_campaign(briefs.pop(), use_cache=False)  # warm up
+    samples = []
+    for brief in briefs:
+        start = time.perf_counter()
+        result = rag.generate_campaign(brief, use_cache=False)
+        samples.append(time.perf_counter() - start)
+        if result.get("status") == "failed":
+            raise RuntimeError(f"Campaign generation failed: {result.get('error')}")
+    return percentiles(samples)
+
+def bench_validator(seed: int) -> Dict[str, float]:
+    """Throughput of `CampaignValidator.validate_campaign_specification`."""
+    specs = [canned_campaign_spec({key: str(value) for key, value in brief.items()}) for brief in make_briefs(100, seed)]
+    rate = ops_per_second(lambda: [CampaignValidator.validate_campaign_specification(spec) for spec in specs])
+    return {"specs_per_sec": round(rate * len(specs), 1)}
+
+def bench_bulk_validator(seed: int, count: int = 5000) -> Dict[str, float]:
+    """Throughput of `BulkValidator.validate` over a batch of specs."""
+    from src.utils.bulk_validator import BulkValidator
+    
+    briefs = make_briefs(100, seed)
+    specs = [
+        canned_campaign_spec({key: str(value) for key, value in briefs[index % len(briefs)].items()})
+        for index in range(count)
+    ]
+    # Month-long flights over a few dozen start dates and accounts, so schedules are parsed and swept
+    for index, spec in enumerate(specs):
+        day = 1 + index % 28
+        spec["account_id"] = str(index % 50)
+        spec["ad_set"]["schedule"] = {
+            "start_time": f"2030-02-{day:02d}T00:00:00-0700",
+            "end_time": f"2030-03-{day:02d}T23:59:59-0700"
+        }
+    validator = BulkValidator()
+    rate = ops_per_second(lambda: validator.validate(specs))
+    return {"specs_per_sec": round(rate * len(specs), 1)}
+
+def bench_cli_cold_start(runs: int) -> Dict[str, float]:
+    """Wall time of `python src/main.py --help` in a fresh interpreter."""
+    command = [sys.executable, str(project_root / "src" / "main.py"), "--help"]
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=project_root, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    millis = sorted(sample * 1000.0 for sample in samples)
+    return {"min_ms": round(millis[0], 1), "p50_ms": round(statistics.median(millis), 1)}
+
+def run_benchmarks(
+    sizes: List[int],
+    seed: int = 0,
+    queries: int = 200,
+    generate_runs: int = 20,
+    cli_runs: int = 5,
+    openai_latency_ms: float = 0.0,
+    top_k: int = 10
+) -> Dict[str, Any]:
+    """Run every benchmark for each corpus size.
+    
+    Args:
+        sizes: Corpus sizes, in documents
+        seed: Seed for corpora, briefs and fake embeddings
+        queries: Vector store queries per size
+        generate_runs: Campaign generations per size
+        cli_runs: CLI cold starts to time (0 to skip)
+        openai_latency_ms: Median latency the fake OpenAI server adds
+        top_k: Results per query
+        
+    Returns:
+        Dict[str, Any]: Run metadata and results keyed by benchmark and size
+    """
+    results: Dict[str, Dict[str, Any]] = {
+        "chunk_text": {}, "embeddings": {}, "vector_query": {}, "generate_campaign": {}
+    }
+    with tempfile.TemporaryDirectory() as workdir, local_stand_ins(workdir, openai_latency_ms, seed) as server:
+        for size in sizes:
+            documents = make_documents(size, seed)
+            label = str(size)
+            console.print(f"[cyan]Corpus of {size} documents[/cyan]")
+            
+            results["chunk_text"][label] = bench_chunk_text(documents)
+            results["embeddings"][label] = bench_embeddings(documents)
+            store = build_vector_store(os.path.join(workdir, f"index_{size}"), documents, seed)
+            results["vector_query"][label] = bench_query(store, queries, seed, top_k)
+            results["generate_campaign"][label] = bench_generate(store, generate_runs, seed)
+        
+        fake_stats = vars(server.stats).copy()
+    
+    results["validator"] = {"all": bench_validator(seed)}
+    results["bulk_validator"] = {"all": bench_bulk_validator(seed)}
+    if cli_runs:
+        results["cli_cold_start"] = {"all": bench_cli_cold_start(cli_runs)}
+    
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "sizes": sizes,
+            "openai_latency_ms": openai_latency_ms,
+            "fake_openai": fake_stats
+        },
+        "results": results
+    }
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten nested results into `benchmark.size.metric` keys."""
+    flat = {}
+    for benchmark, by_size in results.items():
+        for size, metrics in by_size.items():
+            for metric, value in metrics.items():
+                flat[f"{benchmark}.{size}.{metric}"] = value
+    return flat
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Find metrics that got worse than the baseline by more than `tolerance`.
+    
+    Only metrics present in both runs with a known direction (a `_per_sec`
+    or `_ms` suffix) are compared.
+    
+    Args:
+        current: Results of `run_benchmarks`
+        baseline: Stored results to compare against
+        tolerance: Allowed relative slowdown, e.g. 0.2 for 20%
+        
+    Returns:
+        List[Dict[str, Any]]: One entry per regressed metric
+    """
+    current_metrics = flatten(current["results"])
+    baseline_metrics = flatten(baseline["results"])
+    regressions = []
+    for name, value in current_metrics.items():
+        previous = baseline_metrics.get(name)
+        if not previous:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (previous - value) / previous
+        elif name.endswith(LOWER_IS_BETTER):
+            change = (value - previous) / previous
+        else:
+            continue
+        if change > tolerance:
+            regressions.append({"metric": name, "baseline": previous, "current": value, "slowdown": round(change, 3)})
+    return regressions
+
+def print_results(report: Dict[str, Any], regressions: List[Dict[str, Any]]) -> None:
+    regressed = {regression["metric"] for regression in regressions}
+    table = Table(title="Benchmark Results")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    for name, value in flatten(report["results"]).items():
+        style = "red" if name in regressed else ""
+        table.add_row(name, str(value), style=style)
+    console.print(table)
+
+def main(
+    sizes: str = typer.Option("100,1000", "--sizes", help="Comma-separated corpus sizes, in documents"),
+    seed: int = typer.Option(0, "--seed", help="Seed for corpora and fake embeddings"),
+    queries: int = typer.Option(200, "--queries", help="Vector store queries per size"),
+    generate_runs: int = typer.Option(20, "--generate-runs", help="Campaign generations per size"),
+    cli_runs: int = typer.Option(5, "--cli-runs", help="CLI cold starts to time (0 to skip)"),
+    openai_latency_ms: float = typer.Option(0.0, "--openai-latency-ms", help="Median latency of the fake OpenAI API"),
+    output: Path = typer.Option(DEFAULT_OUTPUT, "--output", "-o", help="Where to write the JSON results"),
+    baseline: Path = typer.Option(DEFAULT_BASELINE, "--baseline", "-b", help="Results to compare against"),
+    tolerance: float = typer.Option(0.2, "--tolerance", help="Allowed relative slowdown before flagging a regression"),
+    update_baseline: bool = typer.Option(False, "--update-baseline", help="Store these results as the new baseline")
+):
+    """Run the benchmarks, write JSON results and flag regressions against the baseline."""
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # The pipeline logs every request at INFO; keep the output readable
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    report = run_benchmarks(
+        [int(size) for size in sizes.split(",") if size.strip()],
+        seed=seed,
+        queries=queries,
+        generate_runs=generate_runs,
+        cli_runs=cli_runs,
+        openai_latency_ms=openai_latency_ms
+    )
+    
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    console.print(f"Results written to {output}")
+    
+    regressions = []
+    if update_baseline:
+        baseline.write_text(json.dumps(report, indent=2))
+        console.print(f"Baseline updated at {baseline}")
+    elif baseline.exists():
+        regressions = compare(report, json.loads(baseline.read_text()), tolerance)
+    else:
+        console.print(f"[yellow]No baseline at {baseline}; run with --update-baseline to store one[/yellow]")
+    
+    print_results(report, regressions)
+    if regressions:
+        for regression in regressions:
+            console.print(
+                f"[red]Regression:[/red] {regression['metric']} {regression['baseline']} -> "
+                f"{regression['current']} ({regression['slowdown']:.0%} worse)"
+            )
+        raise typer.Exit(code=1)
+    console.print("[green]No regressions[/green]")
+
+if __name__ == "__main__":
+    typer.run(main)
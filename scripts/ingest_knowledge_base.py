@@ -1,11 +1,9 @@
 #!/usr/bin/env python
 
-import os
 import sys
 import logging
 import argparse
 from pathlib import Path
-import re
 import time
 
 # Add the project root to sys.path
@@ -13,7 +11,7 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from src.core.rag_service import RAGService
-from src.models.openai_service import OpenAIService
+from src.core.ingestion import ChunkManifest, IngestPlan, IngestionPipeline, iter_files
 
 # Set up logging
 logging.basicConfig(
@@ -22,132 +20,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def chunk_text(text, max_chunk_size=1000, overlap=200):
-    """Split text into chunks with overlap.
-    
-    Args:
-        text: The text to split
-        max_chunk_size: Maximum size of each chunk
-        overlap: Overlap between chunks
-        
-    Returns:
-        List of text chunks
-    """
-    # Split into paragraphs first
-    paragraphs = re.split(r'\n\s*\n', text)
-    
-    chunks = []
-    current_chunk = ""
-    
-    for paragraph in paragraphs:
-        # If adding this paragraph would exceed max size, add current chunk to list
-        if len(current_chunk) + len(paragraph) > max_chunk_size and current_chunk:
-            chunks.append(current_chunk)
-            # Keep overlap from previous chunk
-            current_chunk = current_chunk[-overlap:] if len(current_chunk) > overlap else current_chunk
-        
-        # Add paragraph to current chunk
-        if current_chunk and not current_chunk.endswith("\n"):
-            current_chunk += "\n\n"
-        current_chunk += paragraph
-    
-    # Add the last chunk if it's not empty
-    if current_chunk:
-        chunks.append(current_chunk)
-    
-    return chunks
-
-def ingest_file(rag_service, file_path):
-    """Ingest a file into the vector database.
+def ingest_documents(rag_service, documents):
+    """Ingest pre-chunked documents one source file at a time.
     
     Args:
         rag_service: RAG service instance
-        file_path: Path to the file to ingest
+        documents: Documents with 'id', 'text' and 'metadata'
         
     Returns:
-        int: Number of chunks ingested
+        set: IDs of chunks that failed to ingest
     """
-    try:
-        # Read the file
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        # Get the file name for metadata
-        file_name = Path(file_path).name
-        
-        # Extract title from Markdown content (assuming first # heading is title)
-        title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-        title = title_match.group(1) if title_match else file_name
-        
-        # Chunk the content
-        chunks = chunk_text(content)
-        
-        # Create metadata for the document
-        base_metadata = {
-            "source": file_name,
-            "title": title,
-            "file_path": str(file_path),
-            "chunk_index": 0,
-            "total_chunks": len(chunks)
-        }
-        
-        # Ingest each chunk
-        for i, chunk in enumerate(chunks):
-            metadata = {**base_metadata, "chunk_index": i}
-            success = rag_service.add_document(chunk, metadata)
-            
-            if not success:
-                logger.error(f"Failed to ingest chunk {i} of {file_path}")
-        
-        logger.info(f"Ingested {len(chunks)} chunks from {file_path}")
-        return len(chunks)
+    by_file = {}
+    for doc in documents:
+        by_file.setdefault(doc["metadata"]["file_path"], []).append(doc)
     
-    except Exception as e:
-        logger.error(f"Error ingesting file {file_path}: {str(e)}")
-        return 0
-
-def ingest_directory(rag_service, directory_path, file_extensions=None):
-    """Recursively ingest all files in a directory.
-    
-    Args:
-        rag_service: RAG service instance
-        directory_path: Path to the directory to ingest
-        file_extensions: List of file extensions to ingest, or None for all
-        
-    Returns:
-        tuple: (num_files_ingested, num_chunks_ingested)
-    """
-    try:
-        directory = Path(directory_path)
-        
-        if not directory.exists() or not directory.is_dir():
-            logger.error(f"{directory_path} does not exist or is not a directory")
-            return 0, 0
-        
-        num_files_ingested = 0
-        num_chunks_ingested = 0
-        
-        # Walk through the directory
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = Path(root) / file
-                
-                # Skip if file extension doesn't match
-                if file_extensions and not any(file.endswith(ext) for ext in file_extensions):
-                    continue
-                
-                # Ingest the file
-                chunks_ingested = ingest_file(rag_service, file_path)
-                
-                if chunks_ingested > 0:
-                    num_files_ingested += 1
-                    num_chunks_ingested += chunks_ingested
-        
-        return num_files_ingested, num_chunks_ingested
-    
-    except Exception as e:
-        logger.error(f"Error ingesting directory {directory_path}: {str(e)}")
-        return 0, 0
+    failed_ids = set()
+    for file_path, file_documents in by_file.items():
+        if rag_service.add_documents(file_documents):
+            logger.info(f"Ingested {len(file_documents)} chunks from {file_path}")
+        else:
+            logger.error(f"Failed to ingest chunks of {file_path}")
+            failed_ids.update(doc["id"] for doc in file_documents)
+    return failed_ids
 
 def main():
     """Main entry point for the script."""
@@ -158,6 +52,14 @@ def main():
                         help="Comma-separated list of file extensions to ingest")
     parser.add_argument("--reset", "-r", action="store_true",
                         help="Reset the vector database before ingesting")
+    parser.add_argument("--full", "-f", action="store_true",
+                        help="Re-embed every chunk instead of only new and changed ones")
+    parser.add_argument("--pipeline", "-p", action="store_true",
+                        help="Ingest with concurrent read/embed/upsert stages")
+    parser.add_argument("--workers", "-w", type=int, default=4,
+                        help="Number of concurrent embedding workers in pipeline mode")
+    parser.add_argument("--batch-size", "-b", type=int, default=64,
+                        help="Chunks per embedding/upsert batch in pipeline mode")
     
     args = parser.parse_args()
     
@@ -165,24 +67,67 @@ def main():
         # Initialize services
         rag_service = RAGService()
         
+        manifest = ChunkManifest(ChunkManifest.default_path())
+        
         # Reset vector database if requested
         if args.reset:
             logger.info("Resetting vector database...")
             rag_service.vector_store.delete_all()
+            manifest.clear()
+            manifest.save()
             time.sleep(1)  # Allow time for deletion to complete
         
+        if not Path(args.dir).is_dir():
+            logger.error(f"{args.dir} does not exist or is not a directory")
+            sys.exit(1)
+        
         # Parse file extensions
         extensions = args.extensions.split(",") if args.extensions else None
+        file_paths = list(iter_files(args.dir, extensions))
         
-        # Ingest directory
+        # Embed and upsert the new chunks of files changed since the last run
         start_time = time.time()
-        num_files, num_chunks = ingest_directory(rag_service, args.dir, extensions)
+        failed_ids = set()
+        if args.pipeline:
+            # The reader stage diffs each file against the manifest as it goes
+            plan = IngestPlan()
+            pipeline = IngestionPipeline(rag_service, embed_workers=args.workers, batch_size=args.batch_size)
+            summary = pipeline.run(file_paths, load=lambda file_path: manifest.plan_file(plan, file_path, args.full))
+            manifest.plan_removed(plan, file_paths)
+            failed_ids = pipeline.failed_ids
+            for stage, stats in summary["stages"].items():
+                logger.info(
+                    f"Stage {stage}: {stats['items']} items in {stats['batches']} batches, "
+                    f"{stats['items_per_second']} items/s, {stats['failed']} failed"
+                )
+            num_files = summary["files"]
+            num_chunks = summary["chunks"]
+        else:
+            plan = manifest.plan(file_paths, force=args.full)
+            logger.info(f"{len(plan.documents)} chunks to embed")
+            if plan.documents:
+                failed_ids = ingest_documents(rag_service, plan.documents)
+            num_files = len({doc["metadata"]["file_path"] for doc in plan.documents})
+            num_chunks = len(plan.documents) - len(failed_ids)
+        logger.info(f"{plan.unchanged_files} files unchanged, {len(plan.stale_ids)} stale chunks to delete")
+        
+        # Delete vectors of removed and edited chunks. Edited chunks get new
+        # IDs, so their old vectors can go after the new ones are in.
+        if plan.stale_ids and not rag_service.vector_store.delete(plan.stale_ids):
+            logger.error("Failed to delete stale chunks; manifest not updated")
+            sys.exit(1)
+        
+        # Only record files whose chunks all made it into the index
+        manifest.apply(plan, failed_ids)
+        manifest.save()
         end_time = time.time()
         
         # Print summary
         logger.info(f"Ingestion complete in {end_time - start_time:.2f} seconds")
-        logger.info(f"Ingested {num_files} files with {num_chunks} total chunks")
-        
+        logger.info(f"Embedded {num_chunks} chunks from {num_files} changed files")
+        if failed_ids:
+            logger.warning(f"{len(failed_ids)} chunks failed and will be retried on the next run")
+    
     except Exception as e:
         logger.exception("Error during ingestion")
         sys.exit(1)
@@ -0,0 +1,301 @@
+import json
+import logging
+import random
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
+from urllib.parse import quote
+
+from facebook_business.exceptions import FacebookRequestError
+
+from src.api.meta_ads_api import MetaAdsAPI, is_not_ready_error
+from src.config.config import config
+
+logger = logging.getLogger(__name__)
+
+# Graph API limit on calls in one batch request
+MAX_BATCH_CALLS = 50
+
+# Throttling errors, retried in the next round like not-ready errors
+RATE_LIMIT_ERROR_CODES = frozenset({4, 17, 32, 613, 80004})
+
+# Objects in a campaign tree: (stage, account edge, stages it references), in
+# an order where every stage comes after the stages it depends on
+STAGES = (
+    ("campaign", "campaigns", ()),
+    ("ad_set", "adsets", ("campaign",)),
+    ("ad_creative", "adcreatives", ()),
+    ("ad", "ads", ("ad_set", "ad_creative")),
+)
+
+class Reference(str):
+    """JSONPath reference to the ID created by another call in the same batch."""
+    
+    @classmethod
+    def to(cls, call_name: str) -> "Reference":
+        return cls(f"{{result={call_name}:$.id}}")
+
+def _encode_json(value: Any) -> str:
+    """JSON-encode and URL-quote a value, leaving references in it unquoted."""
+    if isinstance(value, Reference):
+        return quote('"') + value + quote('"')
+    if isinstance(value, Mapping):
+        items = (quote(json.dumps(str(key))) + quote(":") + _encode_json(value[key]) for key in sorted(value))
+        return quote("{") + quote(",").join(items) + quote("}")
+    if isinstance(value, (list, tuple)):
+        return quote("[") + quote(",").join(_encode_json(item) for item in value) + quote("]")
+    return quote(json.dumps(value))
+
+def encode_body(params: Dict[str, Any]) -> str:
+    """Form-encode a batch call's params the way the SDK does.
+    
+    Graph only resolves references it can read in the body, so `Reference`
+    values, at the top level or inside JSON params, are written as they are
+    while everything around them is quoted.
+    """
+    fields = []
+    for key, value in params.items():
+        if isinstance(value, Reference):
+            encoded = str(value)
+        elif isinstance(value, str):
+            encoded = quote(value)
+        elif isinstance(value, (Mapping, list, tuple, bool)):
+            encoded = _encode_json(value)
+        else:
+            encoded = quote(str(value))
+        fields.append(f"{key}={encoded}")
+    return "&".join(fields)
+
+def is_retryable_error(error: FacebookRequestError) -> bool:
+    """Whether a failed sub-request should be sent again in the next round."""
+    return is_not_ready_error(error) or error.api_error_code() in RATE_LIMIT_ERROR_CODES
+
+def error_details(error: FacebookRequestError) -> Dict[str, Any]:
+    """Error response in the same shape `MetaAdsAPI` returns."""
+    return {
+        "success": False,
+        "error_code": error.api_error_code(),
+        "error_message": error.api_error_message(),
+        "error_type": error.api_error_type(),
+        "error_subcode": error.api_error_subcode()
+    }
+
+@dataclass
+class CampaignPush:
+    """Progress of one campaign tree through the batch executor."""
+    index: int
+    spec: Dict[str, Any]
+    ids: Dict[str, str] = field(default_factory=dict)
+    failed_stage: Optional[str] = None
+    error: Optional[Dict[str, Any]] = None
+    
+    def pending_stages(self) -> List[str]:
+        """Stages still to be created, or none once the tree has failed."""
+        if self.error is not None:
+            return []
+        return [stage for stage, _, _ in STAGES if stage not in self.ids]
+    
+    def fail(self, stage: str, error: Dict[str, Any]) -> None:
+        self.failed_stage = stage
+        self.error = error
+    
+    def call_name(self, stage: str) -> str:
+        return f"{stage}_{self.index}"
+    
+    def result(self) -> Dict[str, Any]:
+        """Result in the same shape as `MetaAdsAPI.create_full_campaign`."""
+        # `create_full_campaign` reports the creative as "creative_id"
+        ids = {
+            ("creative_id" if stage == "ad_creative" else f"{stage}_id"): self.ids[stage]
+            for stage, _, _ in STAGES if stage in self.ids
+        }
+        if self.error is not None:
+            return {"success": False, "stage": self.failed_stage, **ids, "error": self.error}
+        return {"success": True, **ids}
+
+class BatchExecutor:
+    """Create many campaign trees through the Graph API batch endpoint.
+    
+    Each round sends the pending objects of as many campaigns as fit in one
+    batch request. Objects created in the same request refer to each other
+    with JSONPath references such as `{result=campaign_0:$.id}`; objects
+    created in an earlier round are referred to by ID. Sub-requests that
+    fail with a not-ready or throttling error (and ones Meta did
+    not run because a dependency failed that way) are sent again in the
+    next round after a jittered backoff; other failures fail their campaign.
+    """
+    
+    def __init__(
+        self,
+        meta_ads_api: MetaAdsAPI,
+        max_attempts: Optional[int] = None,
+        batch_size: int = MAX_BATCH_CALLS,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.meta = meta_ads_api
+        self.api = meta_ads_api.api
+        self.account_id = meta_ads_api.ad_account.get_id_assured()
+        self.max_attempts = max_attempts or config.meta_ads.ready_max_attempts
+        self.batch_size = max(len(STAGES), min(batch_size, MAX_BATCH_CALLS))
+        self.sleep = sleep
+        
+        self.requests = 0
+        self.retried_calls = 0
+    
+    def create_full_campaigns(self, campaign_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create a campaign, ad set, creative and ad for every spec.
+        
+        Args:
+            campaign_specs: Complete campaign specification dictionaries
+            
+        Returns:
+            List[Dict[str, Any]]: One result per spec, in input order, shaped
+                like the result of `MetaAdsAPI.create_full_campaign`
+        """
+        pushes = []
+        for index, spec in enumerate(campaign_specs):
+            push = CampaignPush(index, spec)
+            try:
+                # Build params up front so malformed specs fail before anything is sent
+                for stage, _, _ in STAGES:
+                    self._params(push, stage)
+            except (KeyError, TypeError) as e:
+                push.fail("campaign", {"success": False, "error_message": f"Invalid campaign spec: {str(e)}"})
+            pushes.append(push)
+        
+        for attempt in range(self.max_attempts):
+            pending = [push for push in pushes if push.pending_stages()]
+            if not pending:
+                break
+            if attempt:
+                self.retried_calls += sum(len(push.pending_stages()) for push in pending)
+                self.sleep(self._backoff(attempt))
+            final = attempt == self.max_attempts - 1
+            for group in self._groups(pending):
+                self._execute(group, final)
+        
+        for push in pushes:
+            stages = push.pending_stages()
+            if stages:
+                push.fail(stages[0], {
+                    "success": False,
+                    "error_message": f"Not created after {self.max_attempts} attempts"
+                })
+        
+        succeeded = sum(1 for push in pushes if push.error is None)
+        logger.info(
+            f"Created {succeeded} of {len(pushes)} campaigns in {self.requests} batch requests "
+            f"({self.retried_calls} calls retried)"
+        )
+        return [push.result() for push in pushes]
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before a retry round."""
+        ceiling = min(
+            config.meta_ads.ready_backoff_max_seconds,
+            config.meta_ads.ready_backoff_seconds * 2 ** attempt
+        )
+        return random.uniform(0, ceiling)
+    
+    def _groups(self, pushes: List[CampaignPush]) -> List[List[CampaignPush]]:
+        """Pack campaigns into batches without splitting a campaign across batches.
+        
+        References only resolve within a single batch request, so all of a
+        campaign's pending calls must go out together.
+        """
+        groups: List[List[CampaignPush]] = []
+        current: List[CampaignPush] = []
+        size = 0
+        for push in pushes:
+            calls = len(push.pending_stages())
+            if current and size + calls > self.batch_size:
+                groups.append(current)
+                current, size = [], 0
+            current.append(push)
+            size += calls
+        if current:
+            groups.append(current)
+        return groups
+    
+    def _params(self, push: CampaignPush, stage: str) -> Dict[str, Any]:
+        """Params for one stage, with dependencies as IDs or in-batch references."""
+        def reference(dependency: str) -> str:
+            if dependency in push.ids:
+                return push.ids[dependency]
+            return Reference.to(push.call_name(dependency))
+        
+        if stage == "campaign":
+            return self.meta.campaign_params(push.spec)
+        if stage == "ad_set":
+            return self.meta.ad_set_params(reference("campaign"), push.spec)
+        if stage == "ad_creative":
+            return self.meta.ad_creative_params(push.spec)
+        return self.meta.ad_params(reference("ad_set"), reference("ad_creative"), push.spec)
+    
+    def _execute(self, group: List[CampaignPush], final: bool) -> None:
+        """Send one batch request and record each sub-request's outcome."""
+        batch = self.api.new_batch()
+        # Calls that failed in this request; their dependents are not run
+        failed: Set[Tuple[int, str]] = set()
+        
+        for push in group:
+            pending = push.pending_stages()
+            for stage, edge, dependencies in STAGES:
+                if stage not in pending:
+                    continue
+                call = batch.add(
+                    'POST',
+                    (self.account_id, edge),
+                    success=self._on_success(push, stage),
+                    failure=self._on_failure(push, stage, dependencies, failed, final)
+                )
+                # The SDK would quote the references along with the params
+                call['body'] = encode_body(self._params(push, stage))
+                call['name'] = push.call_name(stage)
+                # Named calls that others reference are omitted from the
+                # response by default, but their IDs are needed
+                call['omit_response_on_success'] = False
+        
+        self.requests += 1
+        try:
+            # Calls Meta did not run come back as a new batch; they stay
+            # pending and are sent again next round
+            batch.execute()
+        except FacebookRequestError as e:
+            logger.error(f"Batch request failed: {e.api_error_code()}: {e.api_error_message()}")
+            if is_retryable_error(e) and not final:
+                return
+            for push in group:
+                stages = push.pending_stages()
+                if stages:
+                    push.fail(stages[0], error_details(e))
+    
+    def _on_success(self, push: CampaignPush, stage: str) -> Callable:
+        def record(response) -> None:
+            push.ids[stage] = response.json()["id"]
+        return record
+    
+    def _on_failure(
+        self,
+        push: CampaignPush,
+        stage: str,
+        dependencies: Tuple[str, ...],
+        failed: Set[Tuple[int, str]],
+        final: bool
+    ) -> Callable:
+        def record(response) -> None:
+            failed.add((push.index, stage))
+            if any((push.index, dependency) in failed for dependency in dependencies):
+                # Failed because a dependency did; that failure decides what happens
+                return
+            error = response.error()
+            if is_retryable_error(error) and not final:
+                logger.info(f"Retrying {push.call_name(stage)}: {error.api_error_message()}")
+                return
+            logger.error(
+                f"Facebook API error creating {stage} for campaign {push.index}: "
+                f"{error.api_error_code()}: {error.api_error_message()}"
+            )
+            push.fail(stage, error_details(error))
+        return record
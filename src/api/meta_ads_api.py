@@ -1,27 +1,63 @@
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+from tenacity import Retrying, stop_after_attempt, wait_random_exponential, retry_if_exception
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
 from facebook_business.adobjects.adset import AdSet
 from facebook_business.adobjects.ad import Ad
 from facebook_business.exceptions import FacebookRequestError
+from facebook_business.session import FacebookSession
 
 from src.config.config import config
 
 logger = logging.getLogger(__name__)
 
+# Error subcodes Meta returns when a referenced object does not exist (yet),
+# e.g. an ad set created moments after its campaign
+NOT_READY_ERROR_SUBCODES = frozenset({33})
+
+def is_not_ready_error(error: BaseException) -> bool:
+    """Whether a failed create call was rejected because its parent is not ready.
+    
+    Create calls are not idempotent, so only errors that guarantee nothing
+    was created qualify; generic or transient errors may have come back
+    after the object was made and retrying them could duplicate it.
+    """
+    if not isinstance(error, FacebookRequestError):
+        return False
+    return error.api_error_subcode() in NOT_READY_ERROR_SUBCODES
+
+class GraphSession(FacebookSession):
+    """FacebookSession that sends its requests to another Graph API host."""
+    
+    def __init__(self, graph_url: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.GRAPH = graph_url.rstrip("/")
+
 class MetaAdsAPI:
     def __init__(self):
         """Initialize the Meta Ads API client."""
         try:
             # Initialize the Facebook Ads API
-            FacebookAdsApi.init(
-                app_id=config.meta_ads.app_id,
-                app_secret=config.meta_ads.app_secret,
-                access_token=config.meta_ads.access_token
-            )
+            if config.meta_ads.graph_url:
+                session = GraphSession(
+                    config.meta_ads.graph_url,
+                    app_id=config.meta_ads.app_id,
+                    app_secret=config.meta_ads.app_secret,
+                    access_token=config.meta_ads.access_token
+                )
+                self.api = FacebookAdsApi(session)
+                FacebookAdsApi.set_default_api(self.api)
+                logger.info(f"Using Graph API at {config.meta_ads.graph_url}")
+            else:
+                self.api = FacebookAdsApi.init(
+                    app_id=config.meta_ads.app_id,
+                    app_secret=config.meta_ads.app_secret,
+                    access_token=config.meta_ads.access_token
+                )
             
             # Set up the Ad Account object
             self.ad_account = AdAccount(f'act_{config.meta_ads.ad_account_id}')
@@ -41,22 +77,8 @@ class MetaAdsAPI:
             Dict[str, Any]: Response with campaign ID or error
         """
         try:
-            campaign_data = campaign_spec["campaign"]
-            
-            # Prepare params for campaign creation
-            params = {
-                'name': campaign_data["name"],
-                'objective': campaign_data["objective"],
-                'status': campaign_data["status"],
-                'special_ad_categories': campaign_data.get("special_ad_categories", []),
-            }
-            
-            # Add optional campaign budget optimization if enabled
-            if campaign_data.get("budget_optimization", False):
-                params['daily_budget'] = campaign_spec["ad_set"]["budget"]["amount"]
-            
             # Create the campaign
-            campaign = self.ad_account.create_campaign(params=params)
+            campaign = self._create(self.ad_account.create_campaign, self.campaign_params(campaign_spec))
             
             logger.info(f"Campaign created with ID: {campaign['id']}")
             
@@ -93,42 +115,8 @@ class MetaAdsAPI:
             Dict[str, Any]: Response with ad set ID or error
         """
         try:
-            ad_set_data = campaign_spec["ad_set"]
-            
-            # Prepare targeting specs
-            targeting = ad_set_data["targeting"]
-            
-            # Prepare params for ad set creation
-            params = {
-                'name': ad_set_data["name"],
-                'campaign_id': campaign_id,
-                'optimization_goal': ad_set_data["optimization_goal"],
-                'billing_event': ad_set_data["billing_event"],
-                'bid_strategy': ad_set_data["bid_strategy"],
-                'targeting': targeting,
-                'status': campaign_spec["campaign"]["status"],
-            }
-            
-            # Add budget if not using campaign budget optimization
-            if not campaign_spec["campaign"].get("budget_optimization", False):
-                budget_data = ad_set_data["budget"]
-                budget_type = budget_data["type"]
-                
-                if budget_type == "daily":
-                    params['daily_budget'] = budget_data["amount"]
-                elif budget_type == "lifetime":
-                    params['lifetime_budget'] = budget_data["amount"]
-            
-            # Add scheduling if provided
-            if "schedule" in ad_set_data:
-                schedule = ad_set_data["schedule"]
-                if "start_time" in schedule:
-                    params['start_time'] = schedule["start_time"]
-                if "end_time" in schedule:
-                    params['end_time'] = schedule["end_time"]
-            
             # Create the ad set
-            ad_set = self.ad_account.create_ad_set(params=params)
+            ad_set = self._create(self.ad_account.create_ad_set, self.ad_set_params(campaign_id, campaign_spec))
             
             logger.info(f"Ad Set created with ID: {ad_set['id']}")
             
@@ -154,53 +142,69 @@ class MetaAdsAPI:
                 "error_message": str(e)
             }
     
-    def create_ad(self, ad_set_id: str, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
+    def create_ad_creative(self, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an ad creative in Meta Ads.
+        
+        The creative belongs to the ad account rather than to the campaign,
+        so it can be created before (or alongside) the campaign and ad set.
+        
+        Args:
+            campaign_spec: Campaign specification dictionary
+            
+        Returns:
+            Dict[str, Any]: Response with creative ID or error
+        """
+        try:
+            creative = self._create(self.ad_account.create_ad_creative, self.ad_creative_params(campaign_spec))
+            
+            logger.info(f"Ad creative created with ID: {creative['id']}")
+            
+            return {
+                "success": True,
+                "creative_id": creative["id"],
+                "data": creative
+            }
+        except FacebookRequestError as e:
+            logger.error(f"Facebook API error creating ad creative: {e.api_error_code()}: {e.api_error_message()}")
+            return {
+                "success": False,
+                "error_code": e.api_error_code(),
+                "error_message": e.api_error_message(),
+                "error_type": e.api_error_type(),
+                "error_subcode": e.api_error_subcode()
+            }
+        except Exception as e:
+            logger.error(f"Error creating ad creative: {str(e)}")
+            return {
+                "success": False,
+                "error_message": str(e)
+            }
+    
+    def create_ad(
+        self,
+        ad_set_id: str,
+        campaign_spec: Dict[str, Any],
+        creative_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create an ad in Meta Ads.
         
         Args:
             ad_set_id: ID of the parent ad set
             campaign_spec: Campaign specification dictionary
+            creative_id: ID of an existing creative; one is created from the spec if omitted
             
         Returns:
             Dict[str, Any]: Response with ad ID or error
         """
         try:
-            ad_data = campaign_spec["ad"]
-            creative_data = ad_data["creative"]
-            
-            # Create a creative first (for demonstration, using a simple link ad)
-            creative_params = {
-                'name': f"{ad_data['name']} Creative",
-                'title': creative_data["title"],
-                'body': creative_data["body"],
-                'link': creative_data["link"],
-                'call_to_action_type': creative_data["call_to_action"],
-                'object_story_spec': {
-                    'page_id': config.meta_ads.business_id,
-                    'link_data': {
-                        'message': creative_data["body"],
-                        'link': creative_data["link"],
-                        'caption': creative_data.get("caption", ""),
-                        'description': creative_data.get("image_description", ""),
-                        'call_to_action': {
-                            'type': creative_data["call_to_action"],
-                            'value': {'link': creative_data["link"]}
-                        }
-                    }
-                }
-            }
-            
-            creative = self.ad_account.create_ad_creative(params=creative_params)
+            if creative_id is None:
+                creative_response = self.create_ad_creative(campaign_spec)
+                if not creative_response["success"]:
+                    return creative_response
+                creative_id = creative_response["creative_id"]
             
             # Create the ad
-            ad_params = {
-                'name': ad_data["name"],
-                'adset_id': ad_set_id,
-                'creative': {'creative_id': creative["id"]},
-                'status': campaign_spec["campaign"]["status"]
-            }
-            
-            ad = self.ad_account.create_ad(params=ad_params)
+            ad = self._create(self.ad_account.create_ad, self.ad_params(ad_set_id, creative_id, campaign_spec))
             
             logger.info(f"Ad created with ID: {ad['id']}")
             
@@ -208,7 +212,7 @@ class MetaAdsAPI:
             return {
                 "success": True,
                 "ad_id": ad["id"],
-                "creative_id": creative["id"],
+                "creative_id": creative_id,
                 "data": ad
             }
         except FacebookRequestError as e:
@@ -227,70 +231,252 @@ class MetaAdsAPI:
                 "error_message": str(e)
             }
     
+    def campaign_params(self, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the Graph API params for creating a campaign.
+        
+        Args:
+            campaign_spec: Campaign specification dictionary
+            
+        Returns:
+            Dict[str, Any]: Campaign creation params
+        """
+        campaign_data = campaign_spec["campaign"]
+        
+        params = {
+            'name': campaign_data["name"],
+            'objective': campaign_data["objective"],
+            'status': campaign_data["status"],
+            'special_ad_categories': campaign_data.get("special_ad_categories", []),
+        }
+        
+        # Add optional campaign budget optimization if enabled
+        if campaign_data.get("budget_optimization", False):
+            params['daily_budget'] = campaign_spec["ad_set"]["budget"]["amount"]
+        
+        return params
+    
+    def ad_set_params(self, campaign_id: str, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the Graph API params for creating an ad set.
+        
+        Args:
+            campaign_id: ID of the parent campaign (or a batch reference to it)
+            campaign_spec: Campaign specification dictionary
+            
+        Returns:
+            Dict[str, Any]: Ad set creation params
+        """
+        ad_set_data = campaign_spec["ad_set"]
+        
+        params = {
+            'name': ad_set_data["name"],
+            'campaign_id': campaign_id,
+            'optimization_goal': ad_set_data["optimization_goal"],
+            'billing_event': ad_set_data["billing_event"],
+            'bid_strategy': ad_set_data["bid_strategy"],
+            'targeting': ad_set_data["targeting"],
+            'status': campaign_spec["campaign"]["status"],
+        }
+        
+        # Add budget if not using campaign budget optimization
+        if not campaign_spec["campaign"].get("budget_optimization", False):
+            budget_data = ad_set_data["budget"]
+            budget_type = budget_data["type"]
+            
+            if budget_type == "daily":
+                params['daily_budget'] = budget_data["amount"]
+            elif budget_type == "lifetime":
+                params['lifetime_budget'] = budget_data["amount"]
+        
+        # Add scheduling if provided
+        if "schedule" in ad_set_data:
+            schedule = ad_set_data["schedule"]
+            if "start_time" in schedule:
+                params['start_time'] = schedule["start_time"]
+            if "end_time" in schedule:
+                params['end_time'] = schedule["end_time"]
+        
+        return params
+    
+    def ad_creative_params(self, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the Graph API params for creating a link ad creative.
+        
+        Args:
+            campaign_spec: Campaign specification dictionary
+            
+        Returns:
+            Dict[str, Any]: Ad creative creation params
+        """
+        ad_data = campaign_spec["ad"]
+        creative_data = ad_data["creative"]
+        
+        return {
+            'name': f"{ad_data['name']} Creative",
+            'title': creative_data["title"],
+            'body': creative_data["body"],
+            'link': creative_data["link"],
+            'call_to_action_type': creative_data["call_to_action"],
+            'object_story_spec': {
+                'page_id': config.meta_ads.business_id,
+                'link_data': {
+                    'message': creative_data["body"],
+                    'link': creative_data["link"],
+                    'caption': creative_data.get("caption", ""),
+                    'description': creative_data.get("image_description", ""),
+                    'call_to_action': {
+                        'type': creative_data["call_to_action"],
+                        'value': {'link': creative_data["link"]}
+                    }
+                }
+            }
+        }
+    
+    def ad_params(self, ad_set_id: str, creative_id: str, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the Graph API params for creating an ad.
+        
+        Args:
+            ad_set_id: ID of the parent ad set (or a batch reference to it)
+            creative_id: ID of the creative (or a batch reference to it)
+            campaign_spec: Campaign specification dictionary
+            
+        Returns:
+            Dict[str, Any]: Ad creation params
+        """
+        return {
+            'name': campaign_spec["ad"]["name"],
+            'adset_id': ad_set_id,
+            'creative': {'creative_id': creative_id},
+            'status': campaign_spec["campaign"]["status"]
+        }
+    
     def create_full_campaign(self, campaign_spec: Dict[str, Any]) -> Dict[str, Any]:
         """Create a full campaign structure (campaign, ad set, ad).
         
+        The creative does not depend on the campaign or ad set, so it is
+        created concurrently with the ad set. Objects are used as soon as
+        they are created; if Meta reports a parent as not ready yet, the
+        call is retried with a short jittered backoff (see `_create`).
+        
         Args:
             campaign_spec: Complete campaign specification dictionary
             
         Returns:
-            Dict[str, Any]: Response with all IDs or error information
+            Dict[str, Any]: Response with all IDs or error information, plus
+                per-stage `timings` in seconds
         """
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        
+        def finish(response: Dict[str, Any]) -> Dict[str, Any]:
+            timings["total"] = round(time.perf_counter() - start, 3)
+            response["timings"] = timings
+            return response
+        
         try:
             # Step 1: Create Campaign
-            campaign_response = self.create_campaign(campaign_spec)
+            campaign_response = self._timed(timings, "campaign", self.create_campaign, campaign_spec)
             
             if not campaign_response["success"]:
-                return {
+                return finish({
                     "success": False,
                     "stage": "campaign",
                     "error": campaign_response
-                }
+                })
             
             campaign_id = campaign_response["campaign_id"]
             
-            # Wait briefly to ensure campaign creation is processed
-            time.sleep(2)
-            
-            # Step 2: Create Ad Set
-            ad_set_response = self.create_ad_set(campaign_id, campaign_spec)
+            # Step 2: Create the Ad Set and the Ad Creative concurrently
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                creative_future = executor.submit(
+                    self._timed, timings, "ad_creative", self.create_ad_creative, campaign_spec
+                )
+                ad_set_response = self._timed(timings, "ad_set", self.create_ad_set, campaign_id, campaign_spec)
+                creative_response = creative_future.result()
             
             if not ad_set_response["success"]:
-                return {
+                return finish({
                     "success": False,
                     "stage": "ad_set",
                     "campaign_id": campaign_id,
                     "error": ad_set_response
-                }
+                })
             
             ad_set_id = ad_set_response["ad_set_id"]
             
-            # Wait briefly to ensure ad set creation is processed
-            time.sleep(2)
+            if not creative_response["success"]:
+                return finish({
+                    "success": False,
+                    "stage": "ad_creative",
+                    "campaign_id": campaign_id,
+                    "ad_set_id": ad_set_id,
+                    "error": creative_response
+                })
+            
+            creative_id = creative_response["creative_id"]
             
             # Step 3: Create Ad
-            ad_response = self.create_ad(ad_set_id, campaign_spec)
+            ad_response = self._timed(timings, "ad", self.create_ad, ad_set_id, campaign_spec, creative_id)
             
             if not ad_response["success"]:
-                return {
+                return finish({
                     "success": False,
                     "stage": "ad",
                     "campaign_id": campaign_id,
                     "ad_set_id": ad_set_id,
+                    "creative_id": creative_id,
                     "error": ad_response
-                }
+                })
             
             # Return success response with all IDs
-            return {
+            return finish({
                 "success": True,
                 "campaign_id": campaign_id,
                 "ad_set_id": ad_set_id,
                 "ad_id": ad_response["ad_id"],
-                "creative_id": ad_response["creative_id"]
-            }
+                "creative_id": creative_id
+            })
         except Exception as e:
             logger.error(f"Error in campaign creation pipeline: {str(e)}")
-            return {
+            return finish({
                 "success": False,
                 "error": str(e)
-            } 
\ No newline at end of file
+            })
+    
+    @staticmethod
+    def _timed(timings: Dict[str, float], stage: str, func: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+        """Call a pipeline stage and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timings[stage] = round(time.perf_counter() - start, 3)
+    
+    def _create(self, create: Callable[..., Any], params: Dict[str, Any]) -> Any:
+        """Call an SDK create method, retrying while a referenced object is not ready.
+        
+        Meta creates objects asynchronously, so an ID that was just returned
+        can briefly be rejected as nonexistent when used as a parent. Those
+        errors are retried with full jitter exponential backoff; anything
+        else, transient errors included, is raised immediately so a create
+        that may have succeeded is never repeated.
+        
+        Args:
+            create: Bound SDK method such as `AdAccount.create_ad_set`
+            params: Parameters for the create call
+            
+        Returns:
+            The created SDK object
+        """
+        for attempt in Retrying(
+            stop=stop_after_attempt(config.meta_ads.ready_max_attempts),
+            wait=wait_random_exponential(
+                multiplier=config.meta_ads.ready_backoff_seconds,
+                max=config.meta_ads.ready_backoff_max_seconds
+            ),
+            retry=retry_if_exception(is_not_ready_error),
+            before_sleep=lambda state: logger.info(
+                f"Object not ready, retrying (attempt {state.attempt_number}): {state.outcome.exception()}"
+            ),
+            reraise=True
+        ):
+            with attempt:
+                return create(params=params)
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from typing import Optional
 from pydantic import BaseModel, Field
 
 # Load environment variables
@@ -7,16 +8,47 @@ load_dotenv()
 
 class OpenAIConfig(BaseModel):
     api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
+    # Override the API host, e.g. to point at src/fakes/openai_server.py
+    base_url: str = Field(default_factory=lambda: os.getenv("OPENAI_BASE_URL", ""))
     model: str = Field(default="gpt-4o-mini")
     embedding_model: str = Field(default="text-embedding-ada-002")
     max_tokens: int = Field(default=4000)
     temperature: float = Field(default=0.2)
+    embedding_batch_size: int = Field(default=512)
+    embedding_batch_max_tokens: int = Field(default=250000)
+    max_concurrent_requests: int = Field(default_factory=lambda: int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+    rate_limit_enabled: bool = Field(default_factory=lambda: os.getenv("OPENAI_RATE_LIMIT", "True").lower() == "true")
+    requests_per_minute: int = Field(default_factory=lambda: int(os.getenv("OPENAI_RPM", "500")))
+    tokens_per_minute: int = Field(default_factory=lambda: int(os.getenv("OPENAI_TPM", "200000")))
+    # Hard tokens-per-minute ceiling that response headers cannot raise (0 for none)
+    token_budget_per_minute: int = Field(default_factory=lambda: int(os.getenv("OPENAI_TPM_BUDGET", "0")))
 
 class PineconeConfig(BaseModel):
     api_key: str = Field(default_factory=lambda: os.getenv("PINECONE_API_KEY", ""))
     environment: str = Field(default_factory=lambda: os.getenv("PINECONE_ENVIRONMENT", ""))
     index_name: str = Field(default_factory=lambda: os.getenv("PINECONE_INDEX", "ad-campaign-knowledge"))
     namespace: str = Field(default="default")
+    # How long a confirmed index host is trusted before checking it again
+    index_state_ttl_seconds: float = Field(default_factory=lambda: float(os.getenv("PINECONE_INDEX_STATE_TTL", "86400")))
+    pool_size: int = Field(default_factory=lambda: int(os.getenv("PINECONE_POOL_SIZE", "8")))
+
+class VectorStoreConfig(BaseModel):
+    backend: str = Field(default_factory=lambda: os.getenv("VECTOR_BACKEND", "pinecone"))
+    local_path: str = Field(default_factory=lambda: os.getenv("LOCAL_INDEX_PATH", os.path.join(".cache", "vector_index")))
+    dimension: int = Field(default=1536)
+    ann: bool = Field(default_factory=lambda: os.getenv("LOCAL_INDEX_ANN", "False").lower() == "true")
+    ann_nlist: Optional[int] = Field(default=None)
+    ann_nprobe: int = Field(default_factory=lambda: int(os.getenv("LOCAL_INDEX_NPROBE", "8")))
+    ann_min_vectors: int = Field(default=10000)
+    upsert_batch_size: int = Field(default=100)
+    upsert_max_bytes: int = Field(default=2 * 1024 * 1024)
+    upsert_concurrency: int = Field(default_factory=lambda: int(os.getenv("UPSERT_CONCURRENCY", "4")))
+    upsert_max_attempts: int = Field(default=3)
+
+class RetrievalConfig(BaseModel):
+    top_k: int = Field(default_factory=lambda: int(os.getenv("RETRIEVAL_TOP_K", "10")))
+    context_max_tokens: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_MAX_TOKENS", "3000")))
+    duplicate_threshold: float = Field(default=0.8)
 
 class MetaAdsConfig(BaseModel):
     app_id: str = Field(default_factory=lambda: os.getenv("META_APP_ID", ""))
@@ -24,11 +56,32 @@ class MetaAdsConfig(BaseModel):
     access_token: str = Field(default_factory=lambda: os.getenv("META_ACCESS_TOKEN", ""))
     ad_account_id: str = Field(default_factory=lambda: os.getenv("META_AD_ACCOUNT_ID", ""))
     business_id: str = Field(default_factory=lambda: os.getenv("META_BUSINESS_ID", ""))
+    # Override the Graph API host, e.g. to point at src/fakes/meta_server.py
+    graph_url: str = Field(default_factory=lambda: os.getenv("META_GRAPH_URL", ""))
+    # Retries for objects referenced before Meta has finished creating them
+    ready_max_attempts: int = Field(default=6)
+    ready_backoff_seconds: float = Field(default=0.25)
+    ready_backoff_max_seconds: float = Field(default=4.0)
+
+class CacheConfig(BaseModel):
+    directory: str = Field(default_factory=lambda: os.getenv("CACHE_DIR", ".cache"))
+    embedding_cache_enabled: bool = Field(default_factory=lambda: os.getenv("EMBEDDING_CACHE", "True").lower() == "true")
+    embedding_cache_max_entries: int = Field(default=200000)
+    embedding_cache_memory_entries: int = Field(default=4096)
+    response_cache_enabled: bool = Field(default_factory=lambda: os.getenv("RESPONSE_CACHE", "True").lower() == "true")
+    response_cache_ttl_seconds: float = Field(default_factory=lambda: float(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600))))
+    response_cache_max_entries: int = Field(default=10000)
+    response_cache_memory_entries: int = Field(default=256)
+    semantic_cache_enabled: bool = Field(default_factory=lambda: os.getenv("SEMANTIC_CACHE", "False").lower() == "true")
+    semantic_cache_threshold: float = Field(default=0.97)
 
 class AppConfig(BaseModel):
     openai: OpenAIConfig = Field(default_factory=OpenAIConfig)
     pinecone: PineconeConfig = Field(default_factory=PineconeConfig)
+    vector_store: VectorStoreConfig = Field(default_factory=VectorStoreConfig)
+    retrieval: RetrievalConfig = Field(default_factory=RetrievalConfig)
     meta_ads: MetaAdsConfig = Field(default_factory=MetaAdsConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
     debug: bool = Field(default_factory=lambda: os.getenv("DEBUG", "False").lower() == "true")
     log_level: str = Field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
 
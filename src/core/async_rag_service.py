@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.config.config import config
+
+from src.core.rag_service import RAGService
+from src.models.async_openai_service import AsyncOpenAIService
+from src.database.async_vector_store import AsyncVectorStore
+
+logger = logging.getLogger(__name__)
+
+class AsyncRAGService:
+    """Asyncio-native version of the `RAGService` retrieval and generation APIs.
+    
+    Prompts, parsing and validation are shared with `RAGService`; only the
+    I/O is awaited. One instance can serve many briefs concurrently over a
+    single OpenAI connection pool.
+    """
+    
+    def __init__(
+        self,
+        rag_service: Optional[RAGService] = None,
+        openai: Optional[AsyncOpenAIService] = None,
+        vector_store: Optional[AsyncVectorStore] = None
+    ):
+        self.rag = rag_service or RAGService()
+        self.openai = openai or AsyncOpenAIService(self.rag.openai)
+        self.vector_store = vector_store or AsyncVectorStore(self.rag.vector_store)
+    
+    async def __aenter__(self) -> "AsyncRAGService":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        await self.openai.aclose()
+    
+    async def retrieve_relevant_context(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve relevant context for a query.
+        
+        Args:
+            query: The query text
+            top_k: Number of results to return
+            filter: Optional filter for metadata
+            
+        Returns:
+            List[Dict[str, Any]]: List of relevant documents with metadata
+        """
+        try:
+            query_embedding = await self.openai.get_embedding(query)
+            results = await self.vector_store.query(query_vector=query_embedding, top_k=top_k, filter=filter)
+            
+            return [
+                {
+                    "id": match["id"] if "id" in match else None,
+                    "text": match["metadata"]["text"],
+                    "metadata": {k: v for k, v in match["metadata"].items() if k != "text"},
+                    "score": match["score"]
+                }
+                for match in results.get("matches", [])
+            ]
+        except Exception as e:
+            logger.error(f"Failed to retrieve context: {str(e)}")
+            return []
+    
+    async def generate_campaign(self, campaign_brief: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a campaign specification based on a brief.
+        
+        Args:
+            campaign_brief: Dictionary containing campaign brief information
+            use_cache: Serve and store the specification in the response cache
+            
+        Returns:
+            Dict[str, Any]: Campaign specification in Meta API format
+        """
+        try:
+            query = self.rag._brief_to_query(campaign_brief)
+            relevant_docs = await self.retrieve_relevant_context(query, top_k=config.retrieval.top_k)
+            
+            cache = self.rag.response_cache if use_cache else None
+            if cache is not None:
+                key, scope = self.rag._response_cache_key("campaign", campaign_brief, relevant_docs)
+                embedding, cached = await self._cached_response(cache, key, scope, campaign_brief)
+                if cached is not None:
+                    return cached
+            
+            messages = self.rag._campaign_messages(campaign_brief, relevant_docs)
+            
+            response = await self.openai.get_completion(
+                messages=messages,
+                response_format={"type": "json_object"}
+            )
+            
+            campaign_spec = self.rag._parse_campaign_spec(response)
+            if cache is not None:
+                await asyncio.to_thread(cache.put, key, campaign_spec, scope, embedding)
+            return campaign_spec
+        except Exception as e:
+            logger.error(f"Failed to generate campaign: {str(e)}")
+            return {
+                "error": str(e),
+                "status": "failed"
+            }
+    
+    async def _cached_response(self, cache, key: str, scope: str, request: Any) -> Tuple[Optional[List[float]], Any]:
+        """Look a request up in the response cache, exact tier first.
+        
+        Returns:
+            Tuple: The request embedding if the semantic tier computed one, and the cached response or None
+        """
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None or not config.cache.semantic_cache_enabled:
+            return None, cached
+        embedding = await self.openai.get_embedding(self.rag._semantic_cache_text(request))
+        cached = await asyncio.to_thread(
+            cache.get_similar, scope, embedding, config.cache.semantic_cache_threshold
+        )
+        return embedding, cached
+    
+    async def generate_campaigns(
+        self,
+        campaign_briefs: List[Dict[str, Any]],
+        concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """Generate campaign specifications for many briefs concurrently.
+        
+        Args:
+            campaign_briefs: Campaign briefs to generate
+            concurrency: Maximum briefs in flight at once
+            
+        Returns:
+            List[Dict[str, Any]]: Campaign specifications (or error dicts), in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def generate(campaign_brief):
+            async with semaphore:
+                return await self.generate_campaign(campaign_brief)
+        
+        return await asyncio.gather(*(generate(brief) for brief in campaign_briefs))
+    
+    async def query(self, query_text: str, top_k: int = 5, use_cache: bool = True) -> str:
+        """Query the RAG system with a natural language question.
+        
+        Unlike `RAGService.query`, the retrieved chunks are not stored on the
+        instance, since concurrent queries would overwrite each other's.
+        
+        Args:
+            query_text: The question or query text
+            top_k: Number of documents to retrieve
+            use_cache: Serve and store the answer in the response cache
+            
+        Returns:
+            str: Generated response that answers the query
+        """
+        try:
+            context_chunks = await self.retrieve_relevant_context(query_text, top_k=top_k)
+            
+            cache = self.rag.response_cache if use_cache else None
+            if cache is not None:
+                key, scope = self.rag._response_cache_key("query", query_text, context_chunks)
+                embedding, cached = await self._cached_response(cache, key, scope, query_text)
+                if cached is not None:
+                    return cached
+            
+            messages = self.rag._query_messages(query_text, context_chunks)
+            response = await self.openai.get_completion(messages=messages)
+            if cache is not None:
+                await asyncio.to_thread(cache.put, key, response, scope, embedding)
+            return response
+        except Exception as e:
+            logger.error(f"Error during query: {str(e)}")
+            return f"An error occurred: {str(e)}"
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import List, Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+def brief_key(brief: Dict[str, Any]) -> str:
+    """Stable key for a brief: its own ID field if it has one, else a content hash."""
+    for field in ("request_id", "brief_id", "id"):
+        if brief.get(field):
+            return str(brief[field])
+    canonical = json.dumps(brief, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def load_briefs(input_file: str) -> List[Dict[str, Any]]:
+    """Load campaign briefs from a JSONL file, one JSON object per line.
+    
+    Args:
+        input_file: Path to the JSONL file
+        
+    Returns:
+        List[Dict[str, Any]]: Campaign briefs in file order
+    """
+    briefs = []
+    with open(input_file, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            brief = json.loads(line)
+            if not isinstance(brief, dict):
+                raise ValueError(f"{input_file}:{line_number}: expected a JSON object")
+            briefs.append(brief)
+    return briefs
+
+def completed_keys(output_file: str) -> set:
+    """Keys of briefs that already have a successful result in the output.
+    
+    A partially written last line (e.g. after a crash) is ignored, so that
+    brief is generated again.
+    """
+    keys = set()
+    if not os.path.exists(output_file):
+        return keys
+    with open(output_file, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                keys.add(record["key"])
+    return keys
+
+class BatchRunner:
+    """Generate campaigns for many briefs and stream results to a JSONL file.
+    
+    Each result is appended and flushed as soon as its brief finishes, so a
+    crashed run can be resumed: briefs with an "ok" record in the output are
+    skipped, and failed ones are tried again. Requests are throttled by the
+    shared OpenAI rate limiter (see `get_rate_limiter`), not by the runner.
+    """
+    
+    def __init__(
+        self,
+        service,
+        output_file: str,
+        concurrency: int = 4
+    ):
+        self.service = service
+        self.output_file = output_file
+        self.concurrency = max(1, concurrency)
+    
+    async def run(
+        self,
+        briefs: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Generate every brief not already completed in the output file.
+        
+        Args:
+            briefs: Campaign briefs to generate
+            on_result: Called with each output record as it is written
+            
+        Returns:
+            Dict[str, Any]: Counts of skipped, succeeded and failed briefs
+        """
+        done = completed_keys(self.output_file)
+        pending = []
+        seen = set()
+        for brief in briefs:
+            key = brief_key(brief)
+            if key in done or key in seen:
+                continue
+            seen.add(key)
+            pending.append((key, brief))
+        
+        summary = {"total": len(briefs), "skipped": len(briefs) - len(pending), "succeeded": 0, "failed": 0}
+        if not pending:
+            return summary
+        
+        dir_name = os.path.dirname(self.output_file)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        
+        # Terminate a line left half-written by a crash before appending
+        if os.path.exists(self.output_file) and os.path.getsize(self.output_file) > 0:
+            with open(self.output_file, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        
+        with open(self.output_file, 'a') as output:
+            async def generate(key: str, brief: Dict[str, Any]) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        campaign_spec = await self.service.generate_campaign(brief)
+                    except Exception as e:
+                        campaign_spec = {"error": str(e), "status": "failed"}
+                
+                failed = "error" in campaign_spec
+                record = {
+                    "key": key,
+                    "status": "failed" if failed else "ok",
+                    "brief": brief,
+                    "campaign_spec": None if failed else campaign_spec,
+                    "error": campaign_spec["error"] if failed else None,
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+                # Writes happen on the event loop thread, so lines never interleave
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                summary["failed" if failed else "succeeded"] += 1
+                if on_result is not None:
+                    on_result(record)
+            
+            await asyncio.gather(*(generate(key, brief) for key, brief in pending))
+        
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Batch finished: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+            f"{summary['skipped']} skipped in {summary['seconds']}s"
+        )
+        return summary
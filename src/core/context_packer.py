@@ -0,0 +1,178 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple
+
+from src.models.tokenizer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+
+# Words per shingle when comparing chunks for near-duplicates
+SHINGLE_SIZE = 5
+
+# Don't bother truncating a chunk into a sliver smaller than this
+MIN_TRUNCATED_TOKENS = 32
+
+# Shorter shared runs between neighbouring chunks are left alone
+MIN_OVERLAP_CHARS = 20
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed word n-grams of a text, for overlap comparisons."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {hash(tuple(words))} if words else set()
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+def overlap_length(first: str, second: str, minimum: int = MIN_OVERLAP_CHARS) -> int:
+    """Length of the longest suffix of `first` that `second` starts with."""
+    for length in range(min(len(first), len(second)), minimum - 1, -1):
+        if second.startswith(first[-length:]):
+            return length
+    return 0
+
+@dataclass
+class PackedContext:
+    """Result of packing retrieved documents into a token budget."""
+    text: str = ""
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    duplicates_dropped: int = 0
+    overlaps_trimmed: int = 0
+    truncated: bool = False
+
+class ContextPacker:
+    """Fill a prompt's context section up to a token budget.
+    
+    Documents are taken in descending score order. When a chunk's neighbour
+    from the same file is already packed, the text the two share through
+    `chunk_text`'s overlap is cut from the chunk. A document whose shingles
+    are mostly covered by documents already packed is dropped. The first
+    document that does not fit is cut at the last sentence boundary that
+    fits, and packing stops there.
+    """
+    
+    def __init__(
+        self,
+        max_tokens: int,
+        model: str,
+        duplicate_threshold: float = 0.8,
+        token_counter: Optional[Callable[[str], int]] = None
+    ):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.count = token_counter or (lambda text: count_tokens(text, model))
+    
+    @staticmethod
+    def format_document(index: int, document: Dict[str, Any]) -> str:
+        source = document.get("metadata", {}).get("source", "Unknown")
+        return f"Document {index + 1} from {source}:\n{document['text']}\n"
+    
+    @staticmethod
+    def chunk_position(document: Dict[str, Any]) -> Optional[Tuple[Any, int]]:
+        """(file, chunk index) of a chunk, or None if its metadata lacks them."""
+        metadata = document.get("metadata", {})
+        index = metadata.get("chunk_index")
+        if index is None:
+            return None
+        # Pinecone returns numeric metadata as floats
+        return metadata.get("file_path", metadata.get("source")), int(index)
+    
+    @staticmethod
+    def trim_overlap(text: str, position: Optional[Tuple[Any, int]], packed_chunks: Dict[Tuple[Any, int], str]) -> str:
+        """Cut the text a chunk shares with its packed neighbours."""
+        if position is None:
+            return text
+        source, index = position
+        previous = packed_chunks.get((source, index - 1))
+        if previous is not None:
+            text = text[overlap_length(previous, text):].lstrip()
+        following = packed_chunks.get((source, index + 1))
+        if following is not None:
+            text = text[:len(text) - overlap_length(text, following)].rstrip()
+        return text
+    
+    def pack(self, documents: List[Dict[str, Any]]) -> PackedContext:
+        """Pack documents into the token budget.
+        
+        Args:
+            documents: Retrieved documents with 'text', 'metadata' and 'score'
+            
+        Returns:
+            PackedContext: Formatted context and what went into it
+        """
+        packed = PackedContext()
+        seen: Set[int] = set()
+        # Text of packed chunks by (file, chunk index)
+        packed_chunks: Dict[Tuple[Any, int], str] = {}
+        parts: List[str] = []
+        # Parts are joined with "\n", which costs at most one token each
+        used = 0
+        
+        for document in sorted(documents, key=lambda doc: doc.get("score", 0.0), reverse=True):
+            position = self.chunk_position(document)
+            text = self.trim_overlap(document["text"], position, packed_chunks)
+            if not text:
+                packed.duplicates_dropped += 1
+                continue
+            if text != document["text"]:
+                document = {**document, "text": text}
+                packed.overlaps_trimmed += 1
+            
+            document_shingles = shingles(text)
+            if document_shingles and len(document_shingles & seen) >= self.duplicate_threshold * len(document_shingles):
+                packed.duplicates_dropped += 1
+                continue
+            
+            part = self.format_document(len(parts), document)
+            tokens = self.count(part) + (1 if parts else 0)
+            if used + tokens <= self.max_tokens:
+                parts.append(part)
+                packed.documents.append(document)
+                seen |= document_shingles
+                used += tokens
+                if position is not None:
+                    packed_chunks[position] = text
+                continue
+            
+            truncated = self._truncate(document, len(parts), self.max_tokens - used - (1 if parts else 0))
+            if truncated is not None:
+                parts.append(self.format_document(len(parts), truncated))
+                packed.documents.append(truncated)
+                packed.truncated = True
+            break
+        
+        packed.text = "\n".join(parts)
+        packed.tokens = self.count(packed.text) if parts else 0
+        logger.debug(
+            f"Packed {len(packed.documents)} of {len(documents)} documents into {packed.tokens} tokens "
+            f"({packed.duplicates_dropped} near-duplicates dropped, {packed.overlaps_trimmed} overlaps trimmed)"
+        )
+        return packed
+    
+    def _truncate(self, document: Dict[str, Any], index: int, budget: int) -> Optional[Dict[str, Any]]:
+        """Longest sentence-aligned prefix of a document that fits the budget."""
+        if budget < MIN_TRUNCATED_TOKENS:
+            return None
+        text = document["text"].strip()
+        # Offsets just past each sentence, so prefixes keep the original whitespace
+        ends = [match.start() for match in _SENTENCE_END.finditer(text)] + [len(text)]
+        
+        def fits(count: int) -> bool:
+            candidate = {**document, "text": text[:ends[count - 1]]}
+            return self.count(self.format_document(index, candidate)) <= budget
+        
+        # Binary search for the most sentences that fit
+        low, high = 0, len(ends)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle - 1
+        
+        if low == 0:
+            return None
+        return {**document, "text": text[:ends[low - 1]], "truncated": True}
@@ -0,0 +1,434 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output
+_DONE = object()
+
+def chunk_text(text, max_chunk_size=1000, overlap=200):
+    """Split text into chunks with overlap.
+    
+    Args:
+        text: The text to split
+        max_chunk_size: Maximum size of each chunk
+        overlap: Overlap between chunks
+        
+    Returns:
+        List of text chunks
+    """
+    # Split into paragraphs first
+    paragraphs = re.split(r'\n\s*\n', text)
+    
+    chunks = []
+    current_chunk = ""
+    
+    for paragraph in paragraphs:
+        # If adding this paragraph would exceed max size, add current chunk to list
+        if len(current_chunk) + len(paragraph) > max_chunk_size and current_chunk:
+            chunks.append(current_chunk)
+            # Keep overlap from previous chunk
+            current_chunk = current_chunk[-overlap:] if len(current_chunk) > overlap else current_chunk
+        
+        # Add paragraph to current chunk
+        if current_chunk and not current_chunk.endswith("\n"):
+            current_chunk += "\n\n"
+        current_chunk += paragraph
+    
+    # Add the last chunk if it's not empty
+    if current_chunk:
+        chunks.append(current_chunk)
+    
+    return chunks
+
+def chunk_id(file_path, text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Deterministic vector ID for a chunk: hash of its file path, content and metadata.
+    
+    The metadata holds the chunk's position, so identical chunks of one file
+    get distinct IDs, and a chunk whose stored metadata would go stale (it
+    moved, the file gained chunks or its title changed) gets a new ID and
+    is upserted again; its embedding still comes from the embedding cache.
+    """
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    metadata_json = json.dumps(metadata or {}, sort_keys=True, default=str)
+    key = f"{Path(file_path).as_posix()}\0{content_hash}\0{metadata_json}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def load_file_chunks(file_path, content: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read a file and split it into documents ready for embedding.
+    
+    Args:
+        file_path: Path to the file
+        content: File contents, if already read
+        
+    Returns:
+        List[Dict[str, Any]]: Documents with 'id', 'text' and 'metadata'
+    """
+    # Read the file
+    if content is None:
+        with open(file_path, 'r') as f:
+            content = f.read()
+    
+    # Get the file name for metadata
+    file_name = Path(file_path).name
+    
+    # Extract title from Markdown content (assuming first # heading is title)
+    title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+    title = title_match.group(1) if title_match else file_name
+    
+    # Chunk the content
+    chunks = chunk_text(content)
+    
+    # Create metadata for the document
+    base_metadata = {
+        "source": file_name,
+        "title": title,
+        "file_path": str(file_path),
+        "chunk_index": 0,
+        "total_chunks": len(chunks)
+    }
+    
+    documents = []
+    for i, chunk in enumerate(chunks):
+        metadata = {**base_metadata, "chunk_index": i}
+        documents.append({"id": chunk_id(file_path, chunk, metadata), "text": chunk, "metadata": metadata})
+    return documents
+
+def iter_files(directory_path, file_extensions: Optional[List[str]] = None) -> Iterable[Path]:
+    """Recursively yield files under a directory, filtered by extension."""
+    for root, _, files in os.walk(directory_path):
+        for file in sorted(files):
+            # Skip if file extension doesn't match
+            if file_extensions and not any(file.endswith(ext) for ext in file_extensions):
+                continue
+            yield Path(root) / file
+
+@dataclass
+class IngestPlan:
+    """Work needed to bring the index in line with the files on disk."""
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    stale_ids: List[str] = field(default_factory=list)
+    changed_files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    removed_files: List[str] = field(default_factory=list)
+    unchanged_files: int = 0
+
+class ChunkManifest:
+    """Record of which chunks of which files are already in the index.
+    
+    Files are first compared by (mtime, size) so an unchanged tree is checked
+    without reading any file. On a mismatch the content hash decides whether
+    the file really changed, and chunk IDs decide which chunks to embed and
+    which vectors to delete.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.files = json.load(f).get("files", {})
+    
+    @classmethod
+    def default_path(cls) -> str:
+        """Manifest location for the configured backend, index and namespace."""
+        from src.config.config import config
+        
+        name = f"{config.vector_store.backend}-{config.pinecone.index_name}-{config.pinecone.namespace}.json"
+        return os.path.join(config.cache.directory, "ingest_manifest", name)
+    
+    def plan(self, file_paths: Iterable, force: bool = False) -> IngestPlan:
+        """Work out which chunks to embed and which vectors to delete.
+        
+        Every changed file is read and chunked before this returns; to do
+        that work as a pipeline stage, pass `plan_file` to
+        `IngestionPipeline.run` instead.
+        
+        Args:
+            file_paths: Every file that should be in the index
+            force: Re-embed every chunk, still deleting stale ones
+            
+        Returns:
+            IngestPlan: Chunks to embed, stale vector IDs and manifest updates
+        """
+        plan = IngestPlan()
+        file_paths = list(file_paths)
+        
+        for file_path in file_paths:
+            try:
+                plan.documents.extend(self.plan_file(plan, file_path, force))
+            except Exception as e:
+                # Leave the file's vectors and manifest entry as they are
+                logger.error(f"Error reading file {file_path}: {str(e)}")
+        
+        self.plan_removed(plan, file_paths)
+        return plan
+    
+    def plan_file(self, plan: IngestPlan, file_path, force: bool = False) -> List[Dict[str, Any]]:
+        """Plan one file, recording its stale chunks and manifest update in `plan`.
+        
+        Args:
+            plan: Plan to add the file's stale IDs and manifest entry to
+            file_path: File that should be in the index
+            force: Re-embed every chunk, still deleting stale ones
+            
+        Returns:
+            List[Dict[str, Any]]: The file's chunks that need embedding
+            
+        Raises:
+            OSError, UnicodeDecodeError: If the file cannot be read; the plan is
+                left without an entry for it
+        """
+        key = str(file_path)
+        entry = self.files.get(key)
+        
+        stat = os.stat(file_path)
+        signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        
+        if not force and entry and entry["mtime_ns"] == signature["mtime_ns"] and entry["size"] == signature["size"]:
+            plan.unchanged_files += 1
+            return []
+        
+        with open(file_path, 'r') as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        
+        if not force and entry and entry["sha256"] == content_hash:
+            # Touched but not edited: only refresh the stat signature
+            plan.changed_files[key] = {**entry, **signature}
+            plan.unchanged_files += 1
+            return []
+        
+        documents = load_file_chunks(file_path, content)
+        ids = [doc["id"] for doc in documents]
+        known = set(entry["chunks"]) if entry and not force else set()
+        
+        if entry:
+            plan.stale_ids.extend(sorted(set(entry["chunks"]) - set(ids)))
+        plan.changed_files[key] = {**signature, "sha256": content_hash, "chunks": ids}
+        return [doc for doc in documents if doc["id"] not in known]
+    
+    def plan_removed(self, plan: IngestPlan, file_paths: Iterable) -> None:
+        """Record files in the manifest but not in `file_paths` as removed."""
+        seen = {str(file_path) for file_path in file_paths}
+        for key, entry in self.files.items():
+            if key not in seen:
+                plan.removed_files.append(key)
+                plan.stale_ids.extend(entry["chunks"])
+    
+    def apply(self, plan: IngestPlan, failed_ids: Optional[set] = None) -> None:
+        """Record a completed plan, skipping files with chunks that failed."""
+        failed_ids = failed_ids or set()
+        for key, entry in plan.changed_files.items():
+            if failed_ids.intersection(entry.get("chunks", [])):
+                continue
+            self.files[key] = entry
+        for key in plan.removed_files:
+            self.files.pop(key, None)
+    
+    def clear(self) -> None:
+        self.files = {}
+    
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        dir_name = os.path.dirname(self.path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+@dataclass
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+    name: str
+    items: int = 0
+    batches: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def record(self, items: int, seconds: float, failed: int = 0) -> None:
+        with self._lock:
+            self.batches += 1
+            self.busy_seconds += seconds
+            self.items += items
+            self.failed += failed
+    
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / wall_seconds, 2) if wall_seconds else 0.0
+        }
+
+class IngestionPipeline:
+    """Three-stage ingestion pipeline connected by bounded queues.
+    
+    1. A reader thread loads and chunks files and groups chunks into batches.
+    2. `embed_workers` threads embed batches concurrently with batched calls.
+    3. An upsert thread writes embedded batches to the vector store.
+    
+    Bounded queues apply backpressure, so a slow stage throttles the stages
+    feeding it instead of buffering the whole corpus in memory.
+    """
+    
+    def __init__(
+        self,
+        rag_service,
+        embed_workers: int = 4,
+        batch_size: int = 64,
+        queue_size: int = 8
+    ):
+        self.rag_service = rag_service
+        self.embed_workers = embed_workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        
+        self.stats = {
+            "read": StageStats("read"),
+            "embed": StageStats("embed"),
+            "upsert": StageStats("upsert")
+        }
+        self.files_ingested = 0
+        self.wall_seconds = 0.0
+        self.failed_ids: set = set()
+        self._failed_lock = threading.Lock()
+    
+    def run(
+        self,
+        file_paths: Iterable,
+        load: Callable[[Any], List[Dict[str, Any]]] = load_file_chunks
+    ) -> Dict[str, Any]:
+        """Ingest files through the pipeline and wait for it to drain.
+        
+        Args:
+            file_paths: Paths of files to ingest
+            load: Reads one file into the documents to embed, e.g. a bound
+                `ChunkManifest.plan_file` to embed only changed chunks
+            
+        Returns:
+            Dict[str, Any]: Summary with per-stage throughput
+        """
+        def sources():
+            for file_path in file_paths:
+                start = time.perf_counter()
+                try:
+                    documents = load(file_path)
+                except Exception as e:
+                    logger.error(f"Error reading file {file_path}: {str(e)}")
+                    self.stats["read"].record(0, time.perf_counter() - start, failed=1)
+                    continue
+                self.stats["read"].record(len(documents), time.perf_counter() - start)
+                if documents:
+                    self.files_ingested += 1
+                yield documents
+        
+        return self._run(sources())
+    
+    def _mark_failed(self, ids: Iterable[str]) -> None:
+        with self._failed_lock:
+            self.failed_ids.update(ids)
+    
+    def _run(self, sources: Iterable[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        chunk_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        vector_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        remaining_workers = [self.embed_workers]
+        workers_lock = threading.Lock()
+        
+        def read_stage():
+            batch = []
+            try:
+                for documents in sources:
+                    for document in documents:
+                        batch.append(document)
+                        if len(batch) >= self.batch_size:
+                            chunk_queue.put(batch)
+                            batch = []
+                if batch:
+                    chunk_queue.put(batch)
+            finally:
+                for _ in range(self.embed_workers):
+                    chunk_queue.put(_DONE)
+        
+        def embed_stage():
+            try:
+                while True:
+                    batch = chunk_queue.get()
+                    if batch is _DONE:
+                        break
+                    start = time.perf_counter()
+                    try:
+                        embeddings = self.rag_service.openai.get_embeddings([doc["text"] for doc in batch])
+                        vectors = [
+                            self.rag_service.build_vector(doc["text"], doc["metadata"], embedding, doc.get("id"))
+                            for doc, embedding in zip(batch, embeddings)
+                        ]
+                    except Exception as e:
+                        logger.error(f"Failed to embed batch of {len(batch)} chunks: {str(e)}")
+                        self.stats["embed"].record(0, time.perf_counter() - start, failed=len(batch))
+                        self._mark_failed(doc.get("id") for doc in batch)
+                        continue
+                    self.stats["embed"].record(len(batch), time.perf_counter() - start)
+                    vector_queue.put(vectors)
+            finally:
+                # The last embed worker to finish closes the upsert stage
+                with workers_lock:
+                    remaining_workers[0] -= 1
+                    if remaining_workers[0] == 0:
+                        vector_queue.put(_DONE)
+        
+        def upsert_stage():
+            # Keeps draining the queue after a failed batch, since embed workers block on a full queue
+            while True:
+                vectors = vector_queue.get()
+                if vectors is _DONE:
+                    break
+                start = time.perf_counter()
+                try:
+                    report = self.rag_service.vector_store.upsert(vectors)
+                except Exception as e:
+                    logger.error(f"Failed to upsert batch of {len(vectors)} vectors: {str(e)}")
+                    self.stats["upsert"].record(0, time.perf_counter() - start, failed=len(vectors))
+                    self._mark_failed(vector["id"] for vector in vectors)
+                    continue
+                if report.failed:
+                    logger.error(f"Failed to upsert {len(report.failed)} of {len(vectors)} vectors")
+                    self._mark_failed(report.failed)
+                self.stats["upsert"].record(len(report.upserted), time.perf_counter() - start, failed=len(report.failed))
+        
+        threads = [threading.Thread(target=read_stage, name="ingest-read")]
+        threads += [
+            threading.Thread(target=embed_stage, name=f"ingest-embed-{i}")
+            for i in range(self.embed_workers)
+        ]
+        threads.append(threading.Thread(target=upsert_stage, name="ingest-upsert"))
+        
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.wall_seconds = time.perf_counter() - start
+        
+        return self.summary()
+    
+    def summary(self) -> Dict[str, Any]:
+        """Return counts and per-stage throughput for the last run."""
+        return {
+            "files": self.files_ingested,
+            "chunks": self.stats["upsert"].items,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "stages": {name: stats.to_dict(self.wall_seconds) for name, stats in self.stats.items()}
+        }
@@ -2,18 +2,31 @@ import json
 import logging
 import uuid
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
 
 from src.models.openai_service import OpenAIService
 from src.database.vector_store import VectorStore
+from src.database.response_cache import ResponseCache, make_key, normalize_brief
+from src.core.context_packer import ContextPacker, PackedContext
+from src.utils.json_stream import JsonSectionParser
 from src.config.config import config
 
 logger = logging.getLogger(__name__)
 
+# Part of every response cache key; bump it whenever the prompt templates
+# change so responses generated from the old prompts are not served
+PROMPT_VERSION = 1
+
 class RAGService:
     def __init__(self):
         self.openai = OpenAIService()
         self.vector_store = VectorStore()
+        self.context_packer = ContextPacker(
+            config.retrieval.context_max_tokens,
+            config.openai.model,
+            config.retrieval.duplicate_threshold
+        )
+        self.response_cache = ResponseCache.from_config() if config.cache.response_cache_enabled else None
         
     def add_document(self, text: str, metadata: Dict[str, Any]) -> bool:
         """Add a document to the vector store.
@@ -29,21 +42,8 @@ class RAGService:
             # Get embedding for the text
             embedding = self.openai.get_embedding(text)
             
-            # Create a unique ID for the document
-            doc_id = str(uuid.uuid4())
-            
-            # Create vector with metadata
-            vector = {
-                "id": doc_id,
-                "values": embedding,
-                "metadata": {
-                    "text": text,
-                    **metadata
-                }
-            }
-            
             # Upsert to vector store
-            return self.vector_store.upsert([vector])
+            return bool(self.vector_store.upsert([self.build_vector(text, metadata, embedding)]))
         except Exception as e:
             logger.error(f"Failed to add document: {str(e)}")
             return False
@@ -52,7 +52,7 @@ class RAGService:
         """Add multiple documents to the vector store.
         
         Args:
-            documents: List of dictionaries with 'text' and 'metadata'
+            documents: List of dictionaries with 'text', 'metadata' and optionally 'id'
             
         Returns:
             bool: Success status
@@ -60,34 +60,49 @@ class RAGService:
         try:
             vectors = []
             
-            for doc in documents:
-                text = doc["text"]
-                metadata = doc["metadata"]
-                
-                # Get embedding for the text
-                embedding = self.openai.get_embedding(text)
-                
-                # Create a unique ID for the document
-                doc_id = str(uuid.uuid4())
-                
-                # Create vector with metadata
-                vector = {
-                    "id": doc_id,
-                    "values": embedding,
-                    "metadata": {
-                        "text": text,
-                        **metadata
-                    }
-                }
-                
-                vectors.append(vector)
+            # Embed all documents in as few batched API calls as possible
+            embeddings = self.openai.get_embeddings([doc["text"] for doc in documents])
+            
+            for doc, embedding in zip(documents, embeddings):
+                vectors.append(self.build_vector(doc["text"], doc["metadata"], embedding, doc.get("id")))
             
             # Upsert to vector store
-            return self.vector_store.upsert(vectors)
+            return bool(self.vector_store.upsert(vectors))
         except Exception as e:
             logger.error(f"Failed to add documents: {str(e)}")
             return False
     
+    def build_vector(
+        self,
+        text: str,
+        metadata: Dict[str, Any],
+        embedding: List[float],
+        doc_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build a vector store record for an embedded document.
+        
+        Args:
+            text: The document text
+            metadata: Metadata for the document
+            embedding: Embedding vector for the text
+            doc_id: Stable ID for the document (random if not provided)
+            
+        Returns:
+            Dict[str, Any]: Vector with 'id', 'values' and 'metadata'
+        """
+        # Create a unique ID for the document unless the caller has a stable one
+        doc_id = doc_id or str(uuid.uuid4())
+        
+        # Create vector with metadata
+        return {
+            "id": doc_id,
+            "values": embedding,
+            "metadata": {
+                "text": text,
+                **metadata
+            }
+        }
+    
     def retrieve_relevant_context(
         self, 
         query: str, 
@@ -119,6 +134,7 @@ class RAGService:
             documents = []
             for match in results.get("matches", []):
                 documents.append({
+                    "id": match["id"] if "id" in match else None,
                     "text": match["metadata"]["text"],
                     "metadata": {k: v for k, v in match["metadata"].items() if k != "text"},
                     "score": match["score"]
@@ -129,11 +145,19 @@ class RAGService:
             logger.error(f"Failed to retrieve context: {str(e)}")
             return []
     
-    def generate_campaign(self, campaign_brief: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_campaign(
+        self,
+        campaign_brief: Dict[str, Any],
+        use_cache: bool = True,
+        on_section: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
         """Generate a campaign specification based on a brief.
         
         Args:
             campaign_brief: Dictionary containing campaign brief information
+            use_cache: Serve and store the specification in the response cache
+            on_section: If given, the completion is streamed and this is called
+                with each top-level section of the spec as soon as it is complete
             
         Returns:
             Dict[str, Any]: Campaign specification in Meta API format
@@ -142,37 +166,34 @@ class RAGService:
             # Convert campaign brief to a query string
             query = self._brief_to_query(campaign_brief)
             
-            # Retrieve relevant context
-            relevant_docs = self.retrieve_relevant_context(query)
-            
-            # Format context for the prompt
-            context = self._format_context(relevant_docs)
+            # Retrieve more candidates than fit; the context packer picks within its budget
+            relevant_docs = self.retrieve_relevant_context(query, top_k=config.retrieval.top_k)
             
-            # Generate system message with context
-            system_message = self._generate_system_message(context)
-            
-            # Format the user message with campaign brief
-            user_message = self._format_user_message(campaign_brief)
+            cache = self.response_cache if use_cache else None
+            if cache is not None:
+                key, scope = self._response_cache_key("campaign", campaign_brief, relevant_docs)
+                embedding, cached = self._cached_response(cache, key, scope, campaign_brief)
+                if cached is not None:
+                    if on_section is not None:
+                        for section, value in cached.items():
+                            on_section(section, value)
+                    return cached
             
             # Create messages array
-            messages = [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ]
+            messages = self._campaign_messages(campaign_brief, relevant_docs)
             
             # Get completion with JSON response
-            response = self.openai.get_completion(
-                messages=messages,
-                response_format={"type": "json_object"}
-            )
-            
-            # Parse and validate the response
-            campaign_spec = json.loads(response)
-            
-            # Ensure the response has the required Meta API structure
-            if not self._validate_meta_api_structure(campaign_spec):
-                raise ValueError("Generated campaign specification does not match Meta API structure")
-            
+            if on_section is None:
+                response = self.openai.get_completion(
+                    messages=messages,
+                    response_format={"type": "json_object"}
+                )
+            else:
+                response = self._stream_campaign_sections(messages, on_section)
+            
+            campaign_spec = self._parse_campaign_spec(response)
+            if cache is not None:
+                cache.put(key, campaign_spec, scope, embedding)
             return campaign_spec
         except Exception as e:
             logger.error(f"Failed to generate campaign: {str(e)}")
@@ -181,6 +202,123 @@ class RAGService:
                 "status": "failed"
             }
     
+    def _stream_campaign_sections(
+        self,
+        messages: List[Dict[str, str]],
+        on_section: Callable[[str, Any], None]
+    ) -> str:
+        """Stream a JSON campaign completion, reporting sections as they complete.
+        
+        Args:
+            messages: The prompt messages
+            on_section: Called with the name and value of each completed section
+            
+        Returns:
+            str: The full completion text
+        """
+        parser = JsonSectionParser()
+        for piece in self.openai.stream_completion(
+            messages=messages,
+            response_format={"type": "json_object"}
+        ):
+            for section, value in parser.feed(piece):
+                on_section(section, value)
+        return parser.buffer
+    
+    def _campaign_messages(
+        self,
+        campaign_brief: Dict[str, Any],
+        relevant_docs: List[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for generating a campaign.
+        
+        Args:
+            campaign_brief: Dictionary containing campaign brief information
+            relevant_docs: Retrieved documents to use as context
+            
+        Returns:
+            List[Dict[str, str]]: System and user messages
+        """
+        # Pack context for the prompt; kept local, as concurrent requests share this service
+        packed = self._pack_context(relevant_docs)
+        
+        # Generate system message with context
+        system_message = self._generate_system_message(packed.text)
+        
+        # Format the user message with campaign brief
+        user_message = self._format_user_message(campaign_brief)
+        
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+    
+    def _parse_campaign_spec(self, response: str) -> Dict[str, Any]:
+        """Parse a JSON completion into a campaign specification.
+        
+        Args:
+            response: Completion text
+            
+        Returns:
+            Dict[str, Any]: Campaign specification in Meta API format
+        """
+        # Parse and validate the response
+        campaign_spec = json.loads(response)
+        
+        # Ensure the response has the required Meta API structure
+        if not self._validate_meta_api_structure(campaign_spec):
+            raise ValueError("Generated campaign specification does not match Meta API structure")
+        
+        return campaign_spec
+    
+    def _response_cache_key(
+        self,
+        kind: str,
+        request: Any,
+        documents: List[Dict[str, Any]]
+    ) -> Tuple[str, str]:
+        """Response cache key and semantic scope for a request.
+        
+        The scope covers everything besides the request that shapes the
+        response (model, temperature, prompt version); the key adds the
+        normalized request and the IDs of the retrieved chunks.
+        
+        Args:
+            kind: Type of response, e.g. "campaign" or "query"
+            request: Campaign brief or query text
+            documents: Retrieved documents the prompt is built from
+            
+        Returns:
+            Tuple[str, str]: Exact cache key and semantic scope
+        """
+        scope = make_key(
+            kind=kind,
+            model=self.openai.model,
+            temperature=self.openai.temperature,
+            prompt_version=PROMPT_VERSION
+        )
+        # Documents without an ID are identified by their text
+        chunks = [doc.get("id") or doc["text"] for doc in documents]
+        return make_key(scope=scope, chunks=chunks, request=normalize_brief(request)), scope
+    
+    def _cached_response(self, cache: ResponseCache, key: str, scope: str, request: Any) -> Tuple[Optional[List[float]], Any]:
+        """Look a request up in the response cache, exact tier first.
+        
+        Returns:
+            Tuple: The request embedding if the semantic tier computed one, and the cached response or None
+        """
+        cached = cache.get(key)
+        if cached is not None or not config.cache.semantic_cache_enabled:
+            return None, cached
+        embedding = self.openai.get_embedding(self._semantic_cache_text(request))
+        return embedding, cache.get_similar(scope, embedding, config.cache.semantic_cache_threshold)
+    
+    def _semantic_cache_text(self, request: Any) -> str:
+        """Text embedded to find semantically similar cached requests."""
+        if isinstance(request, str):
+            return normalize_brief(request)
+        return json.dumps(normalize_brief(request), sort_keys=True)
+    
     def _brief_to_query(self, campaign_brief: Dict[str, Any]) -> str:
         """Convert campaign brief to a query string.
         
@@ -201,25 +339,16 @@ class RAGService:
         
         return query
     
-    def _format_context(self, documents: List[Dict[str, Any]]) -> str:
-        """Format retrieved documents into context string.
+    def _pack_context(self, documents: List[Dict[str, Any]]) -> PackedContext:
+        """Format retrieved documents into a context within the token budget.
         
         Args:
             documents: List of retrieved documents
             
         Returns:
-            str: Formatted context
+            PackedContext: Formatted context and the documents and tokens it used
         """
-        context_parts = []
-        
-        for i, doc in enumerate(documents):
-            text = doc["text"]
-            metadata = doc["metadata"]
-            source = metadata.get("source", "Unknown")
-            
-            context_parts.append(f"Document {i+1} from {source}:\n{text}\n")
-        
-        return "\n".join(context_parts)
+        return self.context_packer.pack(documents)
     
     def _generate_system_message(self, context: str) -> str:
         """Generate system message with retrieved context.
@@ -360,12 +489,13 @@ Respond with a complete campaign specification in JSON format with the following
         
         return user_message
 
-    def query(self, query_text: str, top_k: int = 5) -> str:
+    def query(self, query_text: str, top_k: int = 5, use_cache: bool = True) -> str:
         """Query the RAG system with a natural language question.
         
         Args:
             query_text: The question or query text
             top_k: Number of documents to retrieve
+            use_cache: Serve and store the answer in the response cache
             
         Returns:
             str: Generated response that answers the query
@@ -377,32 +507,89 @@ Respond with a complete campaign specification in JSON format with the following
             # Store the retrieved chunks for later access
             self.last_context_chunks = context_chunks
             
-            # Format context for the prompt
-            context = self._format_context(context_chunks)
-            
-            # Create system message
-            system_message = f"""You are a knowledgeable assistant specialized in Meta/Facebook advertising best practices.
-Use the following retrieved information to answer the user's question.
-If you don't know the answer based on the provided information, say so - don't make up information.
-
-Retrieved information:
-{context}"""
+            cache = self.response_cache if use_cache else None
+            if cache is not None:
+                key, scope = self._response_cache_key("query", query_text, context_chunks)
+                embedding, cached = self._cached_response(cache, key, scope, query_text)
+                if cached is not None:
+                    return cached
             
             # Create messages for completion
-            messages = [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": query_text}
-            ]
+            messages = self._query_messages(query_text, context_chunks)
             
             # Get completion
             response = self.openai.get_completion(messages=messages)
             
+            if cache is not None:
+                cache.put(key, response, scope, embedding)
             return response
             
         except Exception as e:
             logger.error(f"Error during query: {str(e)}")
             return f"An error occurred: {str(e)}"
 
+    def query_stream(self, query_text: str, top_k: int = 5, use_cache: bool = True) -> Iterator[str]:
+        """Query the RAG system, yielding the answer as it is generated.
+        
+        Args:
+            query_text: The question or query text
+            top_k: Number of documents to retrieve
+            use_cache: Serve and store the answer in the response cache
+            
+        Yields:
+            str: Pieces of the generated answer
+        """
+        try:
+            context_chunks = self.retrieve_relevant_context(query_text, top_k=top_k)
+            self.last_context_chunks = context_chunks
+            
+            cache = self.response_cache if use_cache else None
+            if cache is not None:
+                key, scope = self._response_cache_key("query", query_text, context_chunks)
+                embedding, cached = self._cached_response(cache, key, scope, query_text)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            messages = self._query_messages(query_text, context_chunks)
+            
+            pieces = []
+            for piece in self.openai.stream_completion(messages=messages):
+                pieces.append(piece)
+                yield piece
+            
+            if cache is not None:
+                cache.put(key, "".join(pieces), scope, embedding)
+        except Exception as e:
+            logger.error(f"Error during query: {str(e)}")
+            yield f"An error occurred: {str(e)}"
+
+    def _query_messages(self, query_text: str, context_chunks: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Build the chat messages for answering a question.
+        
+        Args:
+            query_text: The question or query text
+            context_chunks: Retrieved documents to use as context
+            
+        Returns:
+            List[Dict[str, str]]: System and user messages
+        """
+        # Pack context for the prompt
+        context = self._pack_context(context_chunks).text
+        
+        # Create system message
+        system_message = f"""You are a knowledgeable assistant specialized in Meta/Facebook advertising best practices.
+Use the following retrieved information to answer the user's question.
+If you don't know the answer based on the provided information, say so - don't make up information.
+
+Retrieved information:
+{context}"""
+        
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": query_text}
+        ]
+
     def _validate_meta_api_structure(self, campaign_spec: Dict[str, Any]) -> bool:
         """Validate that the campaign specification matches Meta API structure.
         
@@ -0,0 +1,123 @@
+import logging
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix product when assigning vectors, to bound peak memory
+_ASSIGN_BLOCK_ROWS = 8192
+
+class IVFQuantizer:
+    """Coarse quantizer for an IVF-flat index.
+    
+    Centroids are trained with spherical k-means on L2-normalized vectors.
+    Every stored vector is assigned to its nearest centroid (its inverted
+    list); a query scores only the vectors in its `nprobe` nearest lists.
+    Raising `nprobe` trades latency for recall, up to exact search when
+    `nprobe == nlist`.
+    """
+    
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+        
+    @staticmethod
+    def default_nlist(size: int) -> int:
+        """Rule-of-thumb list count of about 4 * sqrt(n)."""
+        return max(1, min(size, int(4 * np.sqrt(size))))
+        
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        iterations: int = 10,
+        seed: int = 0
+    ) -> "IVFQuantizer":
+        """Train centroids with spherical k-means.
+        
+        Args:
+            vectors: L2-normalized training vectors
+            nlist: Number of inverted lists (centroids)
+            iterations: Number of k-means iterations
+            seed: Seed for initialization and empty-cluster reseeding
+            
+        Returns:
+            IVFQuantizer: The trained quantizer
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[0] == 0:
+            raise ValueError("Cannot train IVF quantizer without vectors")
+        nlist = max(1, min(nlist, vectors.shape[0]))
+        
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(vectors.shape[0], size=nlist, replace=False)].copy()
+        quantizer = cls(centroids)
+        
+        for _ in range(iterations):
+            assignments = quantizer.assign(vectors)
+            
+            # Sum members per list with one sorted reduceat instead of np.add.at
+            counts = np.bincount(assignments, minlength=nlist)
+            order = np.argsort(assignments, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(vectors[order], starts[filled], axis=0)
+            
+            # Reseed empty lists from random training vectors
+            empty = np.flatnonzero(counts == 0)
+            if empty.size:
+                sums[empty] = vectors[rng.choice(vectors.shape[0], size=empty.size)]
+                
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+            quantizer.centroids = centroids
+            
+        return quantizer
+        
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Return the nearest-centroid list ID for each vector."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        assignments = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], _ASSIGN_BLOCK_ROWS):
+            block = vectors[start:start + _ASSIGN_BLOCK_ROWS]
+            assignments[start:start + block.shape[0]] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignments
+        
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return the IDs of the `nprobe` lists closest to the query."""
+        nprobe = max(1, min(nprobe, self.nlist))
+        scores = self.centroids @ query
+        if nprobe == self.nlist:
+            return np.arange(self.nlist)
+        return np.argpartition(-scores, nprobe - 1)[:nprobe]
+        
+    def save(self, path: str) -> None:
+        np.save(path, self.centroids)
+        
+    @classmethod
+    def load(cls, path: str) -> "IVFQuantizer":
+        return cls(np.load(path, mmap_mode='r'))
+
+def recall_at_k(exact: List[List[str]], approximate: List[List[str]]) -> float:
+    """Mean fraction of the exact top-k IDs found by the approximate search.
+    
+    Args:
+        exact: Exact top-k result IDs, one list per query
+        approximate: Approximate top-k result IDs, one list per query
+        
+    Returns:
+        float: Recall@k averaged over queries
+    """
+    recalls = [
+        len(set(truth) & set(found)) / len(truth)
+        for truth, found in zip(exact, approximate)
+        if truth
+    ]
+    return float(np.mean(recalls)) if recalls else 1.0
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+
+from src.database.vector_store import VectorStore, UpsertReport
+
+logger = logging.getLogger(__name__)
+
+class AsyncVectorStore:
+    """Awaitable interface over a `VectorStore`.
+    
+    Neither backend has a native asyncio client, so each call runs on the
+    default thread pool via `asyncio.to_thread`. Return values and error
+    handling are those of `VectorStore`.
+    """
+    
+    def __init__(self, store: Optional[VectorStore] = None):
+        self.store = store or VectorStore()
+    
+    async def upsert(self, vectors: List[Dict[str, Any]]) -> UpsertReport:
+        return await asyncio.to_thread(self.store.upsert, vectors)
+    
+    async def query(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.store.query, query_vector, top_k, filter)
+    
+    async def delete(self, ids: List[str]) -> bool:
+        return await asyncio.to_thread(self.store.delete, ids)
+    
+    async def delete_all(self) -> bool:
+        return await asyncio.to_thread(self.store.delete_all)
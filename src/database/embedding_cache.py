@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config.config import config
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Content-addressed embedding cache.
+    
+    Embeddings are keyed by (embedding model, SHA-256 of the normalized text).
+    An in-process LRU sits in front of a SQLite store whose size is capped by
+    evicting the least recently used rows.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 200000,
+        memory_entries: int = 4096
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_config(cls) -> "EmbeddingCache":
+        """Create a cache using the application config."""
+        return cls(
+            path=os.path.join(config.cache.directory, "embeddings.sqlite3"),
+            max_entries=config.cache.embedding_cache_max_entries,
+            memory_entries=config.cache.embedding_cache_memory_entries
+        )
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text the same way it is sent to the embeddings endpoint."""
+        return text.replace("\n", " ")
+    
+    @classmethod
+    def make_key(cls, text: str) -> str:
+        """Return the content hash for a text."""
+        return hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite store on first use."""
+        if self._conn is None:
+            dir_name = os.path.dirname(self.path)
+            if dir_name:
+                os.makedirs(dir_name, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, key)
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def _remember(self, cache_key: Tuple[str, str], vector: List[float]) -> None:
+        """Insert into the in-process LRU, evicting the oldest entry if full."""
+        self._memory[cache_key] = vector
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up cached embeddings for several texts.
+        
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+            
+        Returns:
+            List[Optional[List[float]]]: Cached vectors, None for misses
+        """
+        keys = [self.make_key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get((model, key))
+                if vector is not None:
+                    self._memory.move_to_end((model, key))
+                    results[i] = vector
+                    self.memory_hits += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+            
+            if not pending:
+                return results
+            
+            try:
+                conn = self._connect()
+                found = {}
+                pending_keys = list(pending)
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(pending_keys), 500):
+                    chunk = pending_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                        [model, *chunk]
+                    ).fetchall()
+                    found.update(rows)
+                
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE model = ? AND key = ?",
+                        [(now, model, key) for key in found]
+                    )
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to read embedding cache: {str(e)}")
+                found = {}
+            
+            for key, indices in pending.items():
+                blob = found.get(key)
+                if blob is None:
+                    self.misses += len(indices)
+                    continue
+                vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                self._remember((model, key), vector)
+                for i in indices:
+                    results[i] = vector
+                self.disk_hits += len(indices)
+        
+        return results
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up a cached embedding for a single text."""
+        return self.get_many(model, [text])[0]
+    
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store embeddings for several texts.
+        
+        Args:
+            model: Embedding model name
+            texts: Texts that were embedded
+            vectors: Their embedding vectors, in the same order
+        """
+        now = time.time()
+        rows = []
+        
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(text)
+                self._remember((model, key), vector)
+                rows.append((model, key, np.asarray(vector, dtype=np.float32).tobytes(), now))
+            
+            try:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, key, vector, last_access) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write embedding cache: {str(e)}")
+    
+    def put(self, model: str, text: str, vector: List[float]) -> None:
+        """Store the embedding for a single text."""
+        self.put_many(model, [text], [vector])
+    
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used rows beyond the size cap."""
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                """DELETE FROM embeddings WHERE rowid IN (
+                    SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?
+                )""",
+                (overflow,)
+            )
+            logger.debug(f"Evicted {overflow} embeddings from cache")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the cache."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory)
+        }
+    
+    def clear(self) -> None:
+        """Remove every cached embedding."""
+        with self._lock:
+            self._memory.clear()
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM embeddings")
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to clear embedding cache: {str(e)}")
+    
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
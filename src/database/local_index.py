@@ -0,0 +1,470 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.database.vector_backends import VectorBackend
+from src.database.metadata_columns import ColumnarMetadata
+from src.database.segments import Segment, MANIFEST_FILE, write_json_atomic
+from src.database.ann_index import IVFQuantizer, recall_at_k
+
+logger = logging.getLogger(__name__)
+
+class NamespaceIndex:
+    """Vectors, IDs and metadata for one namespace of the local index.
+    
+    Each upsert appends an immutable segment of L2-normalized float32 vectors
+    (see `Segment`) and records it in a small JSON manifest. Opening a
+    namespace only reads the manifest; vectors are memory-mapped and scored
+    segment by segment. Replaced or deleted rows are tombstoned in the
+    manifest, and `compact` merges segments and drops those rows. A single
+    writer process is assumed; readers pick up its changes on their next query.
+    
+    With `ann` enabled, an IVF-flat quantizer is trained once the namespace
+    holds `ann_min_vectors` vectors, and queries score only the rows in the
+    `nprobe` nearest inverted lists. New rows are assigned to lists as they
+    are inserted; call `build_ann` to retrain after the corpus shifts.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        dimension: int,
+        max_segments: int = 8,
+        ann: bool = False,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        ann_min_vectors: int = 10000
+    ):
+        self.path = path
+        self.dimension = dimension
+        self.max_segments = max_segments
+        self.ann = ann
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ann_min_vectors = ann_min_vectors
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        
+        self._segments: List[Segment] = []
+        self._next_segment = 0
+        self._manifest_stat: Optional[Tuple[int, int]] = None
+        # id -> (segment, row); only built when a write needs it
+        self._locations: Optional[Dict[str, Tuple[Segment, int]]] = None
+        self._ivf_name: Optional[str] = None
+        self._quantizer: Optional[IVFQuantizer] = None
+        
+        self._load()
+        
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(segment.live_count() for segment in self._segments)
+            
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_FILE)
+        
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+        
+    def _stat_manifest(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+        
+    def _load(self) -> None:
+        """Read the manifest; segment data is opened lazily."""
+        if not os.path.exists(self.manifest_path):
+            return
+            
+        with open(self.manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest["dimension"] != self.dimension:
+            raise ValueError(f"Index at {self.path} has dimension {manifest['dimension']}, expected {self.dimension}")
+            
+        # Reuse open segments so their memory maps and sidecars stay loaded
+        existing = {segment.name: segment for segment in self._segments}
+        segments = []
+        for entry in manifest["segments"]:
+            segment = existing.get(entry["name"])
+            if segment is None:
+                segment = Segment(self.path, entry["name"], entry["rows"], self.dimension, entry["deleted"])
+            else:
+                segment.deleted = set()
+                segment.mark_deleted(entry["deleted"])
+            segments.append(segment)
+            
+        self._segments = segments
+        self._next_segment = manifest["next_segment"]
+        
+        ivf_name = manifest.get("ivf")
+        if ivf_name != self._ivf_name:
+            self._ivf_name = ivf_name
+            self._quantizer = IVFQuantizer.load(self._centroids_path(ivf_name)) if ivf_name else None
+        self._manifest_stat = self._stat_manifest()
+        self._locations = None
+        
+    def _refresh(self) -> None:
+        """Reload the manifest if another process has rewritten it."""
+        if self._stat_manifest() != self._manifest_stat:
+            self._load()
+            
+    def _write_manifest(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        write_json_atomic(self.manifest_path, {
+            "dimension": self.dimension,
+            "next_segment": self._next_segment,
+            "ivf": self._ivf_name,
+            "segments": [segment.to_manifest() for segment in self._segments]
+        })
+        self._manifest_stat = self._stat_manifest()
+        
+    def _allocate_segment_name(self, prefix: str = "seg") -> str:
+        name = f"{prefix}-{self._next_segment:06d}"
+        self._next_segment += 1
+        return name
+        
+    def _centroids_path(self, ivf_name: str) -> str:
+        return os.path.join(self.path, f"{ivf_name}.npy")
+        
+    def _id_locations(self) -> Dict[str, Tuple[Segment, int]]:
+        if self._locations is None:
+            locations = {}
+            for segment in self._segments:
+                alive = segment.alive_mask()
+                for row, vector_id in enumerate(segment.ids):
+                    if alive[row]:
+                        locations[vector_id] = (segment, row)
+            self._locations = locations
+        return self._locations
+        
+    def _tombstone(self, ids: List[str]) -> None:
+        locations = self._id_locations()
+        rows_by_segment: Dict[str, Tuple[Segment, List[int]]] = {}
+        for vector_id in ids:
+            location = locations.pop(vector_id, None)
+            if location is not None:
+                segment, row = location
+                rows_by_segment.setdefault(segment.name, (segment, []))[1].append(row)
+        for segment, rows in rows_by_segment.values():
+            segment.mark_deleted(rows)
+            
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        if not vectors:
+            return
+            
+        # The last occurrence of an ID within a batch wins
+        vectors = list({vector["id"]: vector for vector in vectors}.values())
+        
+        matrix = np.asarray([vector["values"] for vector in vectors], dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got shape {matrix.shape}")
+        matrix = self._normalize(matrix)
+        
+        ids = [vector["id"] for vector in vectors]
+        metadata = ColumnarMetadata()
+        for vector in vectors:
+            metadata.append(vector.get("metadata", {}))
+            
+        with self._lock:
+            self._refresh()
+            segment = Segment.write(self.path, self._allocate_segment_name(), matrix, ids, metadata)
+            if self._quantizer is not None:
+                segment.set_lists(self._ivf_name, self._quantizer.assign(matrix))
+            self._tombstone(ids)
+            self._segments.append(segment)
+            locations = self._id_locations()
+            for row, vector_id in enumerate(ids):
+                locations[vector_id] = (segment, row)
+            self._write_manifest()
+            
+            if self.ann and self._quantizer is None and len(self) >= self.ann_min_vectors:
+                self.build_ann()
+                
+            if len(self._segments) > self.max_segments:
+                self.compact_in_background()
+                
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        exact: bool = False
+    ) -> Dict[str, Any]:
+        """Return the top-k rows by cosine similarity.
+        
+        Uses the IVF lists when they exist unless `exact` is set.
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            raise ValueError(f"Expected query of dimension {self.dimension}, got shape {query.shape}")
+        query = self._normalize(query)
+        
+        with self._lock:
+            self._refresh()
+            segments = list(self._segments)
+            masks = [segment.alive_mask() for segment in segments]
+            ivf_name, quantizer = self._ivf_name, self._quantizer
+            # Open segment files now so a concurrent compaction can't unlink them first
+            for segment in segments:
+                segment.vectors
+                segment.ids
+                
+        probed = None
+        if quantizer is not None and not exact and self.nprobe < quantizer.nlist:
+            probed = np.zeros(quantizer.nlist, dtype=bool)
+            probed[quantizer.probe(query, self.nprobe)] = True
+            
+        scores_parts = []
+        refs = []
+        for index, (segment, mask) in enumerate(zip(segments, masks)):
+            if probed is not None:
+                lists = segment.get_lists(ivf_name)
+                # Segments without assignments are searched exhaustively
+                if lists is not None:
+                    mask = mask & probed[lists]
+            if filter:
+                mask = mask & segment.metadata.evaluate(filter)
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                continue
+            # Skip the gather when every row is a candidate
+            if rows.size == segment.rows:
+                scores_parts.append(segment.vectors @ query)
+            else:
+                scores_parts.append(segment.vectors[rows] @ query)
+            refs.append((index, rows))
+            
+        if not scores_parts or top_k <= 0:
+            return {"matches": []}
+            
+        scores = np.concatenate(scores_parts)
+        segment_index = np.concatenate([np.full(rows.size, index) for index, rows in refs])
+        segment_rows = np.concatenate([rows for _, rows in refs])
+        
+        k = min(top_k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        matches = []
+        for position in top:
+            segment = segments[segment_index[position]]
+            row = segment_rows[position]
+            matches.append({
+                "id": segment.ids[row],
+                "score": float(scores[position]),
+                "metadata": segment.metadata.row(row)
+            })
+        return {"matches": matches}
+        
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            self._refresh()
+            self._tombstone(ids)
+            self._write_manifest()
+            
+    def delete_all(self) -> None:
+        with self._lock:
+            self._refresh()
+            segments = self._segments
+            self._segments = []
+            self._locations = {}
+            self._write_manifest()
+            for segment in segments:
+                segment.remove_files()
+                
+    def compact(self) -> bool:
+        """Merge all segments into one, dropping deleted and superseded rows.
+        
+        The merged segment is written without holding the index lock, so
+        queries and writes continue meanwhile. Rows deleted during the merge
+        are carried over as tombstones on the merged segment. If any merged
+        segment is gone by then, e.g. after `delete_all`, the merge is
+        discarded rather than bringing its rows back.
+        
+        Returns:
+            bool: True if a compaction was performed
+        """
+        with self._compaction_lock:
+            with self._lock:
+                self._refresh()
+                snapshot = list(self._segments)
+                if len(snapshot) <= 1 and not any(segment.deleted for segment in snapshot):
+                    return False
+                deleted_snapshot = {segment.name: set(segment.deleted) for segment in snapshot}
+                name = self._allocate_segment_name()
+                
+            # Use the snapshot's tombstones, not any added since
+            kept_rows = [
+                np.setdiff1d(np.arange(segment.rows), np.fromiter(deleted_snapshot[segment.name], dtype=np.int64))
+                for segment in snapshot
+            ]
+            
+            vectors = np.concatenate(
+                [np.asarray(segment.vectors[rows]) for segment, rows in zip(snapshot, kept_rows)]
+                or [np.empty((0, self.dimension), dtype=np.float32)]
+            )
+            ids = []
+            metadata = ColumnarMetadata()
+            for segment, rows in zip(snapshot, kept_rows):
+                for row in rows:
+                    ids.append(segment.ids[row])
+                    metadata.append(segment.metadata.row(row))
+                    
+            merged = Segment.write(self.path, name, vectors, ids, metadata) if ids else None
+            
+            with self._lock:
+                ivf_name = self._ivf_name
+            if merged is not None and ivf_name is not None:
+                lists = [segment.get_lists(ivf_name) for segment in snapshot]
+                if all(segment_lists is not None for segment_lists in lists):
+                    merged.set_lists(ivf_name, np.concatenate(
+                        [segment_lists[rows] for segment_lists, rows in zip(lists, kept_rows)]
+                    ))
+                    
+            with self._lock:
+                self._refresh()
+                current = {id(segment) for segment in self._segments}
+                if not all(id(segment) in current for segment in snapshot):
+                    if merged is not None:
+                        merged.remove_files()
+                    logger.info(f"Discarded compaction at {self.path}: its segments were removed meanwhile")
+                    return False
+                    
+                # Carry over rows that were deleted while the merge was running
+                late_deleted = []
+                offset = 0
+                for segment, rows in zip(snapshot, kept_rows):
+                    late = segment.deleted - deleted_snapshot[segment.name]
+                    if late:
+                        positions = np.searchsorted(rows, sorted(late))
+                        late_deleted.extend((positions + offset).tolist())
+                    offset += rows.size
+                    
+                remaining = [segment for segment in self._segments if segment not in snapshot]
+                if merged is not None:
+                    merged.mark_deleted(late_deleted)
+                    remaining.insert(0, merged)
+                self._segments = remaining
+                self._locations = None
+                self._write_manifest()
+                
+            for segment in snapshot:
+                segment.remove_files()
+                
+            logger.info(f"Compacted {len(snapshot)} segments into {len(ids)} rows at {self.path}")
+            return True
+            
+    def build_ann(self, nlist: Optional[int] = None, sample_size: int = 65536, seed: int = 0) -> None:
+        """Train the IVF quantizer and assign every stored row to a list.
+        
+        Args:
+            nlist: Number of inverted lists (default: `self.nlist` or ~4*sqrt(n))
+            sample_size: Maximum number of live vectors used for training
+            seed: Random seed for sampling and k-means
+        """
+        with self._lock:
+            self._refresh()
+            live = [(segment, np.flatnonzero(segment.alive_mask())) for segment in self._segments]
+            total = sum(rows.size for _, rows in live)
+            if total == 0:
+                return
+                
+            # Sample training rows uniformly across segments
+            rng = np.random.default_rng(seed)
+            fraction = min(1.0, sample_size / total)
+            sample = np.concatenate([
+                np.asarray(segment.vectors[np.sort(rng.choice(rows, size=max(1, int(rows.size * fraction)), replace=False))])
+                for segment, rows in live if rows.size
+            ])
+            
+            nlist = nlist or self.nlist or IVFQuantizer.default_nlist(total)
+            quantizer = IVFQuantizer.train(sample, nlist, seed=seed)
+            
+            old_ivf_name = self._ivf_name
+            ivf_name = self._allocate_segment_name("ivf")
+            quantizer.save(self._centroids_path(ivf_name))
+            for segment in self._segments:
+                segment.set_lists(ivf_name, quantizer.assign(segment.vectors))
+                
+            self._ivf_name = ivf_name
+            self._quantizer = quantizer
+            self._write_manifest()
+            
+            if old_ivf_name is not None:
+                for segment in self._segments:
+                    segment.remove_lists(old_ivf_name)
+                os.remove(self._centroids_path(old_ivf_name))
+                
+            logger.info(f"Built IVF index with {quantizer.nlist} lists over {total} vectors at {self.path}")
+            
+    def recall_at_k(self, queries: List[List[float]], top_k: int = 10) -> float:
+        """Measure ANN recall@k against exact search for a set of queries."""
+        exact = [[m["id"] for m in self.query(q, top_k, exact=True)["matches"]] for q in queries]
+        approximate = [[m["id"] for m in self.query(q, top_k)["matches"]] for q in queries]
+        return recall_at_k(exact, approximate)
+        
+    def compact_in_background(self) -> threading.Thread:
+        """Start `compact` on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._compaction_thread is None or not self._compaction_thread.is_alive():
+                self._compaction_thread = threading.Thread(target=self._run_compaction, daemon=True)
+                self._compaction_thread.start()
+            return self._compaction_thread
+            
+    def _run_compaction(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Failed to compact local index at {self.path}: {str(e)}")
+
+class LocalVectorIndex(VectorBackend):
+    """In-process vector index persisted under a local directory.
+    
+    Each namespace is stored in its own subdirectory and loaded on first use.
+    Keyword options (`max_segments`, `ann`, `nlist`, `nprobe`,
+    `ann_min_vectors`) are passed through to every `NamespaceIndex`.
+    """
+    
+    def __init__(self, path: str, dimension: int = 1536, **options: Any):
+        self.path = path
+        self.dimension = dimension
+        self.options = options
+        self._namespaces: Dict[str, NamespaceIndex] = {}
+        self._lock = threading.Lock()
+        
+    def namespace(self, namespace: str) -> NamespaceIndex:
+        """Return the index for a namespace, loading it from disk if needed."""
+        with self._lock:
+            index = self._namespaces.get(namespace)
+            if index is None:
+                index = NamespaceIndex(os.path.join(self.path, namespace), self.dimension, **self.options)
+                self._namespaces[namespace] = index
+            return index
+            
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        self.namespace(namespace).upsert(vectors)
+        
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return self.namespace(namespace).query(vector, top_k, filter)
+        
+    def delete(self, ids: List[str], namespace: str) -> None:
+        self.namespace(namespace).delete(ids)
+        
+    def delete_all(self, namespace: str) -> None:
+        self.namespace(namespace).delete_all()
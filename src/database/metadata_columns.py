@@ -0,0 +1,149 @@
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+# Marker for rows that don't have a value for a metadata field
+_MISSING = object()
+
+class ColumnarMetadata:
+    """Metadata stored column by column so filters evaluate over whole arrays.
+    
+    Supports the Pinecone filter language: $eq, $ne, $in, $nin, $gt, $gte,
+    $lt, $lte, $exists, $and and $or. A bare value is shorthand for $eq.
+    """
+    
+    def __init__(self):
+        self._columns: Dict[str, List[Any]] = {}
+        self._size = 0
+        self._object_cache: Dict[str, np.ndarray] = {}
+        self._numeric_cache: Dict[str, np.ndarray] = {}
+        
+    def __len__(self) -> int:
+        return self._size
+        
+    def append(self, metadata: Dict[str, Any]) -> None:
+        """Append one row of metadata."""
+        for name in metadata:
+            if name not in self._columns:
+                self._columns[name] = [_MISSING] * self._size
+        for name, column in self._columns.items():
+            column.append(metadata.get(name, _MISSING))
+        self._size += 1
+        self._object_cache.clear()
+        self._numeric_cache.clear()
+        
+    def row(self, index: int) -> Dict[str, Any]:
+        """Return the metadata for one row as a dictionary."""
+        return {
+            name: column[index]
+            for name, column in self._columns.items()
+            if column[index] is not _MISSING
+        }
+        
+    def rows(self, indices: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Return metadata dictionaries for the given rows (all rows by default)."""
+        if indices is None:
+            indices = range(self._size)
+        return [self.row(i) for i in indices]
+        
+    def _object_column(self, name: str) -> np.ndarray:
+        column = self._object_cache.get(name)
+        if column is None:
+            column = np.empty(self._size, dtype=object)
+            column[:] = self._columns.get(name, [_MISSING] * self._size)
+            self._object_cache[name] = column
+        return column
+        
+    def _numeric_column(self, name: str) -> np.ndarray:
+        column = self._numeric_cache.get(name)
+        if column is None:
+            # Non-numeric and missing values become NaN, which fails every comparison
+            column = np.fromiter(
+                (
+                    float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                    for value in self._columns.get(name, [_MISSING] * self._size)
+                ),
+                dtype=np.float64,
+                count=self._size
+            )
+            self._numeric_cache[name] = column
+        return column
+        
+    def evaluate(self, filter: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Evaluate a metadata filter into a boolean mask over all rows."""
+        mask = np.ones(self._size, dtype=bool)
+        if not filter:
+            return mask
+            
+        for key, condition in filter.items():
+            if key == "$and":
+                for sub_filter in condition:
+                    mask &= self.evaluate(sub_filter)
+            elif key == "$or":
+                any_mask = np.zeros(self._size, dtype=bool)
+                for sub_filter in condition:
+                    any_mask |= self.evaluate(sub_filter)
+                mask &= any_mask
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for operator, operand in condition.items():
+                    mask &= self._evaluate_operator(key, operator, operand)
+        return mask
+        
+    def _evaluate_operator(self, name: str, operator: str, operand: Any) -> np.ndarray:
+        if operator in ("$gt", "$gte", "$lt", "$lte"):
+            column = self._numeric_column(name)
+            with np.errstate(invalid="ignore"):
+                if operator == "$gt":
+                    return column > operand
+                if operator == "$gte":
+                    return column >= operand
+                if operator == "$lt":
+                    return column < operand
+                return column <= operand
+                
+        column = self._object_column(name)
+        if operator == "$exists":
+            exists = np.fromiter((value is not _MISSING for value in column), dtype=bool, count=self._size)
+            return exists if operand else ~exists
+        if operator in ("$eq", "$ne"):
+            matches = self._match_any(column, [operand])
+            return matches if operator == "$eq" else ~matches
+        if operator in ("$in", "$nin"):
+            matches = self._match_any(column, operand)
+            return matches if operator == "$in" else ~matches
+            
+        raise ValueError(f"Unsupported filter operator: {operator}")
+        
+    def _match_any(self, column: np.ndarray, candidates: List[Any]) -> np.ndarray:
+        """Rows whose value (or any element of a list value) is in candidates."""
+        candidates = set(candidates)
+        
+        def matches(value: Any) -> bool:
+            if isinstance(value, list):
+                return any(item in candidates for item in value)
+            if value is _MISSING:
+                return False
+            return value in candidates
+            
+        return np.fromiter((matches(value) for value in column), dtype=bool, count=self._size)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize columns, dropping the missing-value marker."""
+        return {
+            name: {str(i): value for i, value in enumerate(column) if value is not _MISSING}
+            for name, column in self._columns.items()
+        }
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], size: int) -> "ColumnarMetadata":
+        """Rebuild columns serialized with `to_dict`."""
+        metadata = cls()
+        metadata._size = size
+        for name, values in data.items():
+            column = [_MISSING] * size
+            for i, value in values.items():
+                column[int(i)] = value
+            metadata._columns[name] = column
+        return metadata
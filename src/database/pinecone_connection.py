@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from src.config.config import config
+
+logger = logging.getLogger(__name__)
+
+class IndexStateCache:
+    """Index hosts confirmed to exist, persisted in a small JSON file.
+    
+    Entries are keyed by index name and a hash of the API key (indexes of
+    different projects can share a name) and are trusted for `ttl_seconds`,
+    so short-lived processes can skip the control-plane lookup entirely.
+    """
+    
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(api_key: str, index_name: str) -> str:
+        project = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return f"{project}:{index_name}"
+    
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write(self, state: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Write to a per-process temp file and rename so concurrent CLI runs never see a partial file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write Pinecone index state to {self.path}: {str(e)}")
+    
+    def get(self, api_key: str, index_name: str) -> Optional[Dict[str, Any]]:
+        """Cached state of an index, or None if unknown or older than the TTL."""
+        with self._lock:
+            entry = self._read().get(self._key(api_key, index_name))
+        if entry is None or time.time() - entry.get("checked_at", 0) > self.ttl_seconds:
+            return None
+        return entry
+    
+    def put(self, api_key: str, index_name: str, host: str, dimension: int) -> None:
+        with self._lock:
+            state = self._read()
+            state[self._key(api_key, index_name)] = {
+                "host": host,
+                "dimension": dimension,
+                "checked_at": time.time()
+            }
+            self._write(state)
+    
+    def invalidate(self, api_key: str, index_name: str) -> None:
+        with self._lock:
+            state = self._read()
+            if state.pop(self._key(api_key, index_name), None) is not None:
+                self._write(state)
+
+class PineconeConnection:
+    """Process-wide Pinecone client with lazily opened index handles.
+    
+    One client (and so one set of HTTP connection pools) is shared by every
+    `PineconeBackend` using the same API key. The first use of an index
+    checks that it exists, creating it if needed, and records its host in an
+    `IndexStateCache`; later processes open the index straight from the
+    cached host without a control-plane round trip until the entry expires.
+    """
+    
+    _connections: Dict[str, "PineconeConnection"] = {}
+    _connections_lock = threading.Lock()
+    
+    def __init__(self, api_key: str, state: IndexStateCache, pool_size: int = 0):
+        self.api_key = api_key
+        self.state = state
+        self.pool_size = pool_size
+        self._client = None
+        self._indexes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def get(cls, api_key: Optional[str] = None) -> "PineconeConnection":
+        """The shared connection for an API key (the configured one by default)."""
+        api_key = config.pinecone.api_key if api_key is None else api_key
+        with cls._connections_lock:
+            connection = cls._connections.get(api_key)
+            if connection is None:
+                state = IndexStateCache(
+                    os.path.join(config.cache.directory, "pinecone_indexes.json"),
+                    config.pinecone.index_state_ttl_seconds
+                )
+                connection = cls(api_key, state, config.pinecone.pool_size)
+                cls._connections[api_key] = connection
+            return connection
+    
+    @classmethod
+    def reset(cls) -> None:
+        """Forget every shared connection, e.g. after the API key changes."""
+        with cls._connections_lock:
+            cls._connections.clear()
+    
+    @property
+    def client(self):
+        """The Pinecone client, created on first use."""
+        with self._lock:
+            if self._client is None:
+                from pinecone import Pinecone
+                self._client = Pinecone(api_key=self.api_key, connection_pool_maxsize=self.pool_size)
+            return self._client
+    
+    def ensure_index(self, index_name: str, dimension: int) -> str:
+        """Make sure an index exists and return its host.
+        
+        Args:
+            index_name: Name of the index
+            dimension: Dimension to create the index with if it does not exist
+            
+        Returns:
+            str: Data-plane host of the index
+        """
+        cached = self.state.get(self.api_key, index_name)
+        if cached is not None:
+            return cached["host"]
+        
+        from pinecone import ServerlessSpec
+        
+        client = self.client
+        existing = {index.name: index for index in client.list_indexes()}
+        if index_name in existing:
+            host = existing[index_name].host
+        else:
+            client.create_index(
+                name=index_name,
+                dimension=dimension,
+                metric='cosine',
+                spec=ServerlessSpec(
+                    cloud='aws',
+                    region='us-east-1'
+                )
+            )
+            logger.info(f"Created Pinecone index: {index_name}")
+            host = client.describe_index(index_name).host
+        
+        self.state.put(self.api_key, index_name, host, dimension)
+        return host
+    
+    def index(self, index_name: str, dimension: int):
+        """Data-plane handle for an index, opened once per process."""
+        handle = self._indexes.get(index_name)
+        if handle is not None:
+            return handle
+        host = self.ensure_index(index_name, dimension)
+        client = self.client
+        with self._lock:
+            handle = self._indexes.get(index_name)
+            if handle is None:
+                handle = client.Index(host=host)
+                self._indexes[index_name] = handle
+                logger.info(f"Successfully connected to Pinecone index: {index_name}")
+        return handle
+    
+    def invalidate(self, index_name: str) -> None:
+        """Drop the handle and cached state of an index that no longer exists."""
+        with self._lock:
+            self._indexes.pop(index_name, None)
+        self.state.invalidate(self.api_key, index_name)
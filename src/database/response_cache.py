@@ -0,0 +1,282 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config.config import config
+
+logger = logging.getLogger(__name__)
+
+# Brief fields that identify a request rather than describe the campaign
+_IDENTITY_FIELDS = {"id", "brief_id", "request_id"}
+
+def normalize_brief(value: Any) -> Any:
+    """Canonical form of a brief for cache keys.
+    
+    Strings are case-folded with whitespace collapsed, dict keys are sorted
+    on serialization, and ID fields are dropped so the same brief submitted
+    twice maps to the same key.
+    """
+    if isinstance(value, dict):
+        return {
+            key: normalize_brief(item)
+            for key, item in value.items()
+            if key not in _IDENTITY_FIELDS
+        }
+    if isinstance(value, list):
+        return [normalize_brief(item) for item in value]
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    return value
+
+def make_key(**parts: Any) -> str:
+    """SHA-256 of the canonical JSON of the key parts."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """Cache of generated responses with an exact and a semantic tier.
+    
+    Exact entries are keyed by a hash of everything that determines the
+    response (see `make_key`). Entries can also carry an embedding of the
+    request; `get_similar` then serves the closest entry in the same scope
+    whose cosine similarity clears a threshold. An in-process LRU sits in
+    front of a SQLite store; entries expire after `ttl_seconds` and the
+    store is capped at `max_entries` by evicting the least recently used.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        memory_entries: int = 256
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        
+        # key -> (created_at, serialized value); values are decoded on every
+        # hit so callers never share (and mutate) a cached object
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # scope -> (keys, normalized embedding matrix) for semantic lookups
+        self._scopes: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_config(cls) -> "ResponseCache":
+        """Create a cache using the application config."""
+        return cls(
+            path=os.path.join(config.cache.directory, "responses.sqlite3"),
+            ttl_seconds=config.cache.response_cache_ttl_seconds,
+            max_entries=config.cache.response_cache_max_entries,
+            memory_entries=config.cache.response_cache_memory_entries
+        )
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite store on first use."""
+        if self._conn is None:
+            dir_name = os.path.dirname(self.path)
+            if dir_name:
+                os.makedirs(dir_name, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    scope TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    embedding BLOB,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_scope ON responses (scope)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+            self._conn.commit()
+        return self._conn
+    
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+    
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for an exact key, or None."""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+    
+    def _get_locked(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                return json.loads(entry[1])
+            del self._memory[key]
+        
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read response cache: {str(e)}")
+            return None
+        
+        self._remember(key, row[1], row[0])
+        return json.loads(row[0])
+    
+    def get_similar(self, scope: str, embedding: List[float], threshold: float) -> Optional[Any]:
+        """Return the value of the most similar entry in a scope, if it clears the threshold.
+        
+        Args:
+            scope: Only entries stored with this scope are considered
+            embedding: Embedding of the request
+            threshold: Minimum cosine similarity
+            
+        Returns:
+            Optional[Any]: The cached value, or None
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        
+        with self._lock:
+            try:
+                keys, matrix = self._scope_matrix(scope)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to read response cache: {str(e)}")
+                return None
+            if not keys:
+                return None
+            
+            scores = matrix @ (query / norm)
+            best = int(np.argmax(scores))
+            if scores[best] < threshold:
+                return None
+            value = self._get_locked(keys[best])
+            if value is not None:
+                self.semantic_hits += 1
+                logger.debug(f"Semantic cache hit with similarity {scores[best]:.4f}")
+            return value
+    
+    def _scope_matrix(self, scope: str) -> Tuple[List[str], np.ndarray]:
+        """Normalized embeddings of a scope's live entries, loaded once and kept in memory."""
+        if scope not in self._scopes:
+            rows = self._connect().execute(
+                "SELECT key, embedding FROM responses WHERE scope = ? AND embedding IS NOT NULL AND created_at > ?",
+                (scope, time.time() - self.ttl_seconds)
+            ).fetchall()
+            keys = [row[0] for row in rows]
+            if rows:
+                matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                matrix = matrix / norms
+            else:
+                matrix = np.empty((0, 0), dtype=np.float32)
+            self._scopes[scope] = (keys, matrix)
+        return self._scopes[scope]
+    
+    def put(self, key: str, value: Any, scope: str = "", embedding: Optional[List[float]] = None) -> None:
+        """Store a value under an exact key.
+        
+        Args:
+            key: Exact cache key from `make_key`
+            value: JSON-serializable value
+            scope: Group the semantic tier searches within
+            embedding: Embedding of the request, to make the entry semantically searchable
+        """
+        now = time.time()
+        serialized = json.dumps(value)
+        blob = np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None
+        
+        with self._lock:
+            self._remember(key, now, serialized)
+            self._scopes.pop(scope, None)
+            try:
+                conn = self._connect()
+                conn.execute(
+                    """INSERT OR REPLACE INTO responses (key, scope, value, embedding, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    (key, scope, serialized, blob, now, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write response cache: {str(e)}")
+    
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then least recently used rows beyond the size cap."""
+        deleted = conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access ASC LIMIT ?
+                )""",
+                (overflow,)
+            )
+        if deleted or overflow > 0:
+            # Semantic matrices may reference evicted keys
+            self._scopes.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory)
+        }
+    
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._scopes.clear()
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to clear response cache: {str(e)}")
+    
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,158 @@
+import glob
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.database.metadata_columns import ColumnarMetadata
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON to a temp file and rename it over the target."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+class Segment:
+    """An immutable, append-only block of vectors stored on disk.
+    
+    Vectors live in `<name>.f32` as raw row-major float32 and are opened with
+    `np.memmap`, so they are paged in on demand and shared through the OS page
+    cache. IDs and metadata live in `<name>.json` and are loaded on first use.
+    Only the set of deleted rows changes after a segment is written; it is
+    recorded in the manifest.
+    """
+    
+    def __init__(self, directory: str, name: str, rows: int, dimension: int, deleted: Optional[List[int]] = None):
+        self.directory = directory
+        self.name = name
+        self.rows = rows
+        self.dimension = dimension
+        self.deleted = set(deleted or [])
+        
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: Optional[List[str]] = None
+        self._metadata: Optional[ColumnarMetadata] = None
+        self._alive: Optional[np.ndarray] = None
+        self._lists: Dict[str, Optional[np.ndarray]] = {}
+        self._lock = threading.Lock()
+        
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.f32")
+        
+    @property
+    def sidecar_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.json")
+        
+    @classmethod
+    def write(
+        cls,
+        directory: str,
+        name: str,
+        vectors: np.ndarray,
+        ids: List[str],
+        metadata: ColumnarMetadata
+    ) -> "Segment":
+        """Write a new segment to disk and return a handle to it."""
+        os.makedirs(directory, exist_ok=True)
+        segment = cls(directory, name, len(ids), vectors.shape[1])
+        
+        vectors_tmp = f"{segment.vectors_path}.tmp"
+        np.ascontiguousarray(vectors, dtype=np.float32).tofile(vectors_tmp)
+        os.replace(vectors_tmp, segment.vectors_path)
+        write_json_atomic(segment.sidecar_path, {"ids": ids, "metadata": metadata.to_dict()})
+        
+        segment._ids = ids
+        segment._metadata = metadata
+        return segment
+        
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only memory map over the segment's vectors."""
+        if self._vectors is None:
+            with self._lock:
+                if self._vectors is None:
+                    self._vectors = np.memmap(
+                        self.vectors_path, dtype=np.float32, mode='r', shape=(self.rows, self.dimension)
+                    )
+        return self._vectors
+        
+    def _load_sidecar(self) -> None:
+        with self._lock:
+            if self._ids is None:
+                with open(self.sidecar_path, 'r') as f:
+                    state = json.load(f)
+                self._metadata = ColumnarMetadata.from_dict(state["metadata"], self.rows)
+                self._ids = state["ids"]
+                
+    @property
+    def ids(self) -> List[str]:
+        if self._ids is None:
+            self._load_sidecar()
+        return self._ids
+        
+    @property
+    def metadata(self) -> ColumnarMetadata:
+        if self._metadata is None:
+            self._load_sidecar()
+        return self._metadata
+        
+    def alive_mask(self) -> np.ndarray:
+        """Boolean mask of rows that have not been deleted or superseded."""
+        if self._alive is None:
+            alive = np.ones(self.rows, dtype=bool)
+            if self.deleted:
+                alive[np.fromiter(self.deleted, dtype=np.int64)] = False
+            self._alive = alive
+        return self._alive
+        
+    def mark_deleted(self, rows: List[int]) -> None:
+        self.deleted.update(rows)
+        self._alive = None
+        
+    def live_count(self) -> int:
+        return self.rows - len(self.deleted)
+        
+    def lists_path(self, ivf_name: str) -> str:
+        return os.path.join(self.directory, f"{self.name}.{ivf_name}.npy")
+        
+    def get_lists(self, ivf_name: str) -> Optional[np.ndarray]:
+        """Inverted-list assignment of each row for an IVF generation, if any."""
+        if ivf_name not in self._lists:
+            path = self.lists_path(ivf_name)
+            self._lists[ivf_name] = np.load(path) if os.path.exists(path) else None
+        return self._lists[ivf_name]
+        
+    def set_lists(self, ivf_name: str, lists: np.ndarray) -> None:
+        """Persist the inverted-list assignment of each row."""
+        lists = np.asarray(lists, dtype=np.int32)
+        tmp_path = f"{self.lists_path(ivf_name)}.tmp.npy"
+        np.save(tmp_path, lists)
+        os.replace(tmp_path, self.lists_path(ivf_name))
+        self._lists = {ivf_name: lists}
+        
+    def remove_lists(self, ivf_name: str) -> None:
+        self._lists.pop(ivf_name, None)
+        try:
+            os.remove(self.lists_path(ivf_name))
+        except FileNotFoundError:
+            pass
+            
+    def remove_files(self) -> None:
+        """Delete the segment's files; open memory maps stay valid until closed."""
+        for path in glob.glob(os.path.join(self.directory, f"{glob.escape(self.name)}.*")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+                
+    def to_manifest(self) -> Dict[str, Any]:
+        return {"name": self.name, "rows": self.rows, "deleted": sorted(self.deleted)}
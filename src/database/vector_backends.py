@@ -0,0 +1,135 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+
+from src.database.pinecone_connection import PineconeConnection
+
+logger = logging.getLogger(__name__)
+
+def http_status(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an SDK API error (`status_code` or `status`), if any."""
+    for attribute in ("status_code", "status"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+class VectorBackend(ABC):
+    """Interface implemented by every vector store backend.
+    
+    Backends raise on failure; `VectorStore` is responsible for logging and
+    turning errors into the return values its callers expect.
+    """
+    
+    @abstractmethod
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        """Insert or replace vectors with 'id', 'values' and 'metadata'."""
+        
+    @abstractmethod
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Return {"matches": [{"id", "score", "metadata"}, ...]} by descending score."""
+        
+    @abstractmethod
+    def delete(self, ids: List[str], namespace: str) -> None:
+        """Delete vectors by ID."""
+        
+    @abstractmethod
+    def delete_all(self, namespace: str) -> None:
+        """Delete every vector in the namespace."""
+        
+    def is_transient_error(self, error: BaseException) -> bool:
+        """Whether a failed call may succeed if sent again.
+        
+        Connection errors, timeouts and responses with a 429 or 5xx status
+        qualify; errors in the request itself, such as a wrong dimension or
+        an oversized payload, do not.
+        """
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+        status = http_status(error)
+        return status is not None and (status == 429 or status >= 500)
+
+class PineconeBackend(VectorBackend):
+    """Backend that stores vectors in a Pinecone serverless index."""
+    
+    def __init__(self, index_name: str, dimension: int = 1536, connection: Optional[PineconeConnection] = None):
+        self.index_name = index_name
+        self.dimension = dimension
+        # Shared client; the index is checked and opened on first use
+        self.connection = connection or PineconeConnection.get()
+        
+    @property
+    def index(self):
+        return self.connection.index(self.index_name, self.dimension)
+        
+    def is_transient_error(self, error: BaseException) -> bool:
+        from pinecone import PineconeConnectionError, PineconeProtocolError
+        
+        return isinstance(error, (PineconeConnectionError, PineconeProtocolError)) or super().is_transient_error(error)
+        
+    @staticmethod
+    def _is_not_found(error: BaseException) -> bool:
+        from pinecone import NotFoundException
+        
+        return isinstance(error, NotFoundException) or http_status(error) == 404
+        
+    def _forget_if_missing(self, error: Exception) -> None:
+        """Drop the cached host if the index has gone, so the next call looks it up again."""
+        if self._is_not_found(error):
+            self.connection.invalidate(self.index_name)
+        
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str) -> None:
+        try:
+            self.index.upsert(vectors=vectors, namespace=namespace)
+        except Exception as e:
+            self._forget_if_missing(e)
+            raise
+        
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        try:
+            return self.index.query(
+                vector=vector,
+                top_k=top_k,
+                include_metadata=True,
+                namespace=namespace,
+                filter=filter
+            )
+        except Exception as e:
+            self._forget_if_missing(e)
+            raise
+        
+    def delete(self, ids: List[str], namespace: str) -> None:
+        try:
+            self.index.delete(ids=ids, namespace=namespace)
+        except Exception as e:
+            self._forget_if_missing(e)
+            raise
+        
+    def delete_all(self, namespace: str) -> None:
+        # First check if namespace exists by doing a simple query
+        try:
+            self.index.query(
+                vector=[0] * self.dimension,
+                top_k=1,
+                namespace=namespace
+            )
+        except Exception as e:
+            # If namespace doesn't exist, it's already "empty"
+            if self._is_not_found(e):
+                logger.info(f"Namespace {namespace} is empty or doesn't exist. Nothing to delete.")
+                return
+            raise
+        # If query succeeds, proceed with deletion
+        self.index.delete(delete_all=True, namespace=namespace)
@@ -1,67 +1,191 @@
-import pinecone
-import numpy as np
-from typing import List, Dict, Any, Optional
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+
+from tenacity import Retrying, stop_after_attempt, wait_exponential, retry_if_exception
+
 from src.config.config import config
-from pinecone import Pinecone, ServerlessSpec
+from src.database.vector_backends import VectorBackend, PineconeBackend
+from src.database.local_index import LocalVectorIndex
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on the JSON size of one float in a request body, used to size
+# batches without serializing every vector up front
+_FLOAT_JSON_BYTES = 24
+
+@dataclass
+class UpsertReport:
+    """Per-ID outcome of `VectorStore.upsert`.
+    
+    Truthy only if every vector was upserted, so callers that treated the old
+    bool return value as a success flag keep working.
+    """
+    upserted: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    batches: int = 0
+    retries: int = 0
+    
+    @property
+    def success(self) -> bool:
+        return not self.failed
+    
+    def __bool__(self) -> bool:
+        return self.success
+
+def estimate_payload_bytes(vector: Dict[str, Any]) -> int:
+    """Approximate serialized size of a vector in an upsert request."""
+    header = json.dumps({"id": vector["id"], "metadata": vector.get("metadata", {})}, default=str)
+    return len(header.encode("utf-8")) + len(vector["values"]) * _FLOAT_JSON_BYTES
+
+def plan_upsert_batches(
+    vectors: List[Dict[str, Any]],
+    max_vectors: int,
+    max_bytes: int
+) -> List[List[Dict[str, Any]]]:
+    """Split vectors into batches bounded by count and payload size.
+    
+    A vector larger than `max_bytes` on its own still gets a batch of its
+    own, so the backend can reject it with a meaningful error.
+    
+    Args:
+        vectors: Vectors to upsert
+        max_vectors: Maximum vectors per batch
+        max_bytes: Maximum estimated payload bytes per batch
+        
+    Returns:
+        List[List[Dict[str, Any]]]: Batches in input order
+    """
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for vector in vectors:
+        size = estimate_payload_bytes(vector)
+        if batch and (len(batch) >= max_vectors or batch_bytes + size > max_bytes):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(vector)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+def create_backend() -> VectorBackend:
+    """Create the vector backend selected by `config.vector_store.backend`."""
+    backend = config.vector_store.backend.lower()
+    if backend == "pinecone":
+        return PineconeBackend(config.pinecone.index_name, config.vector_store.dimension)
+    if backend == "local":
+        return LocalVectorIndex(
+            config.vector_store.local_path,
+            config.vector_store.dimension,
+            ann=config.vector_store.ann,
+            nlist=config.vector_store.ann_nlist,
+            nprobe=config.vector_store.ann_nprobe,
+            ann_min_vectors=config.vector_store.ann_min_vectors
+        )
+    raise ValueError(f"Unknown vector backend: {config.vector_store.backend}")
+
 class VectorStore:
-    def __init__(self):
+    def __init__(self, backend: Optional[VectorBackend] = None):
         self.index_name = config.pinecone.index_name
         self.namespace = config.pinecone.namespace
-        self._initialize_pinecone()
+        # Created on first use, so constructing a store makes no network calls
+        self._backend = backend
+        self._backend_lock = threading.Lock()
         
-    def _initialize_pinecone(self) -> None:
-        """Initialize Pinecone client and ensure the index exists."""
-        try:
-            # Initialize Pinecone with the recommended approach
-            self.pc = Pinecone(api_key=config.pinecone.api_key)
-            
-            # Check if index exists, create it if not
-            existing_indexes = [index.name for index in self.pc.list_indexes()]
-            if self.index_name not in existing_indexes:
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=1536,
-                    metric='cosine',
-                    spec=ServerlessSpec(
-                        cloud='aws',
-                        region='us-east-1'
-                    )
-                )
-                logger.info(f"Created Pinecone index: {self.index_name}")
-            
-            self.index = self.pc.Index(self.index_name)
-            logger.info(f"Successfully connected to Pinecone index: {self.index_name}")
-        except Exception as e:
-            logger.error(f"Failed to initialize Pinecone: {str(e)}")
-            raise
+        self.upsert_batch_size = config.vector_store.upsert_batch_size
+        self.upsert_max_bytes = config.vector_store.upsert_max_bytes
+        self.upsert_concurrency = config.vector_store.upsert_concurrency
+        self.upsert_max_attempts = config.vector_store.upsert_max_attempts
+        self.upsert_wait = wait_exponential(multiplier=1, min=4, max=10)
+    
+    @property
+    def backend(self) -> VectorBackend:
+        """The vector backend, created by `create_backend` on first access."""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    try:
+                        self._backend = create_backend()
+                    except Exception as e:
+                        logger.error(f"Failed to initialize vector backend: {str(e)}")
+                        raise
+        return self._backend
+    
+    @backend.setter
+    def backend(self, backend: VectorBackend) -> None:
+        self._backend = backend
     
-    def upsert(self, vectors: List[Dict[str, Any]]) -> bool:
-        """Upsert vectors to Pinecone.
+    def upsert(self, vectors: List[Dict[str, Any]]) -> UpsertReport:
+        """Upsert vectors to the vector backend in size-bounded batches.
+        
+        Batches are sent concurrently and each one is retried on its own, so a
+        transient failure only resends the vectors of the batch that failed.
+        Other errors (see `VectorBackend.is_transient_error`) fail the batch
+        without retrying.
         
         Args:
             vectors: List of dictionaries with 'id', 'values', and 'metadata'
-        
+            
         Returns:
-            bool: Success status
+            UpsertReport: IDs that were upserted and errors for those that were not
         """
+        report = UpsertReport()
         try:
-            self.index.upsert(vectors=vectors, namespace=self.namespace)
-            return True
+            batches = plan_upsert_batches(vectors, self.upsert_batch_size, self.upsert_max_bytes)
         except Exception as e:
             logger.error(f"Failed to upsert vectors: {str(e)}")
-            return False
+            report.failed = {str(vector.get("id")): str(e) for vector in vectors}
+            return report
+        
+        report.batches = len(batches)
+        workers = max(1, min(self.upsert_concurrency, len(batches)))
+        if workers == 1:
+            results = [self._upsert_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._upsert_batch, batches))
+        
+        for batch, (attempts, error) in zip(batches, results):
+            report.retries += attempts - 1
+            ids = [vector["id"] for vector in batch]
+            if error is None:
+                report.upserted.extend(ids)
+            else:
+                report.failed.update((vector_id, error) for vector_id in ids)
+        
+        if report.failed:
+            logger.error(f"Failed to upsert {len(report.failed)} of {len(vectors)} vectors")
+        return report
+    
+    def _upsert_batch(self, batch: List[Dict[str, Any]]):
+        """Send one batch, retrying transient errors; returns (attempts, error message or None)."""
+        backend = self.backend
+        retrying = Retrying(
+            stop=stop_after_attempt(self.upsert_max_attempts),
+            wait=self.upsert_wait,
+            retry=retry_if_exception(backend.is_transient_error),
+            reraise=True
+        )
+        try:
+            retrying(backend.upsert, batch, namespace=self.namespace)
+            return retrying.statistics.get("attempt_number", 1), None
+        except Exception as e:
+            logger.error(f"Failed to upsert batch of {len(batch)} vectors: {str(e)}")
+            return retrying.statistics.get("attempt_number", self.upsert_max_attempts), str(e)
     
     def query(
-        self, 
-        query_vector: List[float], 
-        top_k: int = 5, 
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
         filter: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Query vectors from Pinecone.
+        """Query vectors from the vector backend.
         
         Args:
             query_vector: Embedding vector to query
@@ -72,10 +196,9 @@ class VectorStore:
             Dict containing query results
         """
         try:
-            return self.index.query(
-                vector=query_vector,
+            return self.backend.query(
+                query_vector,
                 top_k=top_k,
-                include_metadata=True,
                 namespace=self.namespace,
                 filter=filter
             )
@@ -93,7 +216,7 @@ class VectorStore:
             bool: Success status
         """
         try:
-            self.index.delete(ids=ids, namespace=self.namespace)
+            self.backend.delete(ids, namespace=self.namespace)
             return True
         except Exception as e:
             logger.error(f"Failed to delete vectors: {str(e)}")
@@ -106,24 +229,9 @@ class VectorStore:
             bool: Success status
         """
         try:
-            # First check if namespace exists by doing a simple query
-            try:
-                self.index.query(
-                    vector=[0] * 1536,
-                    top_k=1,
-                    namespace=self.namespace
-                )
-                # If query succeeds, proceed with deletion
-                self.index.delete(delete_all=True, namespace=self.namespace)
-                logger.info(f"Deleted all vectors in namespace: {self.namespace}")
-                return True
-            except Exception as e:
-                # If namespace doesn't exist, it's already "empty"
-                if "404" in str(e) or "Not Found" in str(e):
-                    logger.info(f"Namespace {self.namespace} is empty or doesn't exist. Nothing to delete.")
-                    return True
-                else:
-                    raise e
+            self.backend.delete_all(namespace=self.namespace)
+            logger.info(f"Deleted all vectors in namespace: {self.namespace}")
+            return True
         except Exception as e:
             logger.error(f"Failed to delete all vectors: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
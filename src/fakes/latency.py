@@ -0,0 +1,31 @@
+import random
+from dataclasses import dataclass
+
+@dataclass
+class LatencyModel:
+    """Distribution of simulated server time per request, in milliseconds.
+    
+    `distribution` is "fixed" (always `median_ms`), "uniform" (between 0
+    and twice `median_ms`) or "lognormal" (median `median_ms`, shape
+    `sigma`), which gives the long tail real APIs show. Requests carrying
+    several items (calls in a batch, inputs to embed) take one sample plus
+    `per_call_ms` for every item.
+    """
+    distribution: str = "lognormal"
+    median_ms: float = 0.0
+    sigma: float = 0.5
+    per_call_ms: float = 0.0
+    
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        if self.distribution == "fixed":
+            milliseconds = self.median_ms
+        elif self.distribution == "uniform":
+            milliseconds = rng.uniform(0, 2 * self.median_ms)
+        elif self.distribution == "lognormal":
+            milliseconds = self.median_ms * rng.lognormvariate(0, self.sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+        return milliseconds / 1000.0
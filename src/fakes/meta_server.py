@@ -0,0 +1,329 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import typer
+
+from src.fakes.latency import LatencyModel
+
+logger = logging.getLogger(__name__)
+
+_REFERENCE = re.compile(r"\{result=([^:}]+):\$\.id\}")
+
+# Account edges the fake implements, and the params that reference a parent
+EDGES = {
+    "campaigns": ("campaign", ()),
+    "adsets": ("adset", ("campaign_id",)),
+    "adcreatives": ("adcreative", ()),
+    "ads": ("ad", ("adset_id", "creative")),
+}
+
+@dataclass
+class ErrorInjection:
+    """Probabilities of injected failures per create call.
+    
+    Besides these, a create that references a parent created less than
+    `visibility_delay_ms` ago fails with the "object does not exist" error
+    Meta returns while a new object propagates.
+    """
+    rate_limit: float = 0.0
+    server_error: float = 0.0
+    not_ready: float = 0.0
+    visibility_delay_ms: float = 0.0
+
+@dataclass
+class ServerStats:
+    """Counters of what the fake server has handled."""
+    requests: int = 0
+    batch_requests: int = 0
+    calls: int = 0
+    created: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+class FakeGraphAPI:
+    """In-memory model of the Marketing API create endpoints.
+    
+    Creates campaigns, ad sets, ad creatives and ads under any ad account,
+    validates parent references, injects errors and executes batch requests
+    with `{result=name:$.id}` references. `FakeMetaServer` serves it over
+    HTTP; it can also be called directly.
+    """
+    
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        errors: Optional[ErrorInjection] = None,
+        seed: Optional[int] = None,
+        id_start: int = 120200000000000000
+    ):
+        self.latency = latency or LatencyModel()
+        self.errors = errors or ErrorInjection()
+        self.rng = random.Random(seed)
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self.stats = ServerStats()
+        self._next_id = id_start
+        self._lock = threading.Lock()
+    
+    def new_id(self) -> str:
+        """Next object ID; numeric strings like the real ones."""
+        with self._lock:
+            self._next_id += 1
+            return str(self._next_id)
+    
+    def handle(self, method: str, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        """Handle one HTTP request.
+        
+        Args:
+            method: HTTP method
+            path: URL path, e.g. "/v18.0/act_1/campaigns"
+            params: Decoded form or query parameters
+            
+        Returns:
+            Tuple[int, Any]: HTTP status and JSON body
+        """
+        with self._lock:
+            self.stats.requests += 1
+        parts = [part for part in path.split("/") if part]
+        # Drop the API version
+        if parts and re.fullmatch(r"v\d+\.\d+", parts[0]):
+            parts = parts[1:]
+        
+        if method == "POST" and not parts and "batch" in params:
+            calls = json.loads(params["batch"])
+            time.sleep(self.latency.sample(self.rng) + len(calls) * self.latency.per_call_ms / 1000.0)
+            return 200, self.execute_batch(calls)
+        
+        time.sleep(self.latency.sample(self.rng))
+        return self.create(method, parts, params)
+    
+    def create(self, method: str, parts: List[str], params: Dict[str, str], visible: Optional[set] = None) -> Tuple[int, Any]:
+        """Create an object at `<account>/<edge>`.
+        
+        Args:
+            method: HTTP method
+            parts: Path segments without the API version
+            params: Create params
+            visible: IDs created earlier in the same batch, which are
+                visible regardless of the propagation delay
+                
+        Returns:
+            Tuple[int, Any]: HTTP status and JSON body
+        """
+        with self._lock:
+            self.stats.calls += 1
+        if method != "POST" or len(parts) != 2 or not parts[0].startswith("act_") or parts[1] not in EDGES:
+            return self._error(400, "unsupported", 100, None, f"Unsupported request: {method} /{'/'.join(parts)}")
+        
+        roll = self.rng.random()
+        if roll < self.errors.rate_limit:
+            return self._error(400, "rate_limit", 17, 2446079, "User request limit reached")
+        roll -= self.errors.rate_limit
+        if roll < self.errors.server_error:
+            return self._error(500, "server_error", 2, None, "Service temporarily unavailable", transient=True)
+        roll -= self.errors.server_error
+        
+        object_type, parent_params = EDGES[parts[1]]
+        for name in parent_params:
+            if name not in params:
+                return self._error(400, "invalid_parameter", 100, None, f"Missing parameter: {name}")
+            parent_id = params[name]
+            if name == "creative":
+                parent_id = json.loads(parent_id).get("creative_id", "")
+            if roll < self.errors.not_ready or not self._is_visible(parent_id, visible):
+                return self._error(
+                    400, "not_ready", 100, 33,
+                    f"Unsupported post request. Object with ID '{parent_id}' does not exist"
+                )
+        
+        object_id = self.new_id()
+        with self._lock:
+            self.objects[object_id] = {
+                "type": object_type,
+                "account": parts[0],
+                "params": params,
+                "created_at": time.monotonic()
+            }
+            self.stats.created[object_type] = self.stats.created.get(object_type, 0) + 1
+        return 200, {"id": object_id}
+    
+    def execute_batch(self, calls: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Run batch calls in order, resolving references to earlier named calls.
+        
+        A call referencing a call that failed is not run and gets a null
+        response, as on the real endpoint.
+        """
+        with self._lock:
+            self.stats.batch_requests += 1
+        results: Dict[str, str] = {}
+        visible = set()
+        responses = []
+        for call in calls:
+            body = call.get("body", "")
+            references = _REFERENCE.findall(body)
+            if any(name not in results for name in references):
+                responses.append(None)
+                continue
+            body = _REFERENCE.sub(lambda match: results[match.group(1)], body)
+            path = urlsplit(call["relative_url"]).path
+            parts = [part for part in path.split("/") if part]
+            if parts and re.fullmatch(r"v\d+\.\d+", parts[0]):
+                parts = parts[1:]
+            
+            status, payload = self.create(call["method"], parts, dict(parse_qsl(body)), visible)
+            if status == 200:
+                visible.add(payload["id"])
+                if call.get("name"):
+                    results[call["name"]] = payload["id"]
+                if call.get("name") and call.get("omit_response_on_success", True):
+                    responses.append({"code": 200, "headers": [], "body": None})
+                    continue
+            responses.append({
+                "code": status,
+                "headers": [{"name": "Content-Type", "value": "application/json"}],
+                "body": json.dumps(payload)
+            })
+        return responses
+    
+    def _is_visible(self, object_id: str, visible: Optional[set]) -> bool:
+        if visible and object_id in visible:
+            return True
+        with self._lock:
+            parent = self.objects.get(object_id)
+        if parent is None:
+            return False
+        return (time.monotonic() - parent["created_at"]) * 1000.0 >= self.errors.visibility_delay_ms
+    
+    def _error(
+        self,
+        status: int,
+        kind: str,
+        code: int,
+        subcode: Optional[int],
+        message: str,
+        transient: bool = False
+    ) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            self.stats.errors[kind] = self.stats.errors.get(kind, 0) + 1
+        error = {"message": message, "type": "OAuthException", "code": code, "is_transient": transient}
+        if subcode is not None:
+            error["error_subcode"] = subcode
+        return status, {"error": error}
+
+class _Handler(BaseHTTPRequestHandler):
+    graph: FakeGraphAPI
+    
+    def _respond(self, method: str) -> None:
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode("utf-8")))
+        params.pop("access_token", None)
+        params.pop("appsecret_proof", None)
+        
+        status, payload = self.graph.handle(method, url.path, params)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self) -> None:
+        self._respond("GET")
+    
+    def do_POST(self) -> None:
+        self._respond("POST")
+    
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+class FakeMetaServer:
+    """Local HTTP stand-in for graph.facebook.com.
+    
+    Point `MetaAdsAPI` at it by setting META_GRAPH_URL to `server.url`.
+    
+    Example:
+        with FakeMetaServer(latency=LatencyModel(median_ms=80)) as server:
+            os.environ["META_GRAPH_URL"] = server.url
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyModel] = None,
+        errors: Optional[ErrorInjection] = None,
+        seed: Optional[int] = None
+    ):
+        self.graph = FakeGraphAPI(latency, errors, seed)
+        handler = type("FakeMetaHandler", (_Handler,), {"graph": self.graph})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def stats(self) -> ServerStats:
+        return self.graph.stats
+    
+    def start(self) -> "FakeMetaServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Meta API listening on {self.url}")
+        return self
+    
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self) -> "FakeMetaServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+def main(
+    port: int = typer.Option(8765, "--port", "-p", help="Port to listen on"),
+    latency_ms: float = typer.Option(0.0, "--latency-ms", help="Median latency per request"),
+    distribution: str = typer.Option("lognormal", "--distribution", help="fixed, uniform or lognormal"),
+    sigma: float = typer.Option(0.5, "--sigma", help="Shape of the lognormal latency tail"),
+    rate_limit: float = typer.Option(0.0, "--rate-limit", help="Probability of a rate-limit error"),
+    server_error: float = typer.Option(0.0, "--server-error", help="Probability of a transient 5xx"),
+    not_ready: float = typer.Option(0.0, "--not-ready", help="Probability of a not-ready error on child objects"),
+    visibility_delay_ms: float = typer.Option(0.0, "--visibility-delay-ms", help="Time before new objects can be referenced"),
+    seed: Optional[int] = typer.Option(None, "--seed", help="Random seed for latency and errors")
+):
+    """Run the fake Meta Marketing API until interrupted."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    server = FakeMetaServer(
+        port=port,
+        latency=LatencyModel(distribution, latency_ms, sigma),
+        errors=ErrorInjection(rate_limit, server_error, not_ready, visibility_delay_ms),
+        seed=seed
+    )
+    server.start()
+    typer.echo(f"Set META_GRAPH_URL={server.url} to use it")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    typer.run(main)
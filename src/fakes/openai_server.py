@@ -0,0 +1,466 @@
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import typer
+
+from src.fakes.latency import LatencyModel
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Optimization goal the canned spec uses for each objective
+_OPTIMIZATION_GOALS = {
+    "OUTCOME_AWARENESS": "REACH",
+    "OUTCOME_ENGAGEMENT": "POST_ENGAGEMENT",
+    "OUTCOME_SALES": "OFFSITE_CONVERSIONS",
+    "OUTCOME_LEAD_GENERATION": "LEAD_GENERATION",
+    "OUTCOME_APP_PROMOTION": "APP_INSTALLS",
+    "OUTCOME_TRAFFIC": "LINK_CLICKS",
+}
+
+@lru_cache(maxsize=65536)
+def _word_vector(word: str, dimensions: int, seed: int) -> np.ndarray:
+    digest = hashlib.blake2b(f"{seed}:{word}".encode("utf-8"), digest_size=8).digest()
+    return np.random.default_rng(int.from_bytes(digest, "little")).standard_normal(dimensions).astype(np.float32)
+
+def hash_embedding(text: str, dimensions: int = 1536, seed: int = 0) -> np.ndarray:
+    """Deterministic unit-length embedding of a text.
+    
+    Each word maps to a fixed random direction seeded by its hash, and a
+    text embeds to the normalized sum of its words' directions. Texts that
+    share words therefore have high cosine similarity, which keeps
+    retrieval over a fake-embedded corpus meaningful.
+    """
+    words = _WORD.findall(text.lower()) or [text]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in words:
+        vector += _word_vector(word, dimensions, seed)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (four characters per token), as the fake bills usage."""
+    return max(1, len(text) // 4)
+
+def parse_brief(user_message: str) -> Dict[str, str]:
+    """Recover the "key: value" brief lines from a campaign generation prompt."""
+    brief = {}
+    body = user_message.split("Respond with", 1)[0]
+    for line in body.splitlines()[1:]:
+        key, separator, value = line.partition(": ")
+        if separator and re.fullmatch(r"\w+", key):
+            brief[key] = value.strip()
+    return brief
+
+def canned_campaign_spec(brief: Dict[str, str]) -> Dict[str, Any]:
+    """A valid campaign spec in the schema `RAGService` asks for, derived from a brief."""
+    product = brief.get("product_name") or brief.get("product_description", "Product")[:40] or "Product"
+    objective = brief.get("objective", "")
+    if objective not in _OPTIMIZATION_GOALS:
+        objective = "OUTCOME_TRAFFIC"
+    try:
+        amount = int(round(float(brief.get("daily_budget", "20")) * 100))
+    except ValueError:
+        amount = 2000
+    try:
+        age_min = int(brief.get("age_min", "18"))
+        age_max = int(brief.get("age_max", "65"))
+    except ValueError:
+        age_min, age_max = 18, 65
+    
+    return {
+        "campaign": {
+            "name": f"{product} - {objective.replace('OUTCOME_', '').title()}",
+            "objective": objective,
+            "special_ad_categories": [],
+            "budget_optimization": False,
+            "status": "PAUSED"
+        },
+        "ad_set": {
+            "name": f"{product} - Core Audience",
+            "optimization_goal": _OPTIMIZATION_GOALS[objective],
+            "billing_event": "IMPRESSIONS",
+            "bid_strategy": "LOWEST_COST_WITHOUT_CAP",
+            "budget": {"amount": max(amount, 100), "type": "daily"},
+            "targeting": {
+                "geo_locations": {"countries": ["US"]},
+                "age_min": age_min,
+                "age_max": age_max,
+                "genders": [1, 2],
+                "interests": [],
+                "exclusions": {},
+                "custom_audiences": []
+            }
+        },
+        "ad": {
+            "name": f"{product} - Ad 1",
+            "creative": {
+                "title": f"Discover {product}"[:40],
+                "body": (brief.get("product_description") or f"Find out more about {product}.")[:125],
+                "call_to_action": "LEARN_MORE",
+                "link": brief.get("website") or "https://example.com",
+                "image_description": f"{product} in use",
+                "media_recommendations": "Single image, 1080x1080"
+            }
+        },
+        "reasoning": {
+            "audience_analysis": f"Broad audience aged {age_min}-{age_max} for {product}.",
+            "creative_strategy": "Lead with the main benefit and a clear call to action.",
+            "budget_rationale": "Daily budget taken from the brief.",
+            "expected_performance": "Baseline performance while the ad set exits learning.",
+            "documentation_references": []
+        },
+        "validation": {
+            "potential_issues": [],
+            "compliance_status": True,
+            "required_fields_missing": []
+        }
+    }
+
+def canned_answer(messages: List[Dict[str, str]]) -> str:
+    """Answer a question by quoting the start of the retrieved context."""
+    question = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    context = system.split("Retrieved information:", 1)[-1].strip()
+    sentences = _SENTENCE_END.split(context)[:2] if context else []
+    summary = " ".join(sentences) or "The knowledge base has no information on this."
+    return f"Regarding \"{question}\": {summary}"
+
+@dataclass
+class RateLimits:
+    """Server-side requests- and tokens-per-minute limits (0 for unlimited).
+    
+    Responses carry `x-ratelimit-*` headers like the real API; requests over
+    a limit get a 429. `error_rate` injects 429s at random on top.
+    """
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    error_rate: float = 0.0
+
+@dataclass
+class OpenAIServerStats:
+    """Counters of what the fake server has handled."""
+    requests: int = 0
+    embedded_inputs: int = 0
+    completions: int = 0
+    streamed: int = 0
+    rate_limited: int = 0
+    tokens: int = 0
+
+class _Window:
+    """Usage in the current one-minute window."""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.started = time.monotonic()
+    
+    def roll(self) -> None:
+        if time.monotonic() - self.started >= 60:
+            self.used = 0
+            self.started = time.monotonic()
+    
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+    
+    def reset_seconds(self) -> float:
+        return max(0.0, 60 - (time.monotonic() - self.started))
+
+class FakeOpenAI:
+    """In-memory model of the embeddings and chat completions endpoints.
+    
+    Embeddings are `hash_embedding`s. JSON-mode completions return
+    `canned_campaign_spec` for the brief in the prompt; other completions
+    return `canned_answer`. Both are deterministic for a given request.
+    `FakeOpenAIServer` serves it over HTTP.
+    """
+    
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        limits: Optional[RateLimits] = None,
+        seed: int = 0,
+        dimensions: int = 1536,
+        stream_chunk_ms: float = 0.0
+    ):
+        self.latency = latency or LatencyModel()
+        self.limits = limits or RateLimits()
+        self.seed = seed
+        self.dimensions = dimensions
+        self.stream_chunk_ms = stream_chunk_ms
+        self.rng = random.Random(seed)
+        self.stats = OpenAIServerStats()
+        self._requests = _Window(self.limits.requests_per_minute)
+        self._tokens = _Window(self.limits.tokens_per_minute)
+        self._lock = threading.Lock()
+    
+    def admit(self, tokens: int) -> Tuple[bool, Dict[str, str]]:
+        """Count a request against the limits.
+        
+        Returns:
+            Tuple[bool, Dict[str, str]]: Whether it is allowed, and rate-limit headers
+        """
+        with self._lock:
+            self.stats.requests += 1
+            self._requests.roll()
+            self._tokens.roll()
+            allowed = self.rng.random() >= self.limits.error_rate
+            if self._requests.limit and self._requests.remaining() < 1:
+                allowed = False
+            if self._tokens.limit and self._tokens.remaining() < tokens:
+                allowed = False
+            if allowed:
+                self._requests.used += 1
+                self._tokens.used += tokens
+                self.stats.tokens += tokens
+            else:
+                self.stats.rate_limited += 1
+            
+            headers = {}
+            for kind, window in (("requests", self._requests), ("tokens", self._tokens)):
+                if window.limit:
+                    headers[f"x-ratelimit-limit-{kind}"] = str(window.limit)
+                    headers[f"x-ratelimit-remaining-{kind}"] = str(window.remaining())
+                    headers[f"x-ratelimit-reset-{kind}"] = f"{window.reset_seconds():.3f}s"
+            if not allowed:
+                headers["retry-after"] = "1"
+            return allowed, headers
+    
+    def embeddings(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Body of an embeddings response."""
+        inputs = request["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        base64_encoded = request.get("encoding_format") == "base64"
+        dimensions = request.get("dimensions") or self.dimensions
+        
+        data = []
+        for index, text in enumerate(inputs):
+            vector = hash_embedding(text, dimensions, self.seed)
+            embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii") if base64_encoded else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        with self._lock:
+            self.stats.embedded_inputs += len(inputs)
+        
+        tokens = sum(estimate_tokens(text) for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", ""),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+    
+    def completion_text(self, request: Dict[str, Any]) -> str:
+        """Content of the completion for a chat request."""
+        messages = request.get("messages", [])
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+            return json.dumps(canned_campaign_spec(parse_brief(user)), indent=2)
+        return canned_answer(messages)
+    
+    def completion(self, request: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Body of a non-streaming chat completion response."""
+        with self._lock:
+            self.stats.completions += 1
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in request.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    
+    def completion_chunks(self, request: Dict[str, Any], content: str, chunk_chars: int = 16) -> List[Dict[str, Any]]:
+        """Chunks of a streaming chat completion response."""
+        with self._lock:
+            self.stats.streamed += 1
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": request.get("model", ""),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+        
+        chunks = [chunk({"role": "assistant", "content": ""})]
+        chunks.extend(chunk({"content": content[i:i + chunk_chars]}) for i in range(0, len(content), chunk_chars))
+        chunks.append(chunk({}, "stop"))
+        return chunks
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeOpenAI
+    
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?", 1)[0].rstrip("/")
+        fake = self.fake
+        
+        if path.endswith("/embeddings"):
+            inputs = request.get("input", [])
+            texts = [inputs] if isinstance(inputs, str) else inputs
+            tokens = sum(estimate_tokens(text) for text in texts)
+            time.sleep(fake.latency.sample(fake.rng) + len(texts) * fake.latency.per_call_ms / 1000.0)
+        elif path.endswith("/chat/completions"):
+            messages = request.get("messages", [])
+            tokens = sum(estimate_tokens(m.get("content") or "") for m in messages) + (request.get("max_tokens") or 0)
+            time.sleep(fake.latency.sample(fake.rng))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        
+        allowed, headers = fake.admit(tokens)
+        if not allowed:
+            self._send_json(429, {"error": {
+                "message": "Rate limit reached",
+                "type": "requests",
+                "code": "rate_limit_exceeded"
+            }}, headers)
+            return
+        
+        if path.endswith("/embeddings"):
+            self._send_json(200, fake.embeddings(request), headers)
+            return
+        
+        content = fake.completion_text(request)
+        if not request.get("stream"):
+            self._send_json(200, fake.completion(request, content), headers)
+            return
+        
+        # Server-sent events; the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        for chunk in fake.completion_chunks(request, content):
+            if fake.stream_chunk_ms:
+                time.sleep(fake.stream_chunk_ms / 1000.0)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+    
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+class FakeOpenAIServer:
+    """Local HTTP stand-in for the OpenAI embeddings and chat completions API.
+    
+    Point `OpenAIService` at it by setting OPENAI_BASE_URL to `server.url`.
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyModel] = None,
+        limits: Optional[RateLimits] = None,
+        seed: int = 0,
+        dimensions: int = 1536,
+        stream_chunk_ms: float = 0.0
+    ):
+        self.fake = FakeOpenAI(latency, limits, seed, dimensions, stream_chunk_ms)
+        handler = type("FakeOpenAIHandler", (_Handler,), {"fake": self.fake})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    @property
+    def stats(self) -> OpenAIServerStats:
+        return self.fake.stats
+    
+    def start(self) -> "FakeOpenAIServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake OpenAI API listening on {self.url}")
+        return self
+    
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+def main(
+    port: int = typer.Option(8766, "--port", "-p", help="Port to listen on"),
+    latency_ms: float = typer.Option(0.0, "--latency-ms", help="Median latency per request"),
+    distribution: str = typer.Option("lognormal", "--distribution", help="fixed, uniform or lognormal"),
+    sigma: float = typer.Option(0.5, "--sigma", help="Shape of the lognormal latency tail"),
+    rpm: int = typer.Option(0, "--rpm", help="Requests per minute before 429s (0 for unlimited)"),
+    tpm: int = typer.Option(0, "--tpm", help="Tokens per minute before 429s (0 for unlimited)"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Probability of an injected 429"),
+    stream_chunk_ms: float = typer.Option(0.0, "--stream-chunk-ms", help="Delay between streamed chunks"),
+    seed: int = typer.Option(0, "--seed", help="Seed for embeddings, latency and errors")
+):
+    """Run the fake OpenAI API until interrupted."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    server = FakeOpenAIServer(
+        port=port,
+        latency=LatencyModel(distribution, latency_ms, sigma),
+        limits=RateLimits(rpm, tpm, error_rate),
+        seed=seed,
+        stream_chunk_ms=stream_chunk_ms
+    )
+    server.start()
+    typer.echo(f"Set OPENAI_BASE_URL={server.url} to use it")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from typing import List, Dict, Optional
+
+import openai
+from tenacity import retry, stop_after_attempt
+
+from src.config.config import config
+from src.models.openai_service import OpenAIService, RETRY_WAIT, rate_limit_headers
+from src.models.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+class AsyncOpenAIService:
+    """Asyncio counterpart of `OpenAIService`.
+    
+    Requests go through one `openai.AsyncOpenAI` client, so concurrent
+    callers share its HTTP connection pool. Batch planning, token counting
+    and the embedding cache come from the wrapped `OpenAIService`, so sync
+    and async callers in one process hit the same cache.
+    """
+    
+    def __init__(self, service: Optional[OpenAIService] = None, client: Optional[openai.AsyncOpenAI] = None):
+        self.service = service or OpenAIService()
+        self.client = client or openai.AsyncOpenAI(api_key=config.openai.api_key, base_url=config.openai.base_url or None)
+        self.model = self.service.model
+        self.embedding_model = self.service.embedding_model
+        self.max_concurrent_requests = config.openai.max_concurrent_requests
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Per-event-loop cap on requests in flight."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def get_embedding(self, text: str) -> List[float]:
+        """Get embedding vector for a text.
+        
+        Args:
+            text: The text to embed
+            
+        Returns:
+            List[float]: The embedding vector
+        """
+        return (await self.get_embeddings([text]))[0]
+    
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get embedding vectors for multiple texts, sending batches concurrently.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            List[List[float]]: List of embedding vectors, in input order
+        """
+        cache = self.service.embedding_cache
+        if cache is not None:
+            embeddings = await asyncio.to_thread(cache.get_many, self.embedding_model, texts)
+        else:
+            embeddings = [None] * len(texts)
+        
+        # Only texts that missed the cache go to the API
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        missing_texts = [texts[i] for i in missing]
+        token_counts = self.service.num_tokens_from_strings(missing_texts, self.embedding_model)
+        batches = self.service._plan_embedding_batches(missing_texts, token_counts)
+        
+        results = await asyncio.gather(*(
+            self._embed_batch([missing_texts[i] for i in batch], sum(token_counts[i] for i in batch))
+            for batch in batches
+        ))
+        for batch, vectors in zip(batches, results):
+            for index, vector in zip(batch, vectors):
+                embeddings[missing[index]] = vector
+        
+        if cache is not None and missing:
+            await asyncio.to_thread(
+                cache.put_many, self.embedding_model, missing_texts, [embeddings[i] for i in missing]
+            )
+        
+        return embeddings
+    
+    @retry(stop=stop_after_attempt(3), wait=RETRY_WAIT)
+    async def _embed_batch(self, texts: List[str], tokens: int) -> List[List[float]]:
+        """Embed a single batch of texts with one API call."""
+        limiter = get_rate_limiter(self.embedding_model)
+        try:
+            if limiter is not None:
+                await limiter.acquire_async(tokens)
+            async with self.semaphore:
+                raw_response = await self.client.embeddings.with_raw_response.create(
+                    input=[text.replace("\n", " ") for text in texts],
+                    model=self.embedding_model
+                )
+            if limiter is not None:
+                limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            data = sorted(response.data, key=lambda item: item.index)
+            return [item.embedding for item in data]
+        except Exception as e:
+            if limiter is not None:
+                limiter.update_from_headers(rate_limit_headers(e))
+            logger.error(f"Failed to get embeddings for batch of {len(texts)}: {str(e)}")
+            raise
+    
+    @retry(stop=stop_after_attempt(3), wait=RETRY_WAIT)
+    async def get_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Get completion from OpenAI.
+        
+        Args:
+            messages: List of message dictionaries
+            temperature: Temperature for completion (default from config)
+            max_tokens: Max tokens for completion (default from config)
+            response_format: Optional response format (e.g. {"type": "json_object"})
+            
+        Returns:
+            str: Completion text
+        """
+        limiter = get_rate_limiter(self.model)
+        try:
+            # Set defaults from config if not provided
+            temperature = temperature if temperature is not None else self.service.temperature
+            max_tokens = max_tokens if max_tokens is not None else self.service.max_tokens
+            
+            if limiter is not None:
+                await limiter.acquire_async(self.service.estimate_completion_tokens(messages, max_tokens))
+            async with self.semaphore:
+                raw_response = await self.client.chat.completions.with_raw_response.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    response_format=response_format
+                )
+            if limiter is not None:
+                limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            return response.choices[0].message.content
+        except Exception as e:
+            if limiter is not None:
+                limiter.update_from_headers(rate_limit_headers(e))
+            logger.error(f"Failed to get completion: {str(e)}")
+            raise
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.close()
@@ -1,21 +1,37 @@
 import openai
-import tiktoken
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Iterator
 from tenacity import retry, stop_after_attempt, wait_exponential
 from src.config.config import config
+from src.database.embedding_cache import EmbeddingCache
+from src.models.rate_limiter import get_rate_limiter
+from src.models.tokenizer import count_tokens, count_tokens_batch, count_message_tokens
+
+# Retry quickly: the rate limiter keeps requests under the limits, so retries
+# are for transient errors and should not stall callers for seconds
+RETRY_WAIT = wait_exponential(multiplier=0.5, min=0.5, max=10)
+
+def rate_limit_headers(error: Exception):
+    """Response headers attached to an API error, if any."""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
 
 logger = logging.getLogger(__name__)
 
 class OpenAIService:
     def __init__(self):
         openai.api_key = config.openai.api_key
+        if config.openai.base_url:
+            openai.base_url = config.openai.base_url
         self.model = config.openai.model
         self.embedding_model = config.openai.embedding_model
         self.max_tokens = config.openai.max_tokens
         self.temperature = config.openai.temperature
-        
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+        self.embedding_batch_size = config.openai.embedding_batch_size
+        self.embedding_batch_max_tokens = config.openai.embedding_batch_max_tokens
+        self.embedding_cache = EmbeddingCache.from_config() if config.cache.embedding_cache_enabled else None
+    
     def get_embedding(self, text: str) -> List[float]:
         """Get embedding vector for a text.
         
@@ -25,29 +41,126 @@ class OpenAIService:
         Returns:
             List[float]: The embedding vector
         """
-        try:
-            text = text.replace("\n", " ")
-            response = openai.embeddings.create(
-                input=[text],
-                model=self.embedding_model
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"Failed to get embedding: {str(e)}")
-            raise
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(self.embedding_model, text)
+            if cached is not None:
+                return cached
+        
+        embedding = self._embed_batch([text])[0]
+        
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(self.embedding_model, text, embedding)
+        
+        return embedding
     
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Get embedding vectors for multiple texts.
         
+        Cached embeddings are served locally; the remaining texts are packed
+        into as few `embeddings.create` calls as the batch limits allow. Each
+        batch is retried independently, so a transient failure only re-sends
+        the inputs of that batch.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            List[List[float]]: List of embedding vectors, in input order
+        """
+        if self.embedding_cache is not None:
+            embeddings = self.embedding_cache.get_many(self.embedding_model, texts)
+        else:
+            embeddings = [None] * len(texts)
+        
+        # Only texts that missed the cache go to the API
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        missing_texts = [texts[i] for i in missing]
+        token_counts = self.num_tokens_from_strings(missing_texts, self.embedding_model)
+        
+        for batch in self._plan_embedding_batches(missing_texts, token_counts):
+            batch_texts = [missing_texts[i] for i in batch]
+            vectors = self._embed_batch(batch_texts, sum(token_counts[i] for i in batch))
+            for index, vector in zip(batch, vectors):
+                embeddings[missing[index]] = vector
+            
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(self.embedding_model, batch_texts, vectors)
+        
+        return embeddings
+    
+    def _plan_embedding_batches(
+        self,
+        texts: List[str],
+        token_counts: Optional[List[int]] = None
+    ) -> List[List[int]]:
+        """Group text indices into batches bounded by input count and tokens.
+        
         Args:
             texts: List of texts to embed
+            token_counts: Token count of each text, if already known
             
         Returns:
-            List[List[float]]: List of embedding vectors
+            List[List[int]]: Batches of indices into `texts`
         """
-        return [self.get_embedding(text) for text in texts]
+        batches = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for i, text in enumerate(texts):
+            tokens = token_counts[i] if token_counts is not None else self.num_tokens_from_string(text, self.embedding_model)
+            
+            # Close the current batch if this text would overflow either limit
+            if current and (
+                len(current) >= self.embedding_batch_size
+                or current_tokens + tokens > self.embedding_batch_max_tokens
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            
+            current.append(i)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        
+        return batches
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(stop=stop_after_attempt(3), wait=RETRY_WAIT)
+    def _embed_batch(self, texts: List[str], tokens: Optional[int] = None) -> List[List[float]]:
+        """Embed a single batch of texts with one API call.
+        
+        Args:
+            texts: The texts in this batch
+            tokens: Total tokens in the batch, if already counted
+            
+        Returns:
+            List[List[float]]: Embedding vectors in the same order as `texts`
+        """
+        limiter = get_rate_limiter(self.embedding_model)
+        try:
+            if limiter is not None:
+                if tokens is None:
+                    tokens = sum(self.num_tokens_from_strings(texts, self.embedding_model))
+                limiter.acquire(tokens)
+            
+            raw_response = openai.embeddings.with_raw_response.create(
+                input=[text.replace("\n", " ") for text in texts],
+                model=self.embedding_model
+            )
+            if limiter is not None:
+                limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            # The API tags each result with its input index; don't rely on ordering
+            data = sorted(response.data, key=lambda item: item.index)
+            return [item.embedding for item in data]
+        except Exception as e:
+            if limiter is not None:
+                limiter.update_from_headers(rate_limit_headers(e))
+            logger.error(f"Failed to get embeddings for batch of {len(texts)}: {str(e)}")
+            raise
+    
+    @retry(stop=stop_after_attempt(3), wait=RETRY_WAIT)
     def get_completion(
         self, 
         messages: List[Dict[str, str]], 
@@ -66,23 +179,121 @@ class OpenAIService:
         Returns:
             str: Completion text
         """
+        limiter = get_rate_limiter(self.model)
         try:
             # Set defaults from config if not provided
             temperature = temperature if temperature is not None else self.temperature
             max_tokens = max_tokens if max_tokens is not None else self.max_tokens
             
-            response = openai.chat.completions.create(
+            if limiter is not None:
+                limiter.acquire(self.estimate_completion_tokens(messages, max_tokens))
+            
+            raw_response = openai.chat.completions.with_raw_response.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 response_format=response_format
             )
+            if limiter is not None:
+                limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
             return response.choices[0].message.content
         except Exception as e:
+            if limiter is not None:
+                limiter.update_from_headers(rate_limit_headers(e))
             logger.error(f"Failed to get completion: {str(e)}")
             raise
     
+    def stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> Iterator[str]:
+        """Stream a completion from OpenAI, yielding text as it arrives.
+        
+        Opening the stream is retried like `get_completion`; once text has
+        been yielded, errors are raised to the caller.
+        
+        Args:
+            messages: List of message dictionaries
+            temperature: Temperature for completion (default from config)
+            max_tokens: Max tokens for completion (default from config)
+            response_format: Optional response format (e.g. {"type": "json_object"})
+            
+        Yields:
+            str: Pieces of the completion text
+        """
+        temperature = temperature if temperature is not None else self.temperature
+        max_tokens = max_tokens if max_tokens is not None else self.max_tokens
+        
+        start = time.perf_counter()
+        stream = self._open_completion_stream(messages, temperature, max_tokens, response_format)
+        first = True
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    if first:
+                        logger.debug(f"First completion token after {time.perf_counter() - start:.3f}s")
+                        first = False
+                    yield content
+        except Exception as e:
+            logger.error(f"Completion stream failed: {str(e)}")
+            raise
+        finally:
+            stream.close()
+    
+    @retry(stop=stop_after_attempt(3), wait=RETRY_WAIT)
+    def _open_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict[str, str]]
+    ):
+        """Start a streaming chat completion and return the chunk stream."""
+        limiter = get_rate_limiter(self.model)
+        try:
+            if limiter is not None:
+                limiter.acquire(self.estimate_completion_tokens(messages, max_tokens))
+            
+            raw_response = openai.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=response_format,
+                stream=True
+            )
+            if limiter is not None:
+                limiter.update_from_headers(raw_response.headers)
+            return raw_response.parse()
+        except Exception as e:
+            if limiter is not None:
+                limiter.update_from_headers(rate_limit_headers(e))
+            logger.error(f"Failed to start completion stream: {str(e)}")
+            raise
+    
+    def estimate_completion_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Tokens a chat completion counts against the rate limit.
+        
+        The API reserves `max_tokens` for the response up front, so it is
+        counted in full along with the prompt.
+        
+        Args:
+            messages: List of message dictionaries
+            max_tokens: Max tokens for completion
+            
+        Returns:
+            int: Estimated prompt plus completion tokens
+        """
+        return count_message_tokens(messages, self.model) + max_tokens
+    
     def num_tokens_from_string(self, string: str, model: Optional[str] = None) -> int:
         """Calculate the number of tokens in a string.
         
@@ -93,6 +304,16 @@ class OpenAIService:
         Returns:
             int: Number of tokens
         """
-        model = model or self.model
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(string)) 
\ No newline at end of file
+        return count_tokens(string, model or self.model)
+    
+    def num_tokens_from_strings(self, strings: List[str], model: Optional[str] = None) -> List[int]:
+        """Calculate the number of tokens in each of several strings.
+        
+        Args:
+            strings: The strings to calculate tokens for
+            model: The model to use for tokenization (default from instance)
+            
+        Returns:
+            List[int]: Number of tokens in each string
+        """
+        return count_tokens_batch(strings, model or self.model) 
\ No newline at end of file
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional, Callable, Mapping
+
+from src.config.config import config
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """Parse an OpenAI reset header such as "20ms", "1s" or "6m0s" into seconds."""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+class TokenBucket:
+    """A bucket refilled continuously at `capacity` units per minute.
+    
+    Reservations are taken immediately and may drive the balance negative;
+    the caller then waits until the balance would have recovered. This
+    queues callers in arrival order without holding a lock while waiting.
+    A `ceiling` caps the capacity, including limits learned from the server.
+    """
+    
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        ceiling: Optional[float] = None
+    ):
+        self.ceiling = ceiling
+        self.capacity = float(per_minute) if ceiling is None else min(float(per_minute), ceiling)
+        self.clock = clock
+        self.balance = self.capacity
+        self.updated = clock()
+    
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+    
+    def _refill(self) -> None:
+        now = self.clock()
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self, amount: float) -> float:
+        """Take `amount` from the bucket and return the seconds to wait before using it."""
+        self._refill()
+        # A single request larger than the whole bucket waits for a full one
+        self.balance -= min(amount, self.capacity)
+        return -self.balance / self.rate if self.balance < 0 else 0.0
+    
+    def observe(self, limit: Optional[float], remaining: Optional[float], reset_seconds: Optional[float]) -> None:
+        """Reconcile the bucket with the server's view of the same limit."""
+        self._refill()
+        if limit:
+            self.capacity = float(limit) if self.ceiling is None else min(float(limit), self.ceiling)
+        if remaining is None:
+            return
+        # An exhausted limit stays closed until the server says it resets
+        server_balance = -reset_seconds * self.rate if remaining <= 0 and reset_seconds else remaining
+        # Only ever lower the balance: the server has not yet seen requests
+        # that were admitted locally but are still in flight
+        self.balance = min(self.balance, server_balance)
+
+class RateLimiter:
+    """Client-side requests-per-minute and tokens-per-minute limiter.
+    
+    Callers reserve one request and an estimated token cost before calling
+    the API, and block (or await) until both buckets allow it. Rate-limit
+    headers from responses are fed back with `update_from_headers`, so the
+    buckets track the account's real limits and usage, up to an optional
+    `token_budget_per_minute` the caller wants to stay under.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        token_budget_per_minute: Optional[float] = None
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock, ceiling=token_budget_per_minute)
+        self._lock = threading.Lock()
+    
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens; returns the seconds to wait."""
+        with self._lock:
+            return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+    
+    def acquire(self, tokens: int) -> float:
+        """Block until a request costing `tokens` may be sent.
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self, tokens: int) -> float:
+        """Awaitable version of `acquire`."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Feed `x-ratelimit-*` response headers back into the buckets."""
+        if not headers:
+            return
+        
+        def number(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+        
+        with self._lock:
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = number(f"x-ratelimit-remaining-{kind}")
+                limit = number(f"x-ratelimit-limit-{kind}")
+                if remaining is None and limit is None:
+                    continue
+                reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+                bucket.observe(limit, remaining, reset)
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """Process-wide limiter for a model, or None if rate limiting is disabled.
+    
+    OpenAI limits are per model, so each model gets its own buckets. They
+    start at the configured limits and adopt the server's limits from the
+    first response headers, never exceeding `token_budget_per_minute`. A
+    budget turns the limiter on even if rate limiting is otherwise disabled.
+    """
+    budget = config.openai.token_budget_per_minute or None
+    if not config.openai.rate_limit_enabled and budget is None:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = RateLimiter(
+                config.openai.requests_per_minute,
+                config.openai.tokens_per_minute,
+                token_budget_per_minute=budget
+            )
+            _limiters[model] = limiter
+        return limiter
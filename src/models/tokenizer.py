@@ -0,0 +1,75 @@
+import logging
+from functools import lru_cache
+from typing import List, Dict, Optional
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Encoding for models tiktoken doesn't know by name
+DEFAULT_ENCODING = "cl100k_base"
+
+# Per-message formatting tokens added by the chat format
+TOKENS_PER_MESSAGE = 4
+
+# Below this many texts, thread fan-out costs more than it saves
+_BATCH_THREAD_THRESHOLD = 16
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional[tiktoken.Encoding]:
+    """Resolve (and cache) the tokenizer for a model.
+    
+    Returns None if the encoding can't be loaded (tiktoken downloads it on
+    first use), in which case counts fall back to `estimate_tokens`.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            logger.warning(f"No tokenizer registered for {model}, using {DEFAULT_ENCODING}")
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer for {model}, estimating token counts: {str(e)}")
+        return None
+
+def count_tokens(text: str, model: str) -> int:
+    """Exact number of tokens in a string.
+    
+    Special-token text such as "<|endoftext|>" is counted as ordinary text,
+    matching how the API tokenizes user content.
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode_ordinary(text))
+
+def count_tokens_batch(texts: List[str], model: str, num_threads: int = 8) -> List[int]:
+    """Exact token counts for many strings, encoded across threads.
+    
+    Args:
+        texts: Strings to count
+        model: Model whose tokenizer to use
+        num_threads: Threads for tiktoken's batch encoder
+        
+    Returns:
+        List[int]: Token count of each string, in input order
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return [estimate_tokens(text) for text in texts]
+    if len(texts) < _BATCH_THREAD_THRESHOLD:
+        return [len(encoding.encode_ordinary(text)) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts, num_threads=num_threads)]
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str) -> int:
+    """Prompt tokens of a list of chat messages."""
+    return sum(count_tokens(message.get("content") or "", model) + TOKENS_PER_MESSAGE for message in messages)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper bound on the token count of a string.
+    
+    Byte-level BPE never produces more tokens than the UTF-8 bytes it
+    encodes, so this never undercounts. Use it where a safe overestimate is
+    enough (size limits, admission checks) and exact counts would be wasted.
+    """
+    return len(text.encode("utf-8"))
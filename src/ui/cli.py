@@ -6,13 +6,25 @@ from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.table import Table
 from rich.progress import Progress
-from typing import Dict, Any, Optional
+from rich.live import Live
+from rich.console import Group
+from rich.spinner import Spinner
+from rich.json import JSON
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from functools import lru_cache
 import os
+import time
+import asyncio
 
-from src.core.rag_service import RAGService
-from src.api.meta_ads_api import MetaAdsAPI
+from src.core.batch_runner import BatchRunner, load_briefs
 from src.utils.validators import CampaignValidator
 
+# The services pull in openai, pinecone, tiktoken and the facebook_business
+# SDK; they are imported when a command first needs them
+if TYPE_CHECKING:
+    from src.core.rag_service import RAGService
+    from src.api.meta_ads_api import MetaAdsAPI
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,10 +36,18 @@ logger = logging.getLogger(__name__)
 app = typer.Typer(help="AI-Powered Meta Ads Campaign Generator")
 console = Console()
 
-<<<<<<< HEAD
-@app.command()
-=======
->>>>>>> e6be9c0 (output structure changes)
+@lru_cache(maxsize=None)
+def get_rag_service() -> "RAGService":
+    """RAG service shared by the commands run in this process, built on first use."""
+    from src.core.rag_service import RAGService
+    return RAGService()
+
+@lru_cache(maxsize=None)
+def get_meta_ads_api() -> "MetaAdsAPI":
+    """Meta Ads API client shared by the commands run in this process, built on first use."""
+    from src.api.meta_ads_api import MetaAdsAPI
+    return MetaAdsAPI()
+
 def create_campaign(
     interactive: bool = typer.Option(
         True, "--interactive/--no-interactive", "-i/-n", 
@@ -38,16 +58,16 @@ def create_campaign(
         help="JSON file containing campaign brief"
     ),
     output_file: Optional[str] = typer.Option(
-<<<<<<< HEAD
-        None, "--output", "-o", 
-=======
         "campaign_spec.json", "--output", "-o", 
->>>>>>> e6be9c0 (output structure changes)
         help="Output file for generated campaign specification"
     ),
     execute: bool = typer.Option(
         False, "--execute/--no-execute", "-e/-E", 
         help="Execute campaign creation on Meta Ads platform"
+    ),
+    use_cache: bool = typer.Option(
+        True, "--cache/--no-cache",
+        help="Reuse a cached specification for an identical brief"
     )
 ):
     """
@@ -64,7 +84,7 @@ def create_campaign(
         ))
         
         # Initialize services
-        rag_service = RAGService()
+        rag_service = get_rag_service()
         
         # Collect campaign brief
         if interactive and not input_file:
@@ -80,14 +100,34 @@ def create_campaign(
         for key, value in campaign_brief.items():
             console.print(f"  [bold]{key}:[/bold] {value}")
         
-        # Generate campaign specification
-        with Progress() as progress:
-            task = progress.add_task("[green]Generating campaign specification...", total=1)
-            console.print("\n[bold]Generating campaign specification using AI...[/bold]")
-            campaign_spec = rag_service.generate_campaign(campaign_brief)
-            progress.update(task, advance=1)
+        # Generate campaign specification, showing each section as it streams in
+        console.print("\n[bold]Generating campaign specification using AI...[/bold]")
+        sections: Dict[str, Any] = {}
+        start = time.perf_counter()
+        first_section: Optional[float] = None
+        with Live(_render_sections(sections, done=False), console=console, refresh_per_second=8) as live:
+            def show_section(name: str, value: Any) -> None:
+                nonlocal first_section
+                if first_section is None:
+                    first_section = time.perf_counter() - start
+                sections[name] = value
+                live.update(_render_sections(sections, done=False))
+            
+            campaign_spec = rag_service.generate_campaign(
+                campaign_brief, use_cache=use_cache, on_section=show_section
+            )
+            live.update(_render_sections(sections, done=True))
+        if first_section is not None:
+            console.print(
+                f"[dim]First section after {first_section:.2f}s, "
+                f"complete after {time.perf_counter() - start:.2f}s[/dim]"
+            )
+        
+        # Check if generation was successful
+        if "error" in campaign_spec:
+            console.print(f"[bold red]Error generating campaign:[/bold red] {campaign_spec['error']}")
+            raise typer.Exit(code=1)
         
-<<<<<<< HEAD
         # Validate campaign specification
         console.print("\n[bold]Validating campaign specification...[/bold]")
         is_valid, validation_results = CampaignValidator.validate_campaign_specification(campaign_spec)
@@ -105,11 +145,6 @@ def create_campaign(
                 raise typer.Exit(code=1)
         else:
             console.print("[bold green]Campaign specification is valid![/bold green]")
-=======
-        # Check if generation was successful
-        if "error" in campaign_spec:
-            console.print(f"[bold red]Error generating campaign:[/bold red] {campaign_spec['error']}")
-            raise typer.Exit(code=1)
         
         # Save specification to file
         if rag_service.save_campaign_spec(campaign_spec, output_file):
@@ -117,20 +152,10 @@ def create_campaign(
         else:
             console.print("[bold red]Failed to save campaign specification[/bold red]")
             raise typer.Exit(code=1)
->>>>>>> e6be9c0 (output structure changes)
         
         # Display campaign specification summary
         _display_campaign_summary(campaign_spec)
         
-<<<<<<< HEAD
-        # Save specification if requested
-        if output_file:
-            with open(output_file, 'w') as f:
-                json.dump(campaign_spec, f, indent=2)
-            console.print(f"\n[bold green]Campaign specification saved to {output_file}[/bold green]")
-        
-=======
->>>>>>> e6be9c0 (output structure changes)
         # Execute campaign creation if requested
         if execute:
             _execute_campaign(campaign_spec)
@@ -142,12 +167,249 @@ def create_campaign(
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         raise typer.Exit(code=1)
 
-<<<<<<< HEAD
-=======
 # Register the command
 app.command()(create_campaign)
 
->>>>>>> e6be9c0 (output structure changes)
+def batch(
+    input_file: str = typer.Argument(
+        ..., help="JSONL file with one campaign brief per line"
+    ),
+    output_file: str = typer.Option(
+        "campaign_outputs/batch_results.jsonl", "--output", "-o",
+        help="JSONL file that results are appended to; completed briefs are skipped on re-run"
+    ),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-c",
+        help="Maximum number of briefs generated at once"
+    ),
+    tokens_per_minute: int = typer.Option(
+        0, "--tpm",
+        help="Token-per-minute budget across all OpenAI requests (0 for the account's limit)"
+    ),
+    use_cache: bool = typer.Option(
+        True, "--cache/--no-cache",
+        help="Reuse cached specifications for identical briefs"
+    ),
+    execute: bool = typer.Option(
+        False, "--execute/--no-execute", "-e/-E",
+        help="Create the campaigns generated in this run on Meta Ads, through batch requests"
+    )
+):
+    """
+    Generate campaign specifications for every brief in a JSONL file.
+    
+    Results are written to the output file as each brief finishes. Re-running
+    with the same output file resumes the batch, skipping briefs that already
+    succeeded. With --execute, the valid specifications generated in this run
+    are created on Meta Ads; ones from earlier runs are not pushed again.
+    """
+    try:
+        from src.core.async_rag_service import AsyncRAGService
+        from src.config.config import config
+        
+        if tokens_per_minute:
+            # Caps the shared rate limiter's token bucket, which every request goes through
+            config.openai.token_budget_per_minute = tokens_per_minute
+        
+        briefs = load_briefs(input_file)
+        console.print(f"[bold]Loaded {len(briefs)} briefs from {input_file}[/bold]")
+        generated: List[Dict[str, Any]] = []
+        
+        async def run_batch():
+            async with AsyncRAGService() as service:
+                if not use_cache:
+                    service.rag.response_cache = None
+                runner = BatchRunner(
+                    service,
+                    output_file,
+                    concurrency=concurrency
+                )
+                with Progress(console=console) as progress:
+                    task = progress.add_task("[green]Generating campaigns...", total=len(briefs))
+                    
+                    def on_result(record: Dict[str, Any]) -> None:
+                        progress.update(task, advance=1)
+                        if record["status"] == "ok":
+                            generated.append(record["campaign_spec"])
+                    
+                    summary = await runner.run(briefs, on_result=on_result)
+                    progress.update(task, completed=len(briefs))
+                return summary
+        
+        summary = asyncio.run(run_batch())
+        
+        console.print(
+            f"\n[bold green]{summary['succeeded']} succeeded[/bold green], "
+            f"[bold red]{summary['failed']} failed[/bold red], "
+            f"{summary['skipped']} already done. Results in {output_file}"
+        )
+        
+        not_created = 0
+        if execute:
+            not_created = _execute_campaigns(generated)
+        
+        if summary["failed"] or not_created:
+            raise typer.Exit(code=1)
+    
+    except typer.Exit:
+        raise
+    except Exception as e:
+        logger.exception("Error in batch generation")
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+
+app.command()(batch)
+
+def query(
+    question: str = typer.Argument(
+        ..., help="Question about Meta advertising to answer from the knowledge base"
+    ),
+    top_k: int = typer.Option(
+        5, "--top-k", "-k",
+        help="Number of knowledge base chunks to retrieve"
+    ),
+    use_cache: bool = typer.Option(
+        True, "--cache/--no-cache",
+        help="Reuse a cached answer for an identical question"
+    )
+):
+    """
+    Answer a question from the knowledge base, streaming the answer as it is written.
+    """
+    try:
+        rag_service = get_rag_service()
+        
+        answer = ""
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        with Live(Spinner("dots", text="Thinking..."), console=console, refresh_per_second=12) as live:
+            for piece in rag_service.query_stream(question, top_k=top_k, use_cache=use_cache):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                answer += piece
+                live.update(Markdown(answer))
+        
+        if first_token is not None:
+            console.print(
+                f"[dim]First token after {first_token:.2f}s, "
+                f"complete after {time.perf_counter() - start:.2f}s[/dim]"
+            )
+    
+    except Exception as e:
+        logger.exception("Error answering query")
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+
+app.command()(query)
+
+def validate(
+    sources: List[str] = typer.Argument(
+        ..., help="Spec files (.json/.jsonl, including batch output) or campaign directories such as campaigns/"
+    ),
+    output_file: Optional[str] = typer.Option(
+        None, "--output", "-o",
+        help="Write a JSONL summary line per spec to this file"
+    ),
+    show: int = typer.Option(
+        20, "--show",
+        help="Number of invalid specs to list"
+    ),
+    as_of: Optional[str] = typer.Option(
+        None, "--as-of",
+        help="Check schedules as of this ISO-8601 date or time instead of now, e.g. when archived specs were made"
+    ),
+    check_overlaps: bool = typer.Option(
+        True, "--overlaps/--no-overlaps",
+        help="Flag ad sets whose flights overlap another in the same ad account"
+    )
+):
+    """
+    Validate every campaign specification in files or directories at once.
+    
+    Exits with status 1 if any specification is invalid or unreadable.
+    """
+    try:
+        from src.utils.bulk_validator import BulkValidator
+        from src.utils.validators import parse_timestamp
+        
+        now = None
+        if as_of is not None:
+            now = parse_timestamp(as_of)
+            if now is None:
+                console.print(f"[bold red]Error:[/bold red] --as-of must be an ISO-8601 date or time, got {as_of!r}")
+                raise typer.Exit(code=2)
+        
+        start = time.perf_counter()
+        result = BulkValidator(check_overlaps=check_overlaps).validate_sources(sources, now=now)
+        seconds = time.perf_counter() - start
+        invalid = int((~result.is_valid).sum())
+        
+        console.print(
+            f"[bold]Validated {len(result.ids)} specifications in {seconds:.2f}s:[/bold] "
+            f"[green]{len(result.ids) - invalid} valid[/green], [red]{invalid} invalid[/red]"
+            + (f", [red]{len(result.errors)} unreadable[/red]" if result.errors else "")
+        )
+        
+        counts = result.counts()
+        if counts:
+            counts_table = Table(title="Issues", show_header=True)
+            counts_table.add_column("Issue", style="cyan")
+            counts_table.add_column("Specs", style="red", justify="right")
+            for code, count in counts.items():
+                counts_table.add_row(code, str(count))
+            console.print(counts_table)
+        
+        summary = result.summary()
+        invalid_specs = [entry for entry in summary if not entry["is_valid"]]
+        if invalid_specs and show > 0:
+            specs_table = Table(title="Invalid Specifications", show_header=True)
+            specs_table.add_column("Spec", style="cyan")
+            specs_table.add_column("Issues", style="red")
+            for entry in invalid_specs[:show]:
+                specs_table.add_row(entry["id"], ", ".join(entry["issue_codes"]))
+            console.print(specs_table)
+            if len(invalid_specs) > show:
+                console.print(f"[dim]... and {len(invalid_specs) - show} more[/dim]")
+        
+        for spec_id, message in result.errors:
+            console.print(f"[red]Unreadable:[/red] {spec_id}: {message}")
+        
+        if output_file:
+            with open(output_file, 'w') as f:
+                for entry in summary:
+                    f.write(json.dumps(entry) + "\n")
+            console.print(f"Summary written to {output_file}")
+        
+        if invalid or result.errors:
+            raise typer.Exit(code=1)
+    
+    except typer.Exit:
+        raise
+    except Exception as e:
+        logger.exception("Error validating specifications")
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+
+app.command()(validate)
+
+def _render_sections(sections: Dict[str, Any], done: bool):
+    """Render the campaign spec sections received so far.
+    
+    Args:
+        sections: Completed top-level sections, in arrival order
+        done: Whether generation has finished
+        
+    Returns:
+        A renderable for `rich.live.Live`
+    """
+    renderables = [
+        Panel(JSON.from_data(value), title=f"[bold]{name}[/bold]", title_align="left")
+        for name, value in sections.items()
+    ]
+    if not done:
+        renderables.append(Spinner("dots", text="Generating next section..."))
+    return Group(*renderables)
+
 def _collect_campaign_brief_interactive() -> Dict[str, Any]:
     """Collect campaign brief information interactively.
     
@@ -378,7 +640,7 @@ def _execute_campaign(campaign_spec: Dict[str, Any]) -> None:
         console.print("\n[bold]Executing campaign creation on Meta Ads platform...[/bold]")
         
         # Initialize Meta Ads API client
-        meta_ads_api = MetaAdsAPI()
+        meta_ads_api = get_meta_ads_api()
         
         # Create the campaign
         with Progress() as progress:
@@ -399,10 +661,60 @@ def _execute_campaign(campaign_spec: Dict[str, Any]) -> None:
             console.print("[bold red]Failed to create campaign:[/bold red]")
             console.print(f"  Stage: {response.get('stage', 'unknown')}")
             console.print(f"  Error: {response.get('error', 'unknown error')}")
+        
+        timings = response.get("timings", {})
+        if timings:
+            stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items() if stage != "total")
+            console.print(f"[dim]Created in {timings['total']:.2f}s ({stages})[/dim]")
             
     except Exception as e:
         console.print(f"[bold red]Error executing campaign:[/bold red] {str(e)}")
         raise
 
+def _execute_campaigns(campaign_specs: List[Dict[str, Any]]) -> int:
+    """Create many campaigns on Meta Ads through the Graph API batch endpoint.
+    
+    Specifications with validation issues are skipped, as nobody is there to
+    review them.
+    
+    Args:
+        campaign_specs: Campaign specification dictionaries
+        
+    Returns:
+        int: Number of campaigns that were not created
+    """
+    from src.api.batch_executor import BatchExecutor
+    
+    valid = [spec for spec in campaign_specs if CampaignValidator.validate_campaign_specification(spec)[0]]
+    skipped = len(campaign_specs) - len(valid)
+    if skipped:
+        console.print(f"[bold yellow]Skipping {skipped} specifications with validation issues[/bold yellow]")
+    if not valid:
+        return skipped
+    
+    console.print(f"\n[bold]Creating {len(valid)} campaigns on Meta Ads platform...[/bold]")
+    executor = BatchExecutor(get_meta_ads_api())
+    with Live(Spinner("dots", text="Sending batch requests..."), console=console):
+        results = executor.create_full_campaigns(valid)
+    
+    failed = [(spec, result) for spec, result in zip(valid, results) if not result["success"]]
+    console.print(
+        f"[bold green]{len(valid) - len(failed)} campaigns created[/bold green] "
+        f"in {executor.requests} batch requests"
+    )
+    if failed:
+        failures_table = Table(title="Failed Campaigns", show_header=True)
+        failures_table.add_column("Campaign", style="cyan")
+        failures_table.add_column("Stage")
+        failures_table.add_column("Error", style="red")
+        for spec, result in failed:
+            failures_table.add_row(
+                spec["campaign"]["name"],
+                result.get("stage", "unknown"),
+                result["error"].get("error_message", "unknown error")
+            )
+        console.print(failures_table)
+    return skipped + len(failed)
+
 if __name__ == "__main__":
     app() 
\ No newline at end of file
@@ -0,0 +1,396 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Dict, Any, List, Tuple, Optional, Iterable, Iterator, Union
+
+import numpy as np
+
+from src.utils.validators import CampaignValidator, ISSUE_MESSAGES, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Payload files saved for each generated campaign in the campaigns/ history
+PAYLOAD_FILES = ("campaign.json", "adset.json", "ad_set.json", "ad_creative.json", "ad.json")
+
+def spec_from_payloads(payloads: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild a campaign specification from saved Marketing API payloads.
+    
+    The payloads flatten the specification: the budget becomes a
+    `daily_budget` or `lifetime_budget` field, the schedule moves onto the
+    ad set and the creative is split into its own file. This maps them back
+    so archived campaigns can be checked with the same rules as new ones.
+    
+    Args:
+        payloads: Payload dictionaries by file name, e.g. "adset.json"
+        
+    Returns:
+        Dict[str, Any]: Specification with campaign, ad_set and ad sections
+            for the payloads present
+    """
+    spec: Dict[str, Any] = {}
+    if "campaign.json" in payloads:
+        spec["campaign"] = payloads["campaign.json"]
+    
+    ad_set = payloads.get("adset.json", payloads.get("ad_set.json"))
+    if isinstance(ad_set, dict):
+        ad_set = dict(ad_set)
+        for budget_type in ("daily", "lifetime"):
+            if f"{budget_type}_budget" in ad_set and "budget" not in ad_set:
+                ad_set["budget"] = {"amount": ad_set.pop(f"{budget_type}_budget"), "type": budget_type}
+        if "schedule" not in ad_set and ("start_time" in ad_set or "end_time" in ad_set):
+            ad_set["schedule"] = {
+                key: ad_set.pop(key) for key in ("start_time", "end_time") if key in ad_set
+            }
+        spec["ad_set"] = ad_set
+    elif ad_set is not None:
+        spec["ad_set"] = ad_set
+    
+    ad = payloads.get("ad.json")
+    creative_payload = payloads.get("ad_creative.json")
+    if ad is not None or creative_payload is not None:
+        ad = dict(ad) if isinstance(ad, dict) else {}
+        link_data = {}
+        if isinstance(creative_payload, dict):
+            link_data = (creative_payload.get("object_story_spec") or {}).get("link_data") or {}
+        creative = {}
+        for spec_key, payload_key in (("title", "name"), ("body", "message"), ("link", "link")):
+            if payload_key in link_data:
+                creative[spec_key] = link_data[payload_key]
+        call_to_action = link_data.get("call_to_action")
+        if isinstance(call_to_action, dict) and "type" in call_to_action:
+            creative["call_to_action"] = call_to_action["type"]
+        ad["creative"] = creative
+        spec["ad"] = ad
+    
+    return spec
+
+def _read_json(path: str) -> Any:
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _spec_from_record(record: Any) -> Any:
+    """Unwrap a `batch` output record; anything else is taken as a spec."""
+    if isinstance(record, dict) and "campaign_spec" in record and "campaign" not in record:
+        return record["campaign_spec"]
+    return record
+
+def _iter_path(path: str, errors: List[Tuple[str, str]]) -> Iterator[Tuple[str, Any]]:
+    if os.path.isdir(path):
+        if os.path.exists(os.path.join(path, "campaign.json")):
+            payloads = {}
+            for name in PAYLOAD_FILES:
+                file_path = os.path.join(path, name)
+                if os.path.exists(file_path):
+                    try:
+                        payloads[name] = _read_json(file_path)
+                    except (OSError, ValueError) as e:
+                        errors.append((file_path, str(e)))
+                        return
+            yield path, spec_from_payloads(payloads)
+            return
+        for name in sorted(os.listdir(path)):
+            child = os.path.join(path, name)
+            if os.path.isdir(child) or name.endswith((".json", ".jsonl")):
+                yield from _iter_path(child, errors)
+        return
+    
+    if path.endswith(".jsonl"):
+        with open(path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                spec_id = f"{path}:{line_number}"
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    errors.append((spec_id, str(e)))
+                    continue
+                if isinstance(record, dict) and isinstance(record.get("key"), str):
+                    spec_id = f"{path}:{record['key']}"
+                spec = _spec_from_record(record)
+                if spec is None:
+                    error = record.get("error") if isinstance(record, dict) else None
+                    errors.append((spec_id, error or "No campaign specification"))
+                    continue
+                yield spec_id, spec
+        return
+    
+    try:
+        data = _read_json(path)
+    except (OSError, ValueError) as e:
+        errors.append((path, str(e)))
+        return
+    if isinstance(data, list):
+        for index, record in enumerate(data):
+            yield f"{path}[{index}]", _spec_from_record(record)
+    else:
+        yield path, _spec_from_record(data)
+
+def iter_specs(
+    sources: Iterable[Union[str, Dict[str, Any]]],
+    errors: Optional[List[Tuple[str, str]]] = None
+) -> Iterator[Tuple[str, Any]]:
+    """Yield `(spec_id, spec)` for every specification in the sources.
+    
+    A source is a spec dictionary or a path to:
+    - a campaign directory of saved payloads (see `spec_from_payloads`)
+    - a directory such as campaigns/, searched for campaign directories and
+      .json/.jsonl files
+    - a JSONL file of specs or of `batch` output records
+    - a JSON file holding one spec or a list of them
+    
+    Args:
+        sources: Paths and spec dictionaries
+        errors: Unreadable entries are logged and skipped; if a list is
+            given they are also appended to it as `(spec_id, message)`
+    """
+    errors = [] if errors is None else errors
+    for index, source in enumerate(sources):
+        if isinstance(source, dict):
+            yield str(index), _spec_from_record(source)
+            continue
+        reported = len(errors)
+        yield from _iter_path(os.fspath(source), errors)
+        for spec_id, message in errors[reported:]:
+            logger.warning(f"Skipping {spec_id}: {message}")
+
+def _flight(spec: Dict[str, Any]) -> Optional[Tuple[str, float, float]]:
+    """`(account, start, end)` of a spec's ad set schedule, if it has a valid one.
+    
+    Specs carry no ad account unless they set a top-level `account_id`, so
+    by default all of them belong to the configured account. A schedule
+    without an end time runs indefinitely.
+    """
+    ad_set = spec.get("ad_set")
+    schedule = ad_set.get("schedule") if isinstance(ad_set, dict) else None
+    if not isinstance(schedule, dict):
+        return None
+    start = parse_timestamp(schedule.get("start_time"))
+    if start is None:
+        return None
+    end = parse_timestamp(schedule.get("end_time")) if "end_time" in schedule else float("inf")
+    if end is None or end <= start:
+        return None
+    return str(spec.get("account_id") or ""), start, end
+
+def find_overlapping_flights(flights: List[Tuple[str, float, float]]) -> Dict[int, int]:
+    """Find flights that overlap another flight of the same account.
+    
+    Flights are sorted by account and start time and swept once, keeping
+    the flight that ends last so far: a flight overlaps an earlier one
+    exactly when it starts before that end. This stays O(n log n) even
+    when every flight overlaps every other.
+    
+    Args:
+        flights: `(account, start, end)` per flight, as POSIX times
+        
+    Returns:
+        Dict[int, int]: For each overlapping flight, by position, the
+            position of one flight it overlaps
+    """
+    overlaps: Dict[int, int] = {}
+    account = latest = None
+    for index in sorted(range(len(flights)), key=lambda index: flights[index][:2]):
+        flight_account, start, end = flights[index]
+        if latest is None or flight_account != account:
+            account, latest = flight_account, index
+            continue
+        latest_end = flights[latest][2]
+        if start < latest_end:
+            overlaps[index] = latest
+            overlaps.setdefault(latest, index)
+        if end > latest_end:
+            latest = index
+    return overlaps
+
+@dataclass
+class BulkValidationResult:
+    """Issues of many specifications as a matrix.
+    
+    `issues[i, j]` is True when spec `ids[i]` has at least one issue with
+    code `codes[j]`. `overlaps` maps the id of each spec whose flight
+    overlaps another in the same account to the id of one such spec.
+    """
+    ids: List[str]
+    codes: List[str]
+    issues: np.ndarray
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+    overlaps: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def is_valid(self) -> np.ndarray:
+        """Boolean mask of specs without issues."""
+        return ~self.issues.any(axis=1)
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of specs with each issue code, most common first."""
+        totals = self.issues.sum(axis=0)
+        order = np.argsort(-totals, kind="stable")
+        return {self.codes[j]: int(totals[j]) for j in order if totals[j]}
+    
+    @classmethod
+    def concatenate(cls, results: List["BulkValidationResult"]) -> "BulkValidationResult":
+        """Stack results for different specs, aligning their issue codes."""
+        codes: List[str] = []
+        for result in results:
+            codes.extend(code for code in result.codes if code not in codes)
+        blocks = []
+        for result in results:
+            block = np.zeros((len(result.ids), len(codes)), dtype=bool)
+            block[:, [codes.index(code) for code in result.codes]] = result.issues
+            blocks.append(block)
+        return cls(
+            ids=[spec_id for result in results for spec_id in result.ids],
+            codes=codes,
+            issues=np.concatenate(blocks) if blocks else np.zeros((0, len(codes)), dtype=bool),
+            errors=[error for result in results for error in result.errors],
+            overlaps={spec_id: other for result in results for spec_id, other in result.overlaps.items()}
+        )
+    
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-spec summary: id, validity, issue codes and any overlapping spec."""
+        codes = np.array(self.codes, dtype=object)
+        entries = []
+        for spec_id, row in zip(self.ids, self.issues):
+            entry = {"id": spec_id, "is_valid": not row.any(), "issue_codes": codes[row].tolist()}
+            if spec_id in self.overlaps:
+                entry["overlaps"] = self.overlaps[spec_id]
+            entries.append(entry)
+        return entries
+
+class BulkValidator:
+    """Validate many campaign specifications into one issue matrix.
+    
+    Each spec is checked with `CampaignValidator.check`, without formatting
+    messages, and the issues of all specs are written into the matrix with
+    one NumPy scatter. Columns are the known issue codes in
+    `ISSUE_MESSAGES` order, so matrices from different runs line up.
+    
+    Across the batch, ad set flights that overlap another flight in the
+    same account are reported as "schedule.overlap" (see
+    `find_overlapping_flights`) unless `check_overlaps` is False.
+    
+    Example:
+        result = BulkValidator().validate_sources(["campaigns"])
+        print(result.counts())
+    """
+    
+    def __init__(self, validator: type = CampaignValidator, check_overlaps: bool = True):
+        self.validator = validator
+        self.check_overlaps = check_overlaps
+        self.required_sections = frozenset(validator.REQUIRED_SECTIONS)
+    
+    def validate(
+        self,
+        specs: Iterable[Any],
+        ids: Optional[List[str]] = None,
+        now: Optional[float] = None
+    ) -> BulkValidationResult:
+        """Validate specifications.
+        
+        Args:
+            specs: Campaign specifications
+            ids: Identifiers for the specs (their positions by default)
+            now: POSIX time schedules are checked against (the current time by default)
+            
+        Returns:
+            BulkValidationResult: Issue matrix over the specs
+        """
+        flights: List[Tuple[int, Tuple[str, float, float]]] = []
+        result = self._validate(specs, ids, time.time() if now is None else now, flights, 0)
+        return self._mark_overlaps(result, flights)
+    
+    def _validate(
+        self,
+        specs: Iterable[Any],
+        ids: Optional[List[str]],
+        now: float,
+        flights: List[Tuple[int, Tuple[str, float, float]]],
+        offset: int
+    ) -> BulkValidationResult:
+        """Validate without overlap checks, appending `(row + offset, flight)` to `flights`."""
+        check = self.validator.check
+        required_sections = self.required_sections
+        found: List[str] = []
+        owners: List[int] = []
+        count = 0
+        for row, spec in enumerate(specs):
+            count += 1
+            if not isinstance(spec, dict) or not spec.keys() >= required_sections:
+                found.append("spec.missing_sections")
+                owners.append(row)
+                continue
+            issues = check(spec, now)
+            if issues:
+                found.extend(issue.code for issue in issues)
+                owners.extend(repeat(row, len(issues)))
+            if self.check_overlaps:
+                flight = _flight(spec)
+                if flight is not None:
+                    flights.append((row + offset, flight))
+        
+        codes = list(ISSUE_MESSAGES)
+        codes.extend(code for code in dict.fromkeys(found) if code not in ISSUE_MESSAGES)
+        column = {code: index for index, code in enumerate(codes)}
+        matrix = np.zeros((count, len(codes)), dtype=bool)
+        matrix[np.array(owners, dtype=np.int64), np.array([column[code] for code in found], dtype=np.int64)] = True
+        
+        ids = [str(index) for index in range(count)] if ids is None else list(ids)
+        return BulkValidationResult(ids, codes, matrix)
+    
+    @staticmethod
+    def _mark_overlaps(
+        result: BulkValidationResult,
+        flights: List[Tuple[int, Tuple[str, float, float]]]
+    ) -> BulkValidationResult:
+        overlaps = find_overlapping_flights([flight for _, flight in flights])
+        if overlaps:
+            rows = {index: row for index, (row, _) in enumerate(flights)}
+            column = result.codes.index("schedule.overlap")
+            result.issues[[rows[index] for index in overlaps], column] = True
+            result.overlaps = {
+                result.ids[rows[index]]: result.ids[rows[other]] for index, other in overlaps.items()
+            }
+        return result
+    
+    def validate_sources(
+        self,
+        sources: Iterable[Union[str, Dict[str, Any]]],
+        chunk_size: int = 1000,
+        now: Optional[float] = None
+    ) -> BulkValidationResult:
+        """Load specifications with `iter_specs` and validate them.
+        
+        Specs are validated `chunk_size` at a time and dropped once
+        checked, so the garbage collector never has to scan a whole archive
+        of parsed JSON. Only their flights are kept for the overlap check.
+        
+        Args:
+            sources: Paths and spec dictionaries
+            chunk_size: Number of specs validated at once
+            now: POSIX time schedules are checked against (the current time by default)
+            
+        Returns:
+            BulkValidationResult: Issue matrix, with unreadable entries in `errors`
+        """
+        now = time.time() if now is None else now
+        errors: List[Tuple[str, str]] = []
+        flights: List[Tuple[int, Tuple[str, float, float]]] = []
+        results = []
+        validated = 0
+        ids, specs = [], []
+        for spec_id, spec in iter_specs(sources, errors):
+            ids.append(spec_id)
+            specs.append(spec)
+            if len(specs) >= chunk_size:
+                results.append(self._validate(specs, ids, now, flights, validated))
+                validated += len(specs)
+                ids, specs = [], []
+        if specs or not results:
+            results.append(self._validate(specs, ids, now, flights, validated))
+        result = BulkValidationResult.concatenate(results)
+        result.errors = errors
+        return self._mark_overlaps(result, flights)
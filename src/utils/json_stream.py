@@ -0,0 +1,81 @@
+import json
+import logging
+from typing import List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class JsonSectionParser:
+    """Incrementally parse the top-level members of a streamed JSON object.
+    
+    Feed completion text as it arrives; each call returns the `(key, value)`
+    members of the top-level object that have been completed since the last
+    call. A member is complete once the comma or closing brace after its
+    value arrives. Characters are scanned once, so feeding a long stream
+    piece by piece costs time linear in its length.
+    """
+    
+    def __init__(self):
+        self.buffer = ""
+        self.done = False
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Add streamed text and return the members it completed.
+        
+        Args:
+            text: Next piece of the JSON document
+            
+        Returns:
+            List[Tuple[str, Any]]: Newly completed top-level members, in order
+            
+        Raises:
+            json.JSONDecodeError: If a completed member is not valid JSON
+        """
+        self.buffer += text
+        sections = []
+        buffer = self.buffer
+        
+        for position in range(self._position, len(buffer)):
+            char = buffer[position]
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None:
+                        self._key = json.loads(buffer[self._string_start:position + 1])
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(buffer, position, sections)
+                    self.done = True
+            elif char == ":" and self._depth == 1:
+                self._value_start = position + 1
+            elif char == "," and self._depth == 1:
+                self._complete(buffer, position, sections)
+        
+        self._position = len(buffer)
+        return sections
+    
+    def _complete(self, buffer: str, end: int, sections: List[Tuple[str, Any]]) -> None:
+        """Decode the member whose value ends at `end`, if one is open."""
+        if self._key is not None and self._value_start is not None:
+            sections.append((self._key, json.loads(buffer[self._value_start:end])))
+        self._key = None
+        self._value_start = None
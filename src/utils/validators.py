@@ -1,11 +1,223 @@
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+import re
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Optional, NamedTuple, Callable
 import json
 
 logger = logging.getLogger(__name__)
 
+# Message templates by issue code. Arguments that are tuples are joined with
+# ", " when the message is formatted.
+ISSUE_MESSAGES = {
+    "spec.missing_sections": "Missing required top-level sections in campaign specification",
+    "campaign.missing_fields": "Missing required campaign fields: {0}",
+    "campaign.name.too_long": "Campaign name exceeds maximum length of {0} characters",
+    "campaign.objective.invalid": "Invalid campaign objective: {0}. Must be one of: {1}",
+    "campaign.status.invalid": "Invalid campaign status: {0}. Must be one of: {1}",
+    "ad_set.missing_fields": "Missing required ad set fields: {0}",
+    "ad_set.name.too_long": "Ad set name exceeds maximum length of {0} characters",
+    "ad_set.optimization_goal.incompatible": "Invalid optimization goal '{0}' for campaign objective '{1}'",
+    "ad_set.billing_event.invalid": "Invalid billing event: {0}. Must be one of: {1}",
+    "ad_set.bid_strategy.invalid": "Invalid bid strategy: {0}. Must be one of: {1}",
+    "budget.missing_fields": "Missing required budget fields: {0}",
+    "budget.type.invalid": "Invalid budget type: {0}. Must be one of: {1}",
+    "budget.amount.too_low": "Budget amount must be at least {0} cents",
+    "budget.amount.invalid": "Invalid budget amount: {0}. Must be a number",
+    "targeting.missing_fields": "Missing required targeting field: {0}",
+    "targeting.age_min.too_low": "Minimum age cannot be less than {0}",
+    "targeting.age_max.too_high": "Maximum age cannot be greater than {0}",
+    "targeting.age_range.inverted": "Minimum age cannot be greater than maximum age",
+    "targeting.age.invalid": "Age values must be integers",
+    "targeting.genders.invalid": "Invalid gender value: {0}. Must be one of: [{1}]",
+    "schedule.start_time.invalid": "Invalid start time: {0}. Must be an ISO-8601 timestamp",
+    "schedule.end_time.invalid": "Invalid end time: {0}. Must be an ISO-8601 timestamp",
+    "schedule.start_time.past": "Start time {0} is in the past",
+    "schedule.end_before_start": "Start time must be before end time",
+    "schedule.flight.too_short": "Flight must run for at least {0} hours",
+    "schedule.overlap": "Flight overlaps {0} in the same ad account",
+    "ad.missing_fields": "Missing required ad fields: {0}",
+    "ad.name.too_long": "Ad name exceeds maximum length of {0} characters",
+    "creative.missing_fields": "Missing required creative fields: {0}",
+    "creative.title.too_long": "Ad title exceeds maximum length of {0} characters",
+    "creative.body.too_long": "Ad body exceeds maximum length of {0} characters",
+    "creative.image_description.too_long": "Image description exceeds maximum length of {0} characters",
+    "creative.call_to_action.invalid": "Invalid call to action: {0}. Must be one of: {1}",
+    "creative.link.invalid": "Link URL must start with http:// or https://",
+}
+
+class ValidationIssue(NamedTuple):
+    """A validation failure: a stable code and the values its message needs.
+    
+    The message is only formatted when asked for, so checking a spec costs
+    nothing beyond the checks themselves.
+    """
+    code: str
+    args: Tuple[Any, ...] = ()
+    
+    @property
+    def message(self) -> str:
+        args = [", ".join(map(str, arg)) if isinstance(arg, tuple) else arg for arg in self.args]
+        return ISSUE_MESSAGES[self.code].format(*args)
+    
+    def __str__(self) -> str:
+        return self.message
+
+def _is_member(value: Any, allowed: frozenset) -> bool:
+    try:
+        return value in allowed
+    except TypeError:
+        # Unhashable values (lists, dicts) are never valid enum members
+        return False
+
+# UTC offset written without a colon (-0700) or as Z, which
+# datetime.fromisoformat only accepts from Python 3.11
+_OFFSET = re.compile(r"(?:([+-]\d{2})(\d{2})|Z)$")
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(value: str) -> Optional[float]:
+    try:
+        parsed = datetime.fromisoformat(_OFFSET.sub(lambda m: f"{m[1]}:{m[2]}" if m[1] else "+00:00", value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Parse an ISO-8601 date or timestamp into seconds since the epoch.
+    
+    Results are memoized, since generated ad sets share a handful of flight
+    dates. Timestamps without an offset are taken as UTC.
+    
+    Args:
+        value: Timestamp such as "2025-05-12T00:00:00-0700"
+        
+    Returns:
+        Optional[float]: POSIX timestamp, or None if the value is not an
+            ISO-8601 string
+    """
+    if not isinstance(value, str):
+        return None
+    return _parse_timestamp(value)
+
+# Marks an absent field
+_ABSENT = object()
+
+# Rule builders. Each takes the rule's field, argument and issue code and
+# returns a check(section, spec, add, now) closure with its constants bound,
+# so nothing is looked up in the rule table while a spec is checked.
+
+def _max_length(field: str, limit: int, code: str) -> Callable:
+    args = (limit,)
+    def check(section, spec, add, now):
+        value = section.get(field)
+        if isinstance(value, str) and len(value) > limit:
+            add(ValidationIssue(code, args))
+    return check
+
+def _one_of(field: str, choices: List[Any], code: str) -> Callable:
+    # The allowed set includes _ABSENT so an absent field passes in the same lookup
+    allowed = frozenset(choices) | {_ABSENT}
+    choices = tuple(choices)
+    def check(section, spec, add, now):
+        if not _is_member(section.get(field, _ABSENT), allowed):
+            add(ValidationIssue(code, (section[field], choices)))
+    return check
+
+def _each_one_of(field: str, choices: List[Any], code: str) -> Callable:
+    allowed = frozenset(choices)
+    choices = tuple(choices)
+    def check(section, spec, add, now):
+        for value in section.get(field) or ():
+            if not _is_member(value, allowed):
+                add(ValidationIssue(code, (value, choices)))
+    return check
+
+def _url(field: str, prefixes: Tuple[str, ...], code: str) -> Callable:
+    def check(section, spec, add, now):
+        value = section[field]
+        if not isinstance(value, str) or not value.startswith(prefixes):
+            add(ValidationIssue(code))
+    return check
+
+def _min_amount(field: str, minimum: float, code: str) -> Callable:
+    args = (minimum,)
+    def check(section, spec, add, now):
+        try:
+            if float(section[field]) < minimum:
+                add(ValidationIssue(code, args))
+        except (ValueError, TypeError):
+            add(ValidationIssue("budget.amount.invalid", (section[field],)))
+    return check
+
+def _age_range(field: Optional[str], bounds: Tuple[int, int], code: Optional[str]) -> Callable:
+    lowest, highest = bounds
+    def check(section, spec, add, now):
+        if "age_min" not in section or "age_max" not in section:
+            return
+        try:
+            age_min = int(section["age_min"])
+            age_max = int(section["age_max"])
+        except (ValueError, TypeError):
+            add(ValidationIssue("targeting.age.invalid"))
+            return
+        if age_min < lowest:
+            add(ValidationIssue("targeting.age_min.too_low", (lowest,)))
+        if age_max > highest:
+            add(ValidationIssue("targeting.age_max.too_high", (highest,)))
+        if age_min > age_max:
+            add(ValidationIssue("targeting.age_range.inverted"))
+    return check
+
+def _objective_goal(field: str, argument: Tuple[Dict[str, List[str]], Tuple[str, ...]], code: str) -> Callable:
+    goals_by_objective, campaign_required = argument
+    allowed = {objective: frozenset(goals) for objective, goals in goals_by_objective.items()}
+    campaign_required = frozenset(campaign_required)
+    def check(section, spec, add, now):
+        campaign = spec["campaign"]
+        if not isinstance(campaign, dict):
+            campaign = {}
+        objective = campaign.get("objective")
+        goals = allowed.get(objective) if isinstance(objective, str) else None
+        if goals is None and campaign.keys() >= campaign_required:
+            # The campaign rules already reported this objective as invalid
+            return
+        if goals is None or not _is_member(section[field], goals):
+            add(ValidationIssue(code, (section[field], objective)))
+    return check
+
+def _schedule(field: Optional[str], minimum_hours: float, code: Optional[str]) -> Callable:
+    minimum_seconds = minimum_hours * 3600
+    args = (minimum_hours,)
+    def check(section, spec, add, now):
+        start = end = None
+        if "start_time" in section:
+            start = parse_timestamp(section["start_time"])
+            if start is None:
+                add(ValidationIssue("schedule.start_time.invalid", (section["start_time"],)))
+            elif start < now:
+                add(ValidationIssue("schedule.start_time.past", (section["start_time"],)))
+        if "end_time" in section:
+            end = parse_timestamp(section["end_time"])
+            if end is None:
+                add(ValidationIssue("schedule.end_time.invalid", (section["end_time"],)))
+        if start is None or end is None:
+            return
+        if end <= start:
+            add(ValidationIssue("schedule.end_before_start"))
+        elif end - start < minimum_seconds:
+            add(ValidationIssue("schedule.flight.too_short", args))
+    return check
+
 class CampaignValidator:
-    """Validator for Meta Ads campaign specifications."""
+    """Validator for Meta Ads campaign specifications.
+    
+    The rules are declared once in `rule_table` and bound at import into
+    closures over frozenset lookups; `check` then visits each section of a
+    spec exactly once.
+    """
     
     # Meta Ads character limits
     CHARACTER_LIMITS = {
@@ -19,11 +231,11 @@ class CampaignValidator:
     
     # Valid campaign objectives for Meta Ads
     VALID_OBJECTIVES = [
-        "OUTCOME_AWARENESS", 
-        "OUTCOME_ENGAGEMENT", 
-        "OUTCOME_SALES", 
-        "OUTCOME_LEAD_GENERATION", 
-        "OUTCOME_APP_PROMOTION", 
+        "OUTCOME_AWARENESS",
+        "OUTCOME_ENGAGEMENT",
+        "OUTCOME_SALES",
+        "OUTCOME_LEAD_GENERATION",
+        "OUTCOME_APP_PROMOTION",
         "OUTCOME_TRAFFIC"
     ]
     
@@ -50,364 +262,177 @@ class CampaignValidator:
         "SHOP_NOW", "SIGN_UP", "SUBSCRIBE", "USE_APP", "WATCH_MORE", "WATCH_VIDEO"
     ]
     
+    VALID_CAMPAIGN_STATUSES = ["ACTIVE", "PAUSED", "DELETED", "ARCHIVED"]
+    VALID_BUDGET_TYPES = ["daily", "lifetime"]
+    VALID_GENDERS = [1, 2]  # 1 = male, 2 = female
+    
     # Minimum daily budget in cents
     MINIMUM_DAILY_BUDGET = 100
     
+    # Targeting age bounds
+    MINIMUM_AGE = 13
+    MAXIMUM_AGE = 65
+    
+    # Shortest flight (start to end time) in hours
+    MINIMUM_FLIGHT_HOURS = 24
+    
+    REQUIRED_SECTIONS = ("campaign", "ad_set", "ad")
+    
     @classmethod
-    def validate_campaign_specification(cls, campaign_spec: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+    def validate_campaign_specification(
+        cls,
+        campaign_spec: Dict[str, Any],
+        now: Optional[float] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
         """Validate a complete campaign specification.
         
         Args:
             campaign_spec: The campaign specification to validate
+            now: POSIX time schedules are checked against (the current time by default)
             
         Returns:
-            Tuple[bool, Dict[str, Any]]: (is_valid, validation_results)
+            Tuple[bool, Dict[str, Any]]: (is_valid, validation_results), where
+                the results hold "issues" (messages) and "issue_codes"
         """
-        issues = []
-        missing_fields = []
-        
-        # Validate campaign structure
-        cls._validate_required_sections(campaign_spec, ["campaign", "ad_set", "ad"], missing_fields)
-        
-        if missing_fields:
+        missing_sections = [section for section in cls.REQUIRED_SECTIONS if section not in campaign_spec]
+        if missing_sections:
+            issue = ValidationIssue("spec.missing_sections")
             return False, {
                 "is_valid": False,
-                "missing_required_sections": missing_fields,
-                "issues": ["Missing required top-level sections in campaign specification"]
+                "missing_required_sections": missing_sections,
+                "issues": [issue.message],
+                "issue_codes": [issue.code]
             }
         
-        # Validate campaign fields
-        campaign_issues = cls._validate_campaign(campaign_spec["campaign"])
-        issues.extend(campaign_issues)
-        
-        # Validate ad set fields
-        ad_set_issues = cls._validate_ad_set(campaign_spec["ad_set"], campaign_spec["campaign"].get("objective"))
-        issues.extend(ad_set_issues)
-        
-        # Validate ad fields
-        ad_issues = cls._validate_ad(campaign_spec["ad"])
-        issues.extend(ad_issues)
-        
-        # Validate cross-section relationships
-        relationship_issues = cls._validate_cross_section_relationships(campaign_spec)
-        issues.extend(relationship_issues)
-        
-        # Return validation results
-        is_valid = len(issues) == 0
+        issues = cls.check(campaign_spec, now)
+        is_valid = not issues
         
         return is_valid, {
             "is_valid": is_valid,
-            "issues": issues
+            "issues": [issue.message for issue in issues],
+            "issue_codes": [issue.code for issue in issues]
         }
     
     @classmethod
-    def _validate_required_sections(cls, data: Dict[str, Any], required_sections: List[str], 
-                                   missing_fields: List[str]) -> None:
-        """Validate that required sections exist in the data.
+    def check(cls, campaign_spec: Dict[str, Any], now: Optional[float] = None) -> List[ValidationIssue]:
+        """Collect the issues of a spec in one pass, without formatting messages.
         
-        Args:
-            data: The data to validate
-            required_sections: List of required section names
-            missing_fields: List to add missing fields to
-        """
-        for section in required_sections:
-            if section not in data:
-                missing_fields.append(section)
-    
-    @classmethod
-    def _validate_required_fields(cls, data: Dict[str, Any], required_fields: List[str], 
-                                 section: str, missing_fields: List[str]) -> None:
-        """Validate that required fields exist in the data.
-        
-        Args:
-            data: The data to validate
-            required_fields: List of required field names
-            section: Section name for error messages
-            missing_fields: List to add missing fields to
-        """
-        for field in required_fields:
-            if field not in data:
-                missing_fields.append(f"{section}.{field}")
-    
-    @classmethod
-    def _validate_campaign(cls, campaign: Dict[str, Any]) -> List[str]:
-        """Validate campaign section.
+        Sections are visited in rule table order. A section whose required
+        fields are missing reports them and is skipped along with its child
+        sections, as are children of sections that are absent.
         
         Args:
-            campaign: Campaign data to validate
+            campaign_spec: The campaign specification to validate
+            now: POSIX time schedules are checked against (the current time by default)
             
         Returns:
-            List[str]: List of validation issues
+            List[ValidationIssue]: Issues in section and rule order
         """
-        issues = []
-        missing_fields = []
-        
-        # Check required fields
-        required_fields = ["name", "objective", "status"]
-        cls._validate_required_fields(campaign, required_fields, "campaign", missing_fields)
-        
-        if missing_fields:
-            issues.append(f"Missing required campaign fields: {', '.join(missing_fields)}")
-            return issues
-        
-        # Validate campaign name length
-        if len(campaign["name"]) > cls.CHARACTER_LIMITS["campaign_name"]:
-            issues.append(f"Campaign name exceeds maximum length of {cls.CHARACTER_LIMITS['campaign_name']} characters")
-        
-        # Validate objective
-        if campaign["objective"] not in cls.VALID_OBJECTIVES:
-            issues.append(f"Invalid campaign objective: {campaign['objective']}. Must be one of: {', '.join(cls.VALID_OBJECTIVES)}")
-        
-        # Validate status
-        if campaign["status"] not in ["ACTIVE", "PAUSED", "DELETED", "ARCHIVED"]:
-            issues.append(f"Invalid campaign status: {campaign['status']}. Must be one of: ACTIVE, PAUSED, DELETED, ARCHIVED")
-        
+        issues: List[ValidationIssue] = []
+        cls._check(campaign_spec, issues.append, time.time() if now is None else now)
         return issues
     
     @classmethod
-    def _validate_ad_set(cls, ad_set: Dict[str, Any], campaign_objective: Optional[str] = None) -> List[str]:
-        """Validate ad set section.
-        
-        Args:
-            ad_set: Ad set data to validate
-            campaign_objective: Optional campaign objective for cross-validation
-            
-        Returns:
-            List[str]: List of validation issues
+    def rule_table(cls) -> Tuple:
+        """The rules, as (section, parent section, key in parent, label for
+        missing fields, required fields, field rules) where each field rule is
+        (builder, field, argument, issue code).
         """
-        issues = []
-        missing_fields = []
-        
-        # Check required fields
-        required_fields = ["name", "optimization_goal", "billing_event", "bid_strategy", "budget", "targeting"]
-        cls._validate_required_fields(ad_set, required_fields, "ad_set", missing_fields)
-        
-        if missing_fields:
-            issues.append(f"Missing required ad set fields: {', '.join(missing_fields)}")
-            return issues
-        
-        # Validate ad set name length
-        if len(ad_set["name"]) > cls.CHARACTER_LIMITS["ad_set_name"]:
-            issues.append(f"Ad set name exceeds maximum length of {cls.CHARACTER_LIMITS['ad_set_name']} characters")
-        
-        # Validate optimization goal
-        if campaign_objective and ad_set["optimization_goal"] not in cls.VALID_OPTIMIZATION_GOALS.get(campaign_objective, []):
-            issues.append(f"Invalid optimization goal '{ad_set['optimization_goal']}' for campaign objective '{campaign_objective}'")
-        
-        # Validate billing event
-        if ad_set["billing_event"] not in cls.VALID_BILLING_EVENTS:
-            issues.append(f"Invalid billing event: {ad_set['billing_event']}. Must be one of: {', '.join(cls.VALID_BILLING_EVENTS)}")
-        
-        # Validate bid strategy
-        if ad_set["bid_strategy"] not in cls.VALID_BID_STRATEGIES:
-            issues.append(f"Invalid bid strategy: {ad_set['bid_strategy']}. Must be one of: {', '.join(cls.VALID_BID_STRATEGIES)}")
-        
-        # Validate budget
-        budget_issues = cls._validate_budget(ad_set["budget"])
-        issues.extend(budget_issues)
-        
-        # Validate targeting
-        targeting_issues = cls._validate_targeting(ad_set["targeting"])
-        issues.extend(targeting_issues)
-        
-        # Validate schedule if present
-        if "schedule" in ad_set:
-            schedule_issues = cls._validate_schedule(ad_set["schedule"])
-            issues.extend(schedule_issues)
-        
-        return issues
+        limits = cls.CHARACTER_LIMITS
+        campaign_required = ("name", "objective", "status")
+        return (
+            ("campaign", None, "campaign", "campaign", campaign_required, (
+                (_max_length, "name", limits["campaign_name"], "campaign.name.too_long"),
+                (_one_of, "objective", cls.VALID_OBJECTIVES, "campaign.objective.invalid"),
+                (_one_of, "status", cls.VALID_CAMPAIGN_STATUSES, "campaign.status.invalid"),
+            )),
+            ("ad_set", None, "ad_set", "ad_set",
+             ("name", "optimization_goal", "billing_event", "bid_strategy", "budget", "targeting"), (
+                (_max_length, "name", limits["ad_set_name"], "ad_set.name.too_long"),
+                (_objective_goal, "optimization_goal", (cls.VALID_OPTIMIZATION_GOALS, campaign_required),
+                 "ad_set.optimization_goal.incompatible"),
+                (_one_of, "billing_event", cls.VALID_BILLING_EVENTS, "ad_set.billing_event.invalid"),
+                (_one_of, "bid_strategy", cls.VALID_BID_STRATEGIES, "ad_set.bid_strategy.invalid"),
+            )),
+            ("budget", "ad_set", "budget", "budget", ("amount", "type"), (
+                (_one_of, "type", cls.VALID_BUDGET_TYPES, "budget.type.invalid"),
+                (_min_amount, "amount", cls.MINIMUM_DAILY_BUDGET, "budget.amount.too_low"),
+            )),
+            ("targeting", "ad_set", "targeting", "", ("geo_locations",), (
+                (_age_range, None, (cls.MINIMUM_AGE, cls.MAXIMUM_AGE), None),
+                (_each_one_of, "genders", cls.VALID_GENDERS, "targeting.genders.invalid"),
+            )),
+            ("schedule", "ad_set", "schedule", "schedule", (), (
+                (_schedule, None, cls.MINIMUM_FLIGHT_HOURS, None),
+            )),
+            ("ad", None, "ad", "ad", ("name", "creative"), (
+                (_max_length, "name", limits["ad_name"], "ad.name.too_long"),
+            )),
+            ("creative", "ad", "creative", "creative", ("title", "body", "call_to_action", "link"), (
+                (_max_length, "title", limits["ad_title"], "creative.title.too_long"),
+                (_max_length, "body", limits["ad_body"], "creative.body.too_long"),
+                (_max_length, "image_description", limits["image_description"], "creative.image_description.too_long"),
+                (_one_of, "call_to_action", cls.VALID_CTA_TYPES, "creative.call_to_action.invalid"),
+                (_url, "link", ("http://", "https://"), "creative.link.invalid"),
+            )),
+        )
     
     @classmethod
-    def _validate_budget(cls, budget: Dict[str, Any]) -> List[str]:
-        """Validate budget configuration.
+    def compile(cls) -> None:
+        """Bind `rule_table` into the function `check` runs.
         
-        Args:
-            budget: Budget data to validate
-            
-        Returns:
-            List[str]: List of validation issues
+        Called once at import; call it again after changing the rule
+        constants on the class.
         """
-        issues = []
-        missing_fields = []
-        
-        # Check required fields
-        required_fields = ["amount", "type"]
-        cls._validate_required_fields(budget, required_fields, "budget", missing_fields)
-        
-        if missing_fields:
-            issues.append(f"Missing required budget fields: {', '.join(missing_fields)}")
-            return issues
-        
-        # Validate budget type
-        if budget["type"] not in ["daily", "lifetime"]:
-            issues.append(f"Invalid budget type: {budget['type']}. Must be one of: daily, lifetime")
-        
-        # Validate budget amount
-        try:
-            amount = float(budget["amount"])
-            if amount < cls.MINIMUM_DAILY_BUDGET:
-                issues.append(f"Budget amount must be at least {cls.MINIMUM_DAILY_BUDGET} cents")
-        except (ValueError, TypeError):
-            issues.append(f"Invalid budget amount: {budget['amount']}. Must be a number")
-        
-        return issues
+        cls._check = compile_rules(cls.rule_table())
+
+def _missing_fields(section: Dict[str, Any], required: Tuple[str, ...], label: str) -> Tuple[str, ...]:
+    return tuple(f"{label}.{field}" if label else field for field in required if field not in section)
+
+def _compile_section(sections: Tuple, index: int) -> Callable:
+    name, parent, key, label, required, rules = sections[index]
+    checks = tuple(kind(field, argument, code) for kind, field, argument, code in rules)
+    children = tuple(
+        _compile_section(sections, child) for child in range(index + 1, len(sections))
+        if sections[child][1] == name
+    )
+    required_keys = frozenset(required)
+    required = tuple(required)
+    missing_code = f"{name}.missing_fields"
     
-    @classmethod
-    def _validate_targeting(cls, targeting: Dict[str, Any]) -> List[str]:
-        """Validate targeting configuration.
-        
-        Args:
-            targeting: Targeting data to validate
-            
-        Returns:
-            List[str]: List of validation issues
-        """
-        issues = []
-        
-        # Check for geo_locations (required)
-        if "geo_locations" not in targeting:
-            issues.append("Missing required targeting field: geo_locations")
-            return issues
-        
-        # Validate age range if specified
-        if "age_min" in targeting and "age_max" in targeting:
-            try:
-                age_min = int(targeting["age_min"])
-                age_max = int(targeting["age_max"])
-                
-                if age_min < 13:
-                    issues.append("Minimum age cannot be less than 13")
-                
-                if age_max > 65:
-                    issues.append("Maximum age cannot be greater than 65")
-                
-                if age_min > age_max:
-                    issues.append("Minimum age cannot be greater than maximum age")
-            except (ValueError, TypeError):
-                issues.append("Age values must be integers")
-        
-        # Validate gender values if specified
-        if "genders" in targeting:
-            valid_genders = [1, 2]  # 1 = male, 2 = female
-            for gender in targeting["genders"]:
-                if gender not in valid_genders:
-                    issues.append(f"Invalid gender value: {gender}. Must be one of: {valid_genders}")
-        
-        return issues
+    def check(container, spec, add, now):
+        section = container.get(key)
+        if section is None:
+            return
+        if not isinstance(section, dict):
+            section = {}
+        if not section.keys() >= required_keys:
+            add(ValidationIssue(missing_code, (_missing_fields(section, required, label),)))
+            return
+        for rule in checks:
+            rule(section, spec, add, now)
+        for child in children:
+            child(section, spec, add, now)
+    return check
+
+def compile_rules(sections: Tuple) -> Callable:
+    """Bind a rule table into one function that checks a whole spec.
     
-    @classmethod
-    def _validate_schedule(cls, schedule: Dict[str, Any]) -> List[str]:
-        """Validate schedule configuration.
-        
-        Args:
-            schedule: Schedule data to validate
-            
-        Returns:
-            List[str]: List of validation issues
-        """
-        issues = []
-        
-        # Check start and end times
-        if "start_time" in schedule and "end_time" in schedule:
-            start_time = schedule["start_time"]
-            end_time = schedule["end_time"]
-            
-            # Simplified validation - in practice would use datetime parsing
-            if start_time >= end_time:
-                issues.append("Start time must be before end time")
-        
-        return issues
+    Every rule becomes a closure with its constants bound, and every section
+    a closure that runs its rules and then its child sections, only when
+    the section is present and has all its required fields.
     
-    @classmethod
-    def _validate_ad(cls, ad: Dict[str, Any]) -> List[str]:
-        """Validate ad section.
+    Args:
+        sections: Rule table in the format of `CampaignValidator.rule_table`
         
-        Args:
-            ad: Ad data to validate
-            
-        Returns:
-            List[str]: List of validation issues
-        """
-        issues = []
-        missing_fields = []
-        
-        # Check required fields
-        required_fields = ["name", "creative"]
-        cls._validate_required_fields(ad, required_fields, "ad", missing_fields)
-        
-        if missing_fields:
-            issues.append(f"Missing required ad fields: {', '.join(missing_fields)}")
-            return issues
-        
-        # Validate ad name length
-        if len(ad["name"]) > cls.CHARACTER_LIMITS["ad_name"]:
-            issues.append(f"Ad name exceeds maximum length of {cls.CHARACTER_LIMITS['ad_name']} characters")
-        
-        # Validate creative
-        creative_issues = cls._validate_creative(ad["creative"])
-        issues.extend(creative_issues)
-        
-        return issues
-    
-    @classmethod
-    def _validate_creative(cls, creative: Dict[str, Any]) -> List[str]:
-        """Validate creative configuration.
-        
-        Args:
-            creative: Creative data to validate
-            
-        Returns:
-            List[str]: List of validation issues
-        """
-        issues = []
-        missing_fields = []
-        
-        # Check required fields
-        required_fields = ["title", "body", "call_to_action", "link"]
-        cls._validate_required_fields(creative, required_fields, "creative", missing_fields)
-        
-        if missing_fields:
-            issues.append(f"Missing required creative fields: {', '.join(missing_fields)}")
-            return issues
-        
-        # Validate text lengths
-        if len(creative["title"]) > cls.CHARACTER_LIMITS["ad_title"]:
-            issues.append(f"Ad title exceeds maximum length of {cls.CHARACTER_LIMITS['ad_title']} characters")
-        
-        if len(creative["body"]) > cls.CHARACTER_LIMITS["ad_body"]:
-            issues.append(f"Ad body exceeds maximum length of {cls.CHARACTER_LIMITS['ad_body']} characters")
-        
-        if "image_description" in creative and len(creative["image_description"]) > cls.CHARACTER_LIMITS["image_description"]:
-            issues.append(f"Image description exceeds maximum length of {cls.CHARACTER_LIMITS['image_description']} characters")
-        
-        # Validate call to action
-        if creative["call_to_action"] not in cls.VALID_CTA_TYPES:
-            issues.append(f"Invalid call to action: {creative['call_to_action']}. Must be one of: {', '.join(cls.VALID_CTA_TYPES)}")
-        
-        # Simple URL validation
-        if not creative["link"].startswith(("http://", "https://")):
-            issues.append("Link URL must start with http:// or https://")
-        
-        return issues
+    Returns:
+        Callable: `check(spec, add, now)`
+    """
+    roots = tuple(_compile_section(sections, index) for index, section in enumerate(sections) if section[1] is None)
     
-    @classmethod
-    def _validate_cross_section_relationships(cls, campaign_spec: Dict[str, Any]) -> List[str]:
-        """Validate relationships between different sections.
-        
-        Args:
-            campaign_spec: Complete campaign specification
-            
-        Returns:
-            List[str]: List of validation issues
-        """
-        issues = []
-        
-        # Check that optimization goal is compatible with campaign objective
-        if "campaign" in campaign_spec and "objective" in campaign_spec["campaign"] and "ad_set" in campaign_spec and "optimization_goal" in campaign_spec["ad_set"]:
-            objective = campaign_spec["campaign"]["objective"]
-            optimization_goal = campaign_spec["ad_set"]["optimization_goal"]
-            
-            if objective in cls.VALID_OPTIMIZATION_GOALS and optimization_goal not in cls.VALID_OPTIMIZATION_GOALS[objective]:
-                issues.append(f"Optimization goal '{optimization_goal}' is not compatible with campaign objective '{objective}'")
-        
-        return issues 
\ No newline at end of file
+    def check(spec, add, now):
+        for root in roots:
+            root(spec, spec, add, now)
+    return check
+
+CampaignValidator.compile()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.ann_index import IVFQuantizer, recall_at_k
+from src.database.local_index import LocalVectorIndex
+
+def _clustered_vectors(count, dimension=32, clusters=20, seed=0):
+    """Vectors scattered around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension))
+    labels = rng.integers(0, clusters, size=count)
+    return (centres[labels] + 0.3 * rng.standard_normal((count, dimension))).astype(np.float32)
+
+class TestIVFIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = LocalVectorIndex(self.tmp_dir.name, dimension=32, ann=True, nprobe=16, ann_min_vectors=1000)
+        self.vectors = _clustered_vectors(2000)
+        for start in range(0, 2000, 500):
+            self.index.upsert(
+                [{"id": str(i), "values": self.vectors[i]} for i in range(start, start + 500)],
+                namespace="default"
+            )
+        self.namespace = self.index.namespace("default")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_quantizer_trained_once_threshold_reached(self):
+        self.assertIsNotNone(self.namespace._quantizer)
+        # Segments written after training get their lists at insert time
+        for segment in self.namespace._segments:
+            self.assertEqual(segment.get_lists(self.namespace._ivf_name).shape, (segment.rows,))
+    
+    def test_recall_against_exact_search(self):
+        queries = _clustered_vectors(50, seed=1)
+        
+        self.assertGreaterEqual(self.namespace.recall_at_k(queries, top_k=10), 0.9)
+        
+        self.namespace.nprobe = self.namespace._quantizer.nlist
+        self.assertEqual(self.namespace.recall_at_k(queries, top_k=10), 1.0)
+    
+    def test_ann_state_survives_reopen_and_compaction(self):
+        self.namespace.compact()
+        reopened = LocalVectorIndex(self.tmp_dir.name, dimension=32, nprobe=4).namespace("default")
+        
+        self.assertEqual(reopened._ivf_name, self.namespace._ivf_name)
+        results = reopened.query(self.vectors[7], top_k=1)
+        self.assertEqual(results["matches"][0]["id"], "7")
+    
+    def test_recall_at_k_helper(self):
+        self.assertEqual(recall_at_k([["a", "b"], ["c", "d"]], [["a", "x"], ["d", "c"]]), 0.75)
+    
+    def test_train_handles_fewer_vectors_than_lists(self):
+        quantizer = IVFQuantizer.train(self.vectors[:3] / np.linalg.norm(self.vectors[:3], axis=1, keepdims=True), nlist=10)
+        self.assertEqual(quantizer.nlist, 3)
+
+if __name__ == '__main__':
+    unittest.main()
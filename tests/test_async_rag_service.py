@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, AsyncMock
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.core.async_rag_service import AsyncRAGService
+from src.models.async_openai_service import AsyncOpenAIService
+from src.database.async_vector_store import AsyncVectorStore
+
+class FakeEmbeddings:
+    """Async stand-in for `client.embeddings` that tracks concurrency."""
+    
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+    
+    async def create(self, input, model):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        # Return results out of order to check they are re-sorted
+        data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+        response = SimpleNamespace(data=list(reversed(data)))
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+class TestAsyncOpenAIService(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        service = MagicMock()
+        service.model = "gpt-4o-mini"
+        service.embedding_model = "text-embedding-ada-002"
+        service.embedding_cache = None
+        service.num_tokens_from_strings.side_effect = lambda texts, model=None: [len(text) for text in texts]
+        service._plan_embedding_batches.side_effect = lambda texts, token_counts=None: [[i] for i in range(len(texts))]
+        self.embeddings = FakeEmbeddings()
+        self.client = SimpleNamespace(embeddings=SimpleNamespace(with_raw_response=self.embeddings))
+        self.service = AsyncOpenAIService(service=service, client=self.client)
+        self.service.max_concurrent_requests = 2
+    
+    async def test_batches_run_concurrently_within_limit(self):
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+        
+        embeddings = await self.service.get_embeddings(texts)
+        
+        self.assertEqual(embeddings, [[1.0], [2.0], [3.0], [4.0], [5.0]])
+        self.assertEqual(self.embeddings.calls, 5)
+        self.assertEqual(self.embeddings.max_in_flight, 2)
+
+class TestAsyncRAGService(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.rag = MagicMock()
+        self.rag._parse_campaign_spec.side_effect = json.loads
+        self.rag._campaign_messages.return_value = [{"role": "user", "content": "brief"}]
+        self.rag.response_cache = None
+        self.openai = MagicMock()
+        self.openai.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+        self.openai.get_completion = AsyncMock(return_value='{"campaign": {}}')
+        self.openai.aclose = AsyncMock()
+        self.vector_store = MagicMock()
+        self.vector_store.query = AsyncMock(return_value={"matches": [
+            {"id": "1", "score": 0.9, "metadata": {"text": "Doc", "source": "a.md"}}
+        ]})
+        self.service = AsyncRAGService(self.rag, self.openai, self.vector_store)
+    
+    async def test_retrieve_relevant_context(self):
+        documents = await self.service.retrieve_relevant_context("query", top_k=3)
+        
+        self.assertEqual(documents, [{"id": "1", "text": "Doc", "metadata": {"source": "a.md"}, "score": 0.9}])
+        self.vector_store.query.assert_awaited_once_with(query_vector=[0.1, 0.2], top_k=3, filter=None)
+    
+    async def test_generate_campaigns_keeps_order_and_reports_failures(self):
+        self.openai.get_completion.side_effect = ['{"n": 1}', RuntimeError("boom"), '{"n": 3}']
+        
+        results = await self.service.generate_campaigns([{"b": 1}, {"b": 2}, {"b": 3}], concurrency=1)
+        
+        self.assertEqual(results[0], {"n": 1})
+        self.assertEqual(results[1], {"error": "boom", "status": "failed"})
+        self.assertEqual(results[2], {"n": 3})
+    
+    async def test_query_uses_shared_prompt(self):
+        self.rag._query_messages.return_value = [{"role": "user", "content": "q"}]
+        self.openai.get_completion.return_value = "Answer"
+        
+        async with self.service as service:
+            answer = await service.query("q")
+        
+        self.assertEqual(answer, "Answer")
+        self.rag._query_messages.assert_called_once()
+        self.openai.aclose.assert_awaited_once()
+
+class TestAsyncVectorStore(unittest.IsolatedAsyncioTestCase):
+    
+    async def test_calls_run_off_the_event_loop(self):
+        store = MagicMock()
+        store.query.return_value = {"matches": []}
+        
+        result = await AsyncVectorStore(store).query([0.1], top_k=2)
+        
+        self.assertEqual(result, {"matches": []})
+        store.query.assert_called_once_with([0.1], 2, None)
+
+if __name__ == '__main__':
+    unittest.main()
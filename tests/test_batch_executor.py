@@ -0,0 +1,160 @@
+import unittest
+import json
+import re
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from urllib.parse import parse_qsl
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from facebook_business.api import FacebookAdsApiBatch
+from src.api.batch_executor import BatchExecutor, Reference, encode_body
+from src.api.meta_ads_api import MetaAdsAPI
+
+_REFERENCE = re.compile(r"\{result=([^:]+):\$\.id\}")
+
+class FakeGraphApi:
+    """Executes batch requests the way the Graph API does, resolving references.
+    
+    `errors` maps a call name to the error codes it fails with, one per attempt.
+    """
+    
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.batches = []
+        self.next_id = 100
+    
+    def new_batch(self):
+        return FacebookAdsApiBatch(self)
+    
+    def call(self, method, path, params=None, files=None):
+        calls = params["batch"]
+        self.batches.append(calls)
+        created = {}
+        responses = []
+        for call in calls:
+            references = _REFERENCE.findall(call["body"])
+            if any(name not in created for name in references):
+                # Dependencies that failed are not run
+                responses.append(None)
+                continue
+            body = _REFERENCE.sub(lambda match: created[match.group(1)], call["body"])
+            errors = self.errors.get(call["name"], [])
+            if errors:
+                code, subcode = errors.pop(0)
+                error = {"error": {"code": code, "error_subcode": subcode, "message": "failed"}}
+                responses.append({"code": 400, "headers": [], "body": json.dumps(error)})
+                continue
+            self.next_id += 1
+            created[call["name"]] = str(self.next_id)
+            call["resolved"] = dict(parse_qsl(body))
+            responses.append({"code": 200, "headers": [], "body": json.dumps({"id": str(self.next_id)})})
+        return SimpleNamespace(json=lambda: responses)
+
+class TestBatchExecutor(unittest.TestCase):
+    
+    def setUp(self):
+        self.meta = MetaAdsAPI.__new__(MetaAdsAPI)
+        self.meta.ad_account = MagicMock()
+        self.meta.ad_account.get_id_assured.return_value = "act_1"
+        self.spec = {
+            "campaign": {"name": "Campaign", "objective": "OUTCOME_SALES", "status": "PAUSED"},
+            "ad_set": {
+                "name": "Ad Set",
+                "optimization_goal": "REACH",
+                "billing_event": "IMPRESSIONS",
+                "bid_strategy": "LOWEST_COST_WITHOUT_CAP",
+                "budget": {"amount": 1000, "type": "daily"},
+                "targeting": {"geo_locations": {"countries": ["US"]}}
+            },
+            "ad": {
+                "name": "Ad",
+                "creative": {"title": "T", "body": "B", "call_to_action": "LEARN_MORE", "link": "https://example.com"}
+            }
+        }
+    
+    def _executor(self, errors=None, batch_size=50):
+        self.meta.api = FakeGraphApi(errors)
+        return BatchExecutor(self.meta, max_attempts=3, batch_size=batch_size, sleep=lambda seconds: None)
+    
+    def test_campaign_trees_go_out_in_one_request(self):
+        executor = self._executor()
+        
+        results = executor.create_full_campaigns([self.spec, self.spec])
+        
+        self.assertEqual(executor.requests, 1)
+        self.assertEqual(len(self.meta.api.batches[0]), 8)
+        self.assertTrue(all(result["success"] for result in results))
+        # The ad references the ad set and creative created in the same request
+        ad_call = self.meta.api.batches[0][3]
+        self.assertEqual(ad_call["resolved"]["adset_id"], results[0]["ad_set_id"])
+        self.assertEqual(json.loads(ad_call["resolved"]["creative"]), {"creative_id": results[0]["creative_id"]})
+    
+    def test_batches_never_split_a_campaign(self):
+        executor = self._executor(batch_size=6)
+        
+        executor.create_full_campaigns([self.spec] * 3)
+        
+        self.assertEqual([len(batch) for batch in self.meta.api.batches], [4, 4, 4])
+    
+    def test_only_failed_calls_are_retried(self):
+        executor = self._executor(errors={"ad_set_1": [(100, 33)]})
+        
+        results = executor.create_full_campaigns([self.spec, self.spec])
+        
+        self.assertTrue(all(result["success"] for result in results))
+        retry = self.meta.api.batches[1]
+        self.assertEqual([call["name"] for call in retry], ["ad_set_1", "ad_1"])
+        # The campaign created in the first round is referenced by ID
+        self.assertEqual(retry[0]["resolved"]["campaign_id"], results[1]["campaign_id"])
+    
+    def test_permanent_errors_fail_only_their_campaign(self):
+        executor = self._executor(errors={"campaign_0": [(100, 1487930)]})
+        
+        results = executor.create_full_campaigns([self.spec, self.spec])
+        
+        self.assertFalse(results[0]["success"])
+        self.assertEqual(results[0]["stage"], "campaign")
+        self.assertEqual(results[0]["error"]["error_subcode"], 1487930)
+        self.assertTrue(results[1]["success"])
+        self.assertEqual(executor.requests, 1)
+    
+    def test_invalid_specs_are_not_sent(self):
+        executor = self._executor()
+        
+        results = executor.create_full_campaigns([{"campaign": {}}])
+        
+        self.assertFalse(results[0]["success"])
+        self.assertEqual(self.meta.api.batches, [])
+
+class TestEncodeBody(unittest.TestCase):
+    
+    def test_matches_the_sdk_encoding(self):
+        params = {
+            "name": "Ünïcode & = / ?",
+            "daily_budget": 1000,
+            "targeting": {"geo_locations": {"countries": ["US"]}, "age_min": 18},
+            "special_ad_categories": [],
+            "is_dynamic": True
+        }
+        call = FacebookAdsApiBatch(None).add('POST', 'act_1/adsets', params=params)
+        
+        self.assertEqual(encode_body(params), call["body"])
+    
+    def test_references_are_not_quoted(self):
+        body = encode_body({
+            "adset_id": Reference.to("ad_set_0"),
+            "creative": {"creative_id": Reference.to("ad_creative_0")}
+        })
+        
+        self.assertEqual(
+            body,
+            "adset_id={result=ad_set_0:$.id}&creative=%7B%22creative_id%22%3A%22{result=ad_creative_0:$.id}%22%7D"
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.core.batch_runner import BatchRunner, brief_key, completed_keys, load_briefs
+
+class FakeService:
+    """Async campaign generator that fails for briefs marked `fail`."""
+    
+    def __init__(self):
+        self.generated = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def generate_campaign(self, brief):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.generated.append(brief["id"])
+        if brief.get("fail"):
+            return {"error": "bad brief", "status": "failed"}
+        return {"campaign": {"name": f"Campaign {brief['id']}"}}
+
+class TestBatchRunner(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.tmp_dir.name, "out", "results.jsonl")
+        self.briefs = [{"id": f"b{i}", "product_name": f"Product {i}"} for i in range(6)]
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def _read_output(self):
+        with open(self.output_file) as f:
+            return [json.loads(line) for line in f]
+    
+    def test_streams_every_result_within_concurrency(self):
+        service = FakeService()
+        summary = asyncio.run(BatchRunner(service, self.output_file, concurrency=2).run(self.briefs))
+        
+        self.assertEqual(summary["succeeded"], 6)
+        self.assertEqual(service.max_in_flight, 2)
+        self.assertEqual(sorted(r["key"] for r in self._read_output()), [f"b{i}" for i in range(6)])
+    
+    def test_resume_skips_completed_and_retries_failed(self):
+        self.briefs[1]["fail"] = True
+        asyncio.run(BatchRunner(FakeService(), self.output_file).run(self.briefs))
+        # Simulate a crash while the last line was being written
+        with open(self.output_file, 'a') as f:
+            f.write('{"key": "b9", "status": "o')
+        
+        del self.briefs[1]["fail"]
+        service = FakeService()
+        summary = asyncio.run(BatchRunner(service, self.output_file).run(self.briefs))
+        
+        self.assertEqual(service.generated, ["b1"])
+        self.assertEqual(summary["skipped"], 5)
+        self.assertEqual(completed_keys(self.output_file), {f"b{i}" for i in range(6)})
+    
+    def test_load_briefs_and_keys(self):
+        path = os.path.join(self.tmp_dir.name, "briefs.jsonl")
+        with open(path, 'w') as f:
+            f.write(json.dumps({"request_id": "r1"}) + "\n\n" + json.dumps({"product_name": "X"}) + "\n")
+        
+        briefs = load_briefs(path)
+        
+        self.assertEqual(brief_key(briefs[0]), "r1")
+        self.assertEqual(brief_key(briefs[1]), brief_key({"product_name": "X"}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from benchmarks.corpus import make_documents, make_briefs
+from benchmarks.run_benchmarks import compare, flatten
+
+def _report(**results):
+    return {"meta": {}, "results": results}
+
+class TestBenchmarkCorpus(unittest.TestCase):
+    
+    def test_corpora_are_reproducible(self):
+        self.assertEqual(make_documents(20, seed=1), make_documents(20, seed=1))
+        self.assertNotEqual(make_documents(20, seed=1), make_documents(20, seed=2))
+        self.assertEqual(make_briefs(5), make_briefs(5))
+
+class TestBenchmarkComparison(unittest.TestCase):
+    
+    def test_flatten_joins_benchmark_size_and_metric(self):
+        flat = flatten({"vector_query": {"100": {"p50_ms": 1.0}}})
+        
+        self.assertEqual(flat, {"vector_query.100.p50_ms": 1.0})
+    
+    def test_flags_slowdowns_beyond_tolerance_in_either_direction(self):
+        baseline = _report(
+            chunk_text={"100": {"mb_per_sec": 100.0, "docs_per_sec": 1000.0}},
+            vector_query={"100": {"p50_ms": 1.0, "p95_ms": 2.0}}
+        )
+        current = _report(
+            chunk_text={"100": {"mb_per_sec": 70.0, "docs_per_sec": 950.0}},
+            vector_query={"100": {"p50_ms": 1.1, "p95_ms": 3.0}}
+        )
+        
+        regressions = compare(current, baseline, tolerance=0.2)
+        
+        self.assertEqual(
+            sorted(regression["metric"] for regression in regressions),
+            ["chunk_text.100.mb_per_sec", "vector_query.100.p95_ms"]
+        )
+    
+    def test_ignores_metrics_missing_from_baseline_or_without_direction(self):
+        baseline = _report(embeddings={"100": {"texts": 400}})
+        current = _report(embeddings={"100": {"texts": 10, "texts_per_sec": 1.0}})
+        
+        self.assertEqual(compare(current, baseline), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.fakes.openai_server import canned_campaign_spec
+from src.utils.bulk_validator import (
+    BulkValidator, BulkValidationResult, find_overlapping_flights, iter_specs, spec_from_payloads
+)
+from src.utils.validators import CampaignValidator, parse_timestamp
+
+# Before the flights in the fixtures below start
+NOW = parse_timestamp("2025-05-01T00:00:00Z")
+
+ADSET_PAYLOAD = {
+    "name": "Fitness Enthusiasts Targeting",
+    "campaign_id": "{{campaign_id}}",
+    "optimization_goal": "OFFSITE_CONVERSIONS",
+    "billing_event": "IMPRESSIONS",
+    "bid_strategy": "LOWEST_COST_WITHOUT_CAP",
+    "lifetime_budget": 1000,
+    "status": "PAUSED",
+    "targeting": {"geo_locations": {"countries": ["US"]}, "age_min": 28, "age_max": 50, "genders": [1, 2]},
+    "start_time": "2025-05-12T00:00:00-0700",
+    "end_time": "2025-06-11T23:59:59-0700"
+}
+
+CREATIVE_PAYLOAD = {
+    "name": "Premium Fitness Gear Ad - Creative",
+    "object_story_spec": {
+        "page_id": "{{page_id}}",
+        "link_data": {
+            "name": "Elevate Your Home Workouts",
+            "message": "Discover our range of high-end fitness equipment.",
+            "link": "https://www.example.com/shop",
+            "call_to_action": {"type": "SHOP_NOW"}
+        }
+    }
+}
+
+def _payloads():
+    return {
+        "campaign.json": {"name": "Fitness Sales", "objective": "OUTCOME_SALES", "status": "PAUSED"},
+        "adset.json": copy.deepcopy(ADSET_PAYLOAD),
+        "ad_creative.json": copy.deepcopy(CREATIVE_PAYLOAD),
+        "ad.json": {"name": "Premium Fitness Gear Ad", "creative": {"creative_id": "{{creative_id}}"}}
+    }
+
+class TestSpecLoading(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = self.temp_dir.name
+    
+    def write_campaign(self, name, payloads):
+        directory = os.path.join(self.root, name)
+        os.makedirs(directory)
+        for file_name, payload in payloads.items():
+            with open(os.path.join(directory, file_name), "w") as f:
+                json.dump(payload, f)
+        return directory
+    
+    def test_payloads_map_back_to_a_valid_spec(self):
+        spec = spec_from_payloads(_payloads())
+        
+        self.assertEqual(spec["ad_set"]["budget"], {"amount": 1000, "type": "lifetime"})
+        self.assertEqual(spec["ad_set"]["schedule"]["start_time"], "2025-05-12T00:00:00-0700")
+        self.assertEqual(spec["ad"]["creative"]["call_to_action"], "SHOP_NOW")
+        self.assertEqual(CampaignValidator.check(spec, NOW), [])
+    
+    def test_campaign_history_directory(self):
+        payloads = _payloads()
+        self.write_campaign("20250511_1_Valid", payloads)
+        payloads["adset.json"].update(
+            bid_strategy="LOWEST_COST", start_time="2025-06-12T00:00:00-0700", end_time="2025-07-11T23:59:59-0700"
+        )
+        self.write_campaign("20250511_2_Invalid", payloads)
+        
+        result = BulkValidator().validate_sources([self.root], now=NOW)
+        
+        self.assertEqual([os.path.basename(spec_id) for spec_id in result.ids], ["20250511_1_Valid", "20250511_2_Invalid"])
+        self.assertEqual(result.is_valid.tolist(), [True, False])
+        self.assertEqual(result.counts(), {"ad_set.bid_strategy.invalid": 1})
+    
+    def test_jsonl_batch_records_and_unreadable_lines(self):
+        spec = canned_campaign_spec({"product_name": "Trail shoes", "objective": "OUTCOME_SALES"})
+        path = os.path.join(self.root, "batch_results.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps({"key": "a", "status": "ok", "campaign_spec": spec}) + "\n")
+            f.write(json.dumps({"key": "b", "status": "failed", "campaign_spec": None, "error": "timeout"}) + "\n")
+            f.write("{not json\n")
+            f.write(json.dumps(spec) + "\n")
+            f.write("null\n")
+        
+        errors = []
+        specs = list(iter_specs([path], errors))
+        
+        self.assertEqual([spec_id for spec_id, _ in specs], [f"{path}:a", f"{path}:4"])
+        self.assertEqual([spec_id for spec_id, _ in errors], [f"{path}:b", f"{path}:3", f"{path}:5"])
+        self.assertEqual(errors[0][1], "timeout")
+        self.assertEqual(errors[2][1], "No campaign specification")
+
+class TestBulkValidator(unittest.TestCase):
+    
+    def setUp(self):
+        self.spec = canned_campaign_spec({"product_name": "Trail shoes", "objective": "OUTCOME_SALES"})
+    
+    def test_matches_scalar_validator(self):
+        specs = []
+        for mutate in (
+            lambda spec: None,
+            lambda spec: spec["campaign"].update(objective="BAD"),
+            lambda spec: spec["ad_set"]["budget"].update(amount="abc"),
+            lambda spec: spec["ad_set"]["targeting"].update(age_min=70, genders=[3]),
+            lambda spec: spec["ad"]["creative"].pop("link"),
+            lambda spec: spec.pop("ad_set"),
+        ):
+            spec = copy.deepcopy(self.spec)
+            mutate(spec)
+            specs.append(spec)
+        
+        result = BulkValidator().validate(specs)
+        
+        for spec, entry in zip(specs, result.summary()):
+            _, expected = CampaignValidator.validate_campaign_specification(spec)
+            self.assertEqual(sorted(entry["issue_codes"]), sorted(set(expected["issue_codes"])))
+            self.assertEqual(entry["is_valid"], expected["is_valid"])
+    
+    def test_matrix_columns_are_stable(self):
+        first = BulkValidator().validate([self.spec])
+        second = BulkValidator().validate([{}, "not a spec"])
+        
+        self.assertEqual(first.codes, second.codes)
+        self.assertEqual(first.issues.shape, (1, len(first.codes)))
+        self.assertEqual(second.counts(), {"spec.missing_sections": 2})
+        self.assertEqual(second.ids, ["0", "1"])
+    
+    def test_chunks_concatenate(self):
+        invalid = copy.deepcopy(self.spec)
+        invalid["ad"]["creative"]["link"] = "ftp://example.com"
+        specs = [self.spec, invalid, self.spec, invalid, invalid]
+        
+        chunked = BulkValidator().validate_sources(specs, chunk_size=2)
+        whole = BulkValidator().validate(specs)
+        
+        self.assertEqual(chunked.issues.tolist(), whole.issues.tolist())
+        self.assertEqual(chunked.ids, ["0", "1", "2", "3", "4"])
+    
+    def flight(self, start, end=None, account_id=None):
+        spec = copy.deepcopy(self.spec)
+        spec["ad_set"]["schedule"] = {"start_time": start}
+        if end is not None:
+            spec["ad_set"]["schedule"]["end_time"] = end
+        if account_id is not None:
+            spec["account_id"] = account_id
+        return spec
+    
+    def test_overlapping_flights_in_the_same_account(self):
+        specs = [
+            self.flight("2025-06-01T00:00:00Z", "2025-06-10T00:00:00Z"),
+            self.flight("2025-06-10T00:00:00Z", "2025-06-20T00:00:00Z"),
+            self.flight("2025-06-05T00:00:00Z", "2025-06-07T00:00:00Z", account_id="other"),
+            self.flight("2025-06-15T00:00:00-0700"),
+        ]
+        
+        result = BulkValidator().validate_sources(specs, chunk_size=2, now=NOW)
+        
+        # Back-to-back flights and flights in other accounts do not overlap; open-ended ones run forever
+        self.assertEqual(result.overlaps, {"3": "1", "1": "3"})
+        self.assertEqual(result.is_valid.tolist(), [True, False, True, False])
+        self.assertEqual(result.counts(), {"schedule.overlap": 2})
+    
+    def test_archives_can_be_checked_as_of_a_date_without_overlaps(self):
+        specs = [self.flight("2025-06-01T00:00:00Z", "2025-06-10T00:00:00Z")] * 2
+        
+        result = BulkValidator(check_overlaps=False).validate(specs, now=parse_timestamp("2025-07-01"))
+        self.assertEqual(result.counts(), {"schedule.start_time.past": 2})
+        
+        result = BulkValidator(check_overlaps=False).validate(specs, now=NOW)
+        self.assertEqual(result.is_valid.tolist(), [True, True])
+        self.assertEqual(result.overlaps, {})
+    
+    def test_overlap_sweep_finds_every_overlapping_flight(self):
+        flights = [("", 0.0, 10.0), ("", 1.0, 20.0), ("", 2.0, 3.0), ("", 25.0, 30.0), ("", 30.0, 40.0)]
+        
+        overlaps = find_overlapping_flights(flights)
+        
+        self.assertEqual(sorted(overlaps), [0, 1, 2])
+        for index, other in overlaps.items():
+            self.assertTrue(flights[index][1] < flights[other][2] and flights[other][1] < flights[index][2])
+    
+    def test_concatenate_aligns_codes(self):
+        left = BulkValidationResult(["a"], ["x"], np.array([[True]]))
+        right = BulkValidationResult(["b"], ["y", "x"], np.array([[True, False]]))
+        
+        merged = BulkValidationResult.concatenate([left, right])
+        
+        self.assertEqual(merged.codes, ["x", "y"])
+        self.assertEqual(merged.issues.tolist(), [[True, False], [False, True]])
+
+if __name__ == "__main__":
+    unittest.main()
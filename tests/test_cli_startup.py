@@ -0,0 +1,52 @@
+import unittest
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+# Modules the CLI must not import until a command needs them
+HEAVY_MODULES = {"openai", "pinecone", "tiktoken", "facebook_business", "numpy"}
+
+# Generous ceiling on the cumulative import time of the CLI module; the
+# check above is the precise one, this catches anything else slow
+IMPORT_BUDGET_MS = float(os.getenv("CLI_IMPORT_BUDGET_MS", "1000"))
+
+def import_times(module: str):
+    """Cumulative import time in microseconds per module, from `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+class TestCLIStartup(unittest.TestCase):
+    
+    def test_cli_import_defers_service_sdks(self):
+        times = import_times("src.ui.cli")
+        
+        loaded = {name.split(".")[0] for name in times} & HEAVY_MODULES
+        self.assertEqual(loaded, set(), f"Imported at CLI startup: {sorted(loaded)}")
+        self.assertLess(times["src.ui.cli"] / 1000.0, IMPORT_BUDGET_MS)
+    
+    def test_help_runs_without_credentials(self):
+        env = {key: value for key, value in os.environ.items() if not key.startswith(("OPENAI_", "PINECONE_", "META_"))}
+        result = subprocess.run(
+            [sys.executable, "src/main.py", "--help"],
+            cwd=project_root, capture_output=True, text=True, env=env
+        )
+        
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("create-campaign", result.stdout)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.core.context_packer import ContextPacker
+from src.core.ingestion import chunk_text
+
+def word_count(text):
+    return len(text.split())
+
+def doc(text, score, source="kb.md"):
+    return {"text": text, "metadata": {"source": source}, "score": score}
+
+class TestContextPacker(unittest.TestCase):
+    
+    def _sentences(self, prefix, count):
+        return " ".join(f"{prefix} sentence number {i} has several words." for i in range(count))
+    
+    def test_orders_by_score_and_formats_like_format_context(self):
+        packer = ContextPacker(1000, "gpt-4o-mini", token_counter=word_count)
+        
+        packed = packer.pack([doc("low ranked text", 0.2, "b.md"), doc("high ranked text", 0.9, "a.md")])
+        
+        self.assertEqual(
+            packed.text,
+            "Document 1 from a.md:\nhigh ranked text\n\nDocument 2 from b.md:\nlow ranked text\n"
+        )
+        self.assertEqual(packed.tokens, word_count(packed.text))
+        self.assertFalse(packed.truncated)
+    
+    def test_drops_near_duplicate_chunks(self):
+        base = self._sentences("alpha", 10)
+        overlapping = base + " One extra closing remark."
+        distinct = self._sentences("beta", 10)
+        packer = ContextPacker(1000, "gpt-4o-mini", token_counter=word_count)
+        
+        packed = packer.pack([doc(base, 0.9), doc(overlapping, 0.8), doc(distinct, 0.7)])
+        
+        self.assertEqual(packed.duplicates_dropped, 1)
+        self.assertEqual([d["score"] for d in packed.documents], [0.9, 0.7])
+    
+    def test_trims_overlap_between_neighbouring_chunks(self):
+        text = "\n\n".join(self._sentences(f"para{i}", 6) for i in range(12))
+        chunks = chunk_text(text)
+        # Scores out of chunk order, so both leading and trailing overlaps get cut
+        documents = [
+            {"text": chunk, "metadata": {"source": "kb.md", "chunk_index": i}, "score": (i * 3) % len(chunks)}
+            for i, chunk in enumerate(chunks)
+        ]
+        packer = ContextPacker(10000, "gpt-4o-mini", token_counter=word_count)
+        
+        packed = packer.pack(documents)
+        
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(packed.overlaps_trimmed, len(chunks) - 1)
+        self.assertEqual(packed.duplicates_dropped, 0)
+        # Read in chunk order, the packed text is the source text once over
+        in_order = sorted(packed.documents, key=lambda d: d["metadata"]["chunk_index"])
+        self.assertEqual("".join("".join(d["text"].split()) for d in in_order), "".join(text.split()))
+    
+    def test_truncates_last_chunk_at_sentence_boundary(self):
+        first = self._sentences("alpha", 5)
+        second = self._sentences("beta", 20)
+        packer = ContextPacker(100, "gpt-4o-mini", token_counter=word_count)
+        
+        packed = packer.pack([doc(first, 0.9), doc(second, 0.8), doc("never reached", 0.1)])
+        
+        self.assertTrue(packed.truncated)
+        self.assertEqual(len(packed.documents), 2)
+        self.assertTrue(packed.documents[1]["text"].endswith("words."))
+        self.assertLess(len(packed.documents[1]["text"]), len(second))
+        self.assertLessEqual(packed.tokens, 100)
+    
+    def test_respects_budget_exactly(self):
+        packer = ContextPacker(5, "gpt-4o-mini", token_counter=word_count)
+        
+        packed = packer.pack([doc("far too many words for such a small budget here", 0.9)])
+        
+        self.assertEqual(packed.text, "")
+        self.assertEqual(packed.tokens, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.embedding_cache import EmbeddingCache
+from src.models.openai_service import OpenAIService
+
+class TestEmbeddingCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "embeddings.sqlite3")
+        self.cache = EmbeddingCache(self.path, max_entries=3, memory_entries=2)
+    
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+    
+    def test_round_trip_and_counters(self):
+        self.cache.put("model", "hello world", [0.5, 0.25])
+        
+        self.assertEqual(self.cache.get("model", "hello world"), [0.5, 0.25])
+        self.assertIsNone(self.cache.get("other-model", "hello world"))
+        
+        stats = self.cache.stats()
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+    
+    def test_persists_across_instances(self):
+        self.cache.put("model", "line one\nline two", [1.0])
+        self.cache.close()
+        
+        reopened = EmbeddingCache(self.path)
+        # Newlines are normalized away before hashing
+        self.assertEqual(reopened.get("model", "line one line two"), [1.0])
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+        reopened.close()
+    
+    def test_evicts_least_recently_used_rows(self):
+        for i in range(4):
+            self.cache.put("model", f"text {i}", [float(i)])
+        
+        fresh = EmbeddingCache(self.path)
+        self.assertIsNone(fresh.get("model", "text 0"))
+        self.assertEqual(fresh.get("model", "text 3"), [3.0])
+        fresh.close()
+    
+    @patch('src.models.openai_service.openai')
+    def test_get_embeddings_only_requests_misses(self, mock_openai):
+        mock_openai.embeddings.with_raw_response.create.return_value = MagicMock(
+            headers={}, parse=MagicMock(return_value=MagicMock(data=[MagicMock(index=0, embedding=[2.0])]))
+        )
+        service = OpenAIService()
+        service.embedding_cache = self.cache
+        service.num_tokens_from_string = lambda text, model=None: len(text)
+        service.num_tokens_from_strings = lambda texts, model=None: [len(text) for text in texts]
+        self.cache.put(service.embedding_model, "cached", [1.0])
+        
+        result = service.get_embeddings(["cached", "fresh"])
+        
+        self.assertEqual(result, [[1.0], [2.0]])
+        mock_openai.embeddings.with_raw_response.create.assert_called_once()
+        self.assertEqual(mock_openai.embeddings.with_raw_response.create.call_args.kwargs["input"], ["fresh"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import copy
+import random
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.config.config import config
+from src.fakes.meta_server import FakeMetaServer, ErrorInjection, LatencyModel
+from src.api.meta_ads_api import MetaAdsAPI
+from src.api.batch_executor import BatchExecutor
+from src.ui import cli
+
+CAMPAIGN_SPEC = {
+    "campaign": {"name": "Campaign", "objective": "OUTCOME_SALES", "status": "PAUSED"},
+    "ad_set": {
+        "name": "Ad Set",
+        "optimization_goal": "REACH",
+        "billing_event": "IMPRESSIONS",
+        "bid_strategy": "LOWEST_COST_WITHOUT_CAP",
+        "budget": {"amount": 1000, "type": "daily"},
+        "targeting": {"geo_locations": {"countries": ["US"]}}
+    },
+    "ad": {
+        "name": "Ad",
+        "creative": {"title": "T", "body": "B", "call_to_action": "LEARN_MORE", "link": "https://example.com"}
+    }
+}
+
+class TestFakeMetaServer(unittest.TestCase):
+    
+    def _api(self, server):
+        patcher = patch.multiple(
+            config.meta_ads,
+            graph_url=server.url,
+            ad_account_id="1",
+            ready_backoff_seconds=0.01,
+            ready_backoff_max_seconds=0.05
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return MetaAdsAPI()
+    
+    def test_full_campaign_through_http_with_propagation_delay(self):
+        errors = ErrorInjection(visibility_delay_ms=30)
+        with FakeMetaServer(errors=errors, seed=1) as server:
+            result = self._api(server).create_full_campaign(CAMPAIGN_SPEC)
+        
+        self.assertTrue(result["success"], result)
+        self.assertEqual(server.stats.created, {"campaign": 1, "adset": 1, "adcreative": 1, "ad": 1})
+        # Children created straight away are rejected until their parents propagate
+        self.assertGreater(server.stats.errors.get("not_ready", 0), 0)
+    
+    def test_batch_executor_through_http(self):
+        errors = ErrorInjection(rate_limit=0.1, not_ready=0.1)
+        with FakeMetaServer(errors=errors, seed=3) as server:
+            executor = BatchExecutor(self._api(server), max_attempts=6, sleep=lambda seconds: None)
+            results = executor.create_full_campaigns([CAMPAIGN_SPEC] * 5)
+        
+        self.assertTrue(all(result["success"] for result in results), results)
+        self.assertEqual(server.stats.created["ad"], 5)
+        self.assertGreater(server.stats.errors.get("rate_limit", 0) + server.stats.errors.get("not_ready", 0), 0)
+        self.assertEqual(server.stats.batch_requests, executor.requests)
+    
+    def test_batch_executor_does_not_resend_server_errors(self):
+        # A create that failed with a 5xx may still have happened, so it is not sent again
+        errors = ErrorInjection(server_error=1.0)
+        with FakeMetaServer(errors=errors, seed=3) as server:
+            executor = BatchExecutor(self._api(server), max_attempts=6, sleep=lambda seconds: None)
+            results = executor.create_full_campaigns([CAMPAIGN_SPEC] * 5)
+        
+        self.assertFalse(any(result["success"] for result in results))
+        self.assertEqual(executor.requests, 1)
+    
+    def test_cli_pushes_valid_specs_in_batches(self):
+        valid = copy.deepcopy(CAMPAIGN_SPEC)
+        valid["ad_set"]["optimization_goal"] = "OFFSITE_CONVERSIONS"
+        with FakeMetaServer(seed=3) as server:
+            with patch.object(cli, "get_meta_ads_api", return_value=self._api(server)):
+                not_created = cli._execute_campaigns([valid, CAMPAIGN_SPEC, valid])
+        
+        # The spec with an incompatible optimization goal is skipped
+        self.assertEqual(not_created, 1)
+        self.assertEqual(server.stats.created["ad"], 2)
+        self.assertEqual(server.stats.batch_requests, 1)
+    
+    def test_latency_model(self):
+        rng = random.Random(0)
+        
+        self.assertEqual(LatencyModel("fixed", 50).sample(rng), 0.05)
+        samples = sorted(LatencyModel("lognormal", 100, sigma=0.5).sample(rng) for _ in range(2000))
+        self.assertAlmostEqual(samples[1000], 0.1, delta=0.01)
+        self.assertGreater(samples[1980], 0.2)
+
+if __name__ == '__main__':
+    unittest.main()
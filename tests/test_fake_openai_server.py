@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+import numpy as np
+import openai
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.config.config import config
+from src.core.rag_service import RAGService
+from src.fakes.openai_server import FakeOpenAIServer, RateLimits, hash_embedding
+from src.models.openai_service import OpenAIService
+from src.utils.validators import CampaignValidator
+
+class TestHashEmbedding(unittest.TestCase):
+    
+    def test_embeddings_are_deterministic_unit_vectors(self):
+        first = hash_embedding("Running shoes for trail runners")
+        
+        self.assertEqual(first.shape, (1536,))
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+        np.testing.assert_array_equal(first, hash_embedding("Running shoes for trail runners"))
+        self.assertFalse(np.array_equal(first, hash_embedding("Running shoes for trail runners", seed=1)))
+    
+    def test_shared_words_are_more_similar(self):
+        query = hash_embedding("trail running shoes")
+        related = hash_embedding("shoes for trail running")
+        unrelated = hash_embedding("quarterly tax filing deadlines")
+        
+        self.assertGreater(float(query @ related), 0.8)
+        self.assertLess(float(query @ unrelated), 0.2)
+
+class TestFakeOpenAIServer(unittest.TestCase):
+    
+    def setUp(self):
+        self.server = FakeOpenAIServer(seed=0).start()
+        self.addCleanup(self.server.stop)
+        base_url = openai.base_url
+        self.addCleanup(setattr, openai, "base_url", base_url)
+        patcher = patch.multiple(config.openai, base_url=self.server.url + "/", api_key="test", rate_limit_enabled=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = OpenAIService()
+        self.service.embedding_cache = None
+    
+    def test_get_embeddings_match_hash_embedding(self):
+        texts = ["Lookalike audiences", "Advantage+ placements", "Lookalike audiences"]
+        
+        embeddings = self.service.get_embeddings(texts)
+        
+        self.assertEqual(len(embeddings), 3)
+        np.testing.assert_allclose(embeddings[0], hash_embedding(texts[0]), rtol=1e-6)
+        self.assertEqual(embeddings[0], embeddings[2])
+        self.assertEqual(self.server.stats.embedded_inputs, 3)
+    
+    def test_json_completion_is_a_valid_campaign_spec(self):
+        with patch('src.core.rag_service.VectorStore'):
+            rag = RAGService()
+        messages = rag._campaign_messages(
+            {"product_name": "Trail Shoes", "objective": "OUTCOME_SALES", "daily_budget": 25},
+            [{"text": "Sales campaigns optimize for conversions.", "metadata": {}}]
+        )
+        
+        response = self.service.get_completion(messages, response_format={"type": "json_object"})
+        spec = rag._parse_campaign_spec(response)
+        is_valid, results = CampaignValidator.validate_campaign_specification(spec)
+        
+        self.assertTrue(is_valid, results["issues"])
+        self.assertEqual(spec["campaign"]["objective"], "OUTCOME_SALES")
+        self.assertEqual(spec["ad_set"]["budget"]["amount"], 2500)
+        self.assertEqual(response, self.service.get_completion(messages, response_format={"type": "json_object"}))
+    
+    def test_stream_completion_reassembles_the_answer(self):
+        messages = [
+            {"role": "system", "content": "Retrieved information: Budgets are in cents. Minimum is 100."},
+            {"role": "user", "content": "How are budgets expressed?"}
+        ]
+        
+        streamed = "".join(self.service.stream_completion(messages, max_tokens=50))
+        
+        self.assertEqual(streamed, self.service.get_completion(messages, max_tokens=50))
+        self.assertIn("Budgets are in cents.", streamed)
+        self.assertEqual(self.server.stats.streamed, 1)
+    
+    def test_rate_limit_returns_429_with_headers(self):
+        self.server.fake.limits = RateLimits(error_rate=1.0)
+        client = openai.OpenAI(api_key="test", base_url=self.server.url, max_retries=0)
+        
+        with self.assertRaises(openai.RateLimitError) as raised:
+            client.embeddings.create(input=["text"], model="text-embedding-ada-002")
+        
+        self.assertEqual(raised.exception.response.headers["retry-after"], "1")
+        self.assertEqual(self.server.stats.rate_limited, 1)
+
+if __name__ == '__main__':
+    unittest.main()
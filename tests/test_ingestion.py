@@ -0,0 +1,185 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.vector_store import UpsertReport
+from src.core.ingestion import ChunkManifest, IngestPlan, IngestionPipeline, chunk_text, iter_files, load_file_chunks
+
+class TestIngestionPipeline(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for name in ("a.md", "b.md", "c.txt"):
+            with open(os.path.join(self.tmp_dir.name, name), 'w') as f:
+                f.write(f"# {name}\n\n" + "\n\n".join(f"Paragraph {i} of {name}. " * 20 for i in range(5)))
+        
+        self.rag_service = MagicMock()
+        self.rag_service.openai.get_embeddings.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        self.rag_service.build_vector.side_effect = lambda text, metadata, embedding, doc_id=None: {
+            "id": doc_id, "values": embedding, "metadata": metadata
+        }
+        self.rag_service.vector_store.upsert.side_effect = lambda vectors: UpsertReport(
+            upserted=[v["id"] for v in vectors]
+        )
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_chunk_text_overlaps_chunks(self):
+        chunks = chunk_text("\n\n".join("x" * 400 for _ in range(5)), max_chunk_size=1000, overlap=200)
+        
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(chunks[1].startswith(chunks[0][-200:]))
+    
+    def test_pipeline_ingests_every_chunk(self):
+        files = list(iter_files(self.tmp_dir.name, [".md"]))
+        expected = sum(len(load_file_chunks(path)) for path in files)
+        
+        pipeline = IngestionPipeline(self.rag_service, embed_workers=3, batch_size=2)
+        summary = pipeline.run(files)
+        
+        self.assertEqual(summary["files"], 2)
+        self.assertEqual(summary["chunks"], expected)
+        upserted = [v["id"] for call in self.rag_service.vector_store.upsert.call_args_list for v in call.args[0]]
+        self.assertEqual(len(set(upserted)), expected)
+        for stage in ("read", "embed", "upsert"):
+            self.assertEqual(summary["stages"][stage]["items"], expected)
+    
+    def test_pipeline_counts_failed_embedding_batches(self):
+        self.rag_service.openai.get_embeddings.side_effect = RuntimeError("rate limited")
+        
+        summary = IngestionPipeline(self.rag_service, embed_workers=2, batch_size=4).run(iter_files(self.tmp_dir.name))
+        
+        self.assertEqual(summary["chunks"], 0)
+        self.assertEqual(summary["stages"]["embed"]["failed"], summary["stages"]["read"]["items"])
+        self.rag_service.vector_store.upsert.assert_not_called()
+    
+    def test_pipeline_survives_upsert_errors(self):
+        self.rag_service.vector_store.upsert.side_effect = RuntimeError("backend unavailable")
+        
+        # More batches than the queue holds, so a dead upsert stage would deadlock the embed workers
+        pipeline = IngestionPipeline(self.rag_service, embed_workers=2, batch_size=1, queue_size=1)
+        summary = pipeline.run(iter_files(self.tmp_dir.name))
+        
+        self.assertEqual(summary["chunks"], 0)
+        self.assertEqual(summary["stages"]["upsert"]["failed"], summary["stages"]["read"]["items"])
+        self.assertEqual(len(pipeline.failed_ids), summary["stages"]["read"]["items"])
+
+class TestChunkManifest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.docs_dir = os.path.join(self.tmp_dir.name, "docs")
+        os.makedirs(self.docs_dir)
+        for name in ("a.md", "b.md"):
+            self._write(name, "\n\n".join(f"Paragraph {i} of {name}. " * 20 for i in range(4)))
+        self.manifest_path = os.path.join(self.tmp_dir.name, "manifest.json")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def _write(self, name, content):
+        with open(os.path.join(self.docs_dir, name), 'w') as f:
+            f.write(content)
+    
+    def _ingest_all(self):
+        manifest = ChunkManifest(self.manifest_path)
+        plan = manifest.plan(iter_files(self.docs_dir))
+        manifest.apply(plan)
+        manifest.save()
+        return plan
+    
+    def test_chunk_ids_are_stable(self):
+        path = os.path.join(self.docs_dir, "a.md")
+        
+        self.assertEqual([d["id"] for d in load_file_chunks(path)], [d["id"] for d in load_file_chunks(path)])
+    
+    def test_identical_chunks_get_distinct_ids(self):
+        paragraph = "Repeated paragraph. " * 60
+        self._write("a.md", "\n\n".join([paragraph] * 3))
+        
+        documents = load_file_chunks(os.path.join(self.docs_dir, "a.md"))
+        
+        # Each chunk after the first is the previous chunk's tail plus the paragraph
+        self.assertEqual(documents[1]["text"], documents[2]["text"])
+        self.assertEqual(len({d["id"] for d in documents}), len(documents))
+    
+    def test_unchanged_tree_plans_no_work(self):
+        first = self._ingest_all()
+        second = ChunkManifest(self.manifest_path).plan(iter_files(self.docs_dir))
+        
+        self.assertGreater(len(first.documents), 0)
+        self.assertEqual(second.documents, [])
+        self.assertEqual(second.stale_ids, [])
+        self.assertEqual(second.unchanged_files, 2)
+    
+    def test_edited_file_embeds_only_new_chunks(self):
+        first = self._ingest_all()
+        old_ids = {d["id"] for d in first.documents if d["metadata"]["source"] == "a.md"}
+        self._write("a.md", "A completely rewritten document.")
+        
+        plan = ChunkManifest(self.manifest_path).plan(iter_files(self.docs_dir))
+        
+        self.assertEqual([d["text"] for d in plan.documents], ["A completely rewritten document."])
+        self.assertEqual(set(plan.stale_ids), old_ids)
+    
+    def test_chunks_with_stale_metadata_are_upserted_again(self):
+        self._ingest_all()
+        path = os.path.join(self.docs_dir, "a.md")
+        with open(path) as f:
+            content = f.read()
+        self._write("a.md", content + "\n\n" + "An extra paragraph. " * 60)
+        
+        plan = ChunkManifest(self.manifest_path).plan(iter_files(self.docs_dir))
+        
+        # Every chunk's total_chunks changed, so none can keep its stored metadata
+        self.assertEqual(plan.documents, load_file_chunks(path))
+        self.assertEqual(len(plan.stale_ids), len(load_file_chunks(path, content)))
+    
+    def test_removed_file_is_deleted(self):
+        first = self._ingest_all()
+        os.remove(os.path.join(self.docs_dir, "b.md"))
+        
+        manifest = ChunkManifest(self.manifest_path)
+        plan = manifest.plan(iter_files(self.docs_dir))
+        manifest.apply(plan)
+        
+        self.assertEqual(set(plan.stale_ids), {d["id"] for d in first.documents if d["metadata"]["source"] == "b.md"})
+        self.assertEqual(list(manifest.files), [os.path.join(self.docs_dir, "a.md")])
+    
+    def test_pipeline_plans_files_in_its_reader_stage(self):
+        first = self._ingest_all()
+        self._write("a.md", "A completely rewritten document.")
+        rag_service = MagicMock()
+        rag_service.openai.get_embeddings.side_effect = lambda texts: [[1.0] for _ in texts]
+        rag_service.build_vector.side_effect = lambda text, metadata, embedding, doc_id=None: {"id": doc_id}
+        rag_service.vector_store.upsert.side_effect = lambda vectors: UpsertReport(upserted=[v["id"] for v in vectors])
+        
+        manifest = ChunkManifest(self.manifest_path)
+        plan = IngestPlan()
+        summary = IngestionPipeline(rag_service, embed_workers=1).run(
+            iter_files(self.docs_dir), load=lambda path: manifest.plan_file(plan, path)
+        )
+        
+        self.assertEqual(summary["files"], 1)
+        self.assertEqual(summary["chunks"], 1)
+        self.assertEqual(summary["stages"]["read"]["batches"], 2)
+        self.assertEqual(plan.unchanged_files, 1)
+        self.assertEqual(set(plan.stale_ids), {d["id"] for d in first.documents if d["metadata"]["source"] == "a.md"})
+    
+    def test_failed_chunks_keep_file_pending(self):
+        manifest = ChunkManifest(self.manifest_path)
+        plan = manifest.plan(iter_files(self.docs_dir))
+        manifest.apply(plan, failed_ids={plan.documents[0]["id"]})
+        
+        self.assertEqual(len(manifest.files), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import json
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.json_stream import JsonSectionParser
+
+class TestJsonSectionParser(unittest.TestCase):
+    
+    def setUp(self):
+        self.spec = {
+            "campaign": {"name": 'Spring "Sale" {launch} \\ end', "objective": "OUTCOME_SALES"},
+            "ad_set": {"interests": [{"id": "1", "name": "Running, trail"}], "budget": {"amount": 1000}},
+            "count": 3,
+            "note": "done"
+        }
+        self.text = json.dumps(self.spec, indent=2)
+    
+    def test_sections_complete_in_order_when_fed_char_by_char(self):
+        parser = JsonSectionParser()
+        completed = []
+        for char in self.text:
+            completed.extend(parser.feed(char))
+        
+        self.assertEqual(completed, list(self.spec.items()))
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.buffer, self.text)
+    
+    def test_section_is_reported_once_its_terminator_arrives(self):
+        parser = JsonSectionParser()
+        
+        self.assertEqual(parser.feed('{"a": {"b": [1, 2]}'), [])
+        self.assertEqual(parser.feed(', "c"'), [("a", {"b": [1, 2]})])
+        self.assertEqual(parser.feed(': "x"}'), [("c", "x")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.local_index import LocalVectorIndex
+from src.database.segments import Segment
+from src.database.vector_store import VectorStore
+
+class TestLocalVectorIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = LocalVectorIndex(self.tmp_dir.name, dimension=4)
+        self.index.upsert([
+            {"id": "a", "values": [1, 0, 0, 0], "metadata": {"text": "A", "source": "x.md", "chunk_index": 0}},
+            {"id": "b", "values": [0.9, 0.1, 0, 0], "metadata": {"text": "B", "source": "y.md", "chunk_index": 1}},
+            {"id": "c", "values": [0, 1, 0, 0], "metadata": {"text": "C", "source": "x.md", "chunk_index": 2}},
+        ], namespace="default")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_query_returns_top_k_by_cosine(self):
+        results = self.index.query([1, 0, 0, 0], top_k=2, namespace="default")
+        
+        self.assertEqual([m["id"] for m in results["matches"]], ["a", "b"])
+        self.assertAlmostEqual(results["matches"][0]["score"], 1.0, places=5)
+        self.assertEqual(results["matches"][0]["metadata"]["text"], "A")
+    
+    def test_query_applies_metadata_filter(self):
+        results = self.index.query([1, 0, 0, 0], top_k=5, namespace="default", filter={"source": {"$eq": "x.md"}})
+        self.assertEqual([m["id"] for m in results["matches"]], ["a", "c"])
+        
+        results = self.index.query([1, 0, 0, 0], top_k=5, namespace="default",
+                                   filter={"$or": [{"chunk_index": {"$gte": 2}}, {"source": {"$in": ["y.md"]}}]})
+        self.assertEqual([m["id"] for m in results["matches"]], ["b", "c"])
+    
+    def test_upsert_replaces_and_delete_removes(self):
+        self.index.upsert([{"id": "a", "values": [0, 0, 1, 0], "metadata": {"text": "A2"}}], namespace="default")
+        self.index.delete(["c"], namespace="default")
+        
+        results = self.index.query([0, 0, 1, 0], top_k=5, namespace="default")
+        
+        self.assertEqual([m["id"] for m in results["matches"]], ["a", "b"])
+        self.assertEqual(results["matches"][0]["metadata"], {"text": "A2"})
+    
+    def test_persists_across_instances(self):
+        reopened = LocalVectorIndex(self.tmp_dir.name, dimension=4)
+        
+        results = reopened.query([0, 1, 0, 0], top_k=1, namespace="default")
+        
+        self.assertEqual(results["matches"][0]["id"], "c")
+        self.assertEqual(results["matches"][0]["metadata"]["chunk_index"], 2)
+    
+    def test_segments_are_memory_mapped_and_compacted(self):
+        namespace = self.index.namespace("default")
+        self.index.upsert([{"id": "b", "values": [0, 0, 0, 1], "metadata": {"text": "B2"}}], namespace="default")
+        self.index.delete(["c"], namespace="default")
+        self.assertEqual(len(namespace._segments), 2)
+        self.assertIsInstance(namespace._segments[0].vectors, np.memmap)
+        
+        self.assertTrue(namespace.compact())
+        
+        self.assertEqual(len(namespace._segments), 1)
+        self.assertEqual(namespace._segments[0].rows, 2)
+        results = self.index.query([0, 0, 0, 1], top_k=5, namespace="default")
+        self.assertEqual([m["id"] for m in results["matches"]], ["b", "a"])
+        self.assertEqual(results["matches"][0]["metadata"]["text"], "B2")
+    
+    def test_delete_all_during_compaction_wins(self):
+        namespace = self.index.namespace("default")
+        self.index.upsert([{"id": "d", "values": [0, 0, 0, 1]}], namespace="default")
+        write = Segment.write
+        
+        def delete_all_then_write(*args, **kwargs):
+            # Runs while compact holds no lock, between its snapshot and its swap
+            namespace.delete_all()
+            return write(*args, **kwargs)
+        
+        with patch("src.database.local_index.Segment.write", side_effect=delete_all_then_write):
+            self.assertFalse(namespace.compact())
+        
+        self.assertEqual(len(namespace), 0)
+        self.assertEqual(self.index.query([1, 0, 0, 0], top_k=5, namespace="default")["matches"], [])
+        # The discarded merge leaves no files behind
+        self.assertEqual(os.listdir(namespace.path), ["manifest.json"])
+    
+    def test_background_compaction_after_too_many_segments(self):
+        index = LocalVectorIndex(self.tmp_dir.name, dimension=4, max_segments=2)
+        for i in range(3):
+            index.upsert([{"id": f"n{i}", "values": [0, 0, 1, i]}], namespace="other")
+        
+        namespace = index.namespace("other")
+        namespace._compaction_thread.join()
+        
+        self.assertEqual(len(namespace._segments), 1)
+        self.assertEqual(len(namespace), 3)
+    
+    def test_other_instance_sees_new_segments(self):
+        reader = LocalVectorIndex(self.tmp_dir.name, dimension=4)
+        reader.query([1, 0, 0, 0], top_k=1, namespace="default")
+        
+        self.index.upsert([{"id": "d", "values": [0, 0, 1, 0]}], namespace="default")
+        
+        results = reader.query([0, 0, 1, 0], top_k=1, namespace="default")
+        self.assertEqual(results["matches"][0]["id"], "d")
+    
+    def test_vector_store_delegates_to_backend(self):
+        store = VectorStore(backend=self.index)
+        store.namespace = "default"
+        
+        self.assertEqual(store.query([0, 1, 0, 0], top_k=1)["matches"][0]["id"], "c")
+        self.assertTrue(store.delete_all())
+        self.assertEqual(store.query([0, 1, 0, 0], top_k=1), {"matches": []})
+
+if __name__ == '__main__':
+    unittest.main()
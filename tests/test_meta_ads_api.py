@@ -0,0 +1,96 @@
+import unittest
+import json
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from facebook_business.exceptions import FacebookRequestError
+from src.api.meta_ads_api import MetaAdsAPI, is_not_ready_error
+
+def _facebook_error(code, subcode=None):
+    body = {"error": {"code": code, "error_subcode": subcode, "message": "error", "is_transient": False}}
+    return FacebookRequestError("error", {}, 400, {}, json.dumps(body))
+
+class TestMetaAdsAPI(unittest.TestCase):
+    
+    @patch('src.api.meta_ads_api.AdAccount')
+    @patch('src.api.meta_ads_api.FacebookAdsApi')
+    def setUp(self, mock_api, mock_ad_account):
+        self.api = MetaAdsAPI()
+        self.ad_account = self.api.ad_account
+        self.ad_account.create_campaign.return_value = {"id": "c1"}
+        self.ad_account.create_ad_set.return_value = {"id": "s1"}
+        self.ad_account.create_ad_creative.return_value = {"id": "cr1"}
+        self.ad_account.create_ad.return_value = {"id": "a1"}
+        self.campaign_spec = {
+            "campaign": {"name": "Campaign", "objective": "OUTCOME_SALES", "status": "PAUSED"},
+            "ad_set": {
+                "name": "Ad Set",
+                "optimization_goal": "REACH",
+                "billing_event": "IMPRESSIONS",
+                "bid_strategy": "LOWEST_COST_WITHOUT_CAP",
+                "budget": {"amount": 1000, "type": "daily"},
+                "targeting": {"geo_locations": {"countries": ["US"]}}
+            },
+            "ad": {
+                "name": "Ad",
+                "creative": {"title": "T", "body": "B", "call_to_action": "LEARN_MORE", "link": "https://example.com"}
+            }
+        }
+    
+    def test_is_not_ready_error(self):
+        self.assertTrue(is_not_ready_error(_facebook_error(100, 33)))
+        # Generic and transient errors may follow a successful create, so they are not retried
+        self.assertFalse(is_not_ready_error(_facebook_error(2)))
+        self.assertFalse(is_not_ready_error(_facebook_error(1)))
+        self.assertFalse(is_not_ready_error(_facebook_error(100, 1487930)))
+        self.assertFalse(is_not_ready_error(ValueError("boom")))
+    
+    @patch('src.api.meta_ads_api.config')
+    def test_full_campaign_retries_until_parent_is_ready(self, mock_config):
+        mock_config.meta_ads.ready_max_attempts = 3
+        mock_config.meta_ads.ready_backoff_seconds = 0
+        mock_config.meta_ads.ready_backoff_max_seconds = 0
+        self.ad_account.create_ad_set.side_effect = [_facebook_error(100, 33), {"id": "s1"}]
+        
+        result = self.api.create_full_campaign(self.campaign_spec)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(
+            (result["campaign_id"], result["ad_set_id"], result["creative_id"], result["ad_id"]),
+            ("c1", "s1", "cr1", "a1")
+        )
+        self.assertEqual(self.ad_account.create_ad_set.call_count, 2)
+        self.ad_account.create_ad_creative.assert_called_once()
+        self.assertEqual(
+            self.ad_account.create_ad.call_args.kwargs["params"]["creative"], {"creative_id": "cr1"}
+        )
+        self.assertEqual(set(result["timings"]), {"campaign", "ad_set", "ad_creative", "ad", "total"})
+    
+    def test_other_errors_fail_the_stage_without_retrying(self):
+        self.ad_account.create_ad_set.side_effect = _facebook_error(100, 1487930)
+        
+        result = self.api.create_full_campaign(self.campaign_spec)
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["stage"], "ad_set")
+        self.assertEqual(result["error"]["error_subcode"], 1487930)
+        self.ad_account.create_ad_set.assert_called_once()
+        self.ad_account.create_ad.assert_not_called()
+    
+    def test_transient_errors_are_not_retried(self):
+        # The ad set may exist even though the call failed; retrying could duplicate it
+        self.ad_account.create_ad_set.side_effect = _facebook_error(2)
+        
+        result = self.api.create_full_campaign(self.campaign_spec)
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["stage"], "ad_set")
+        self.ad_account.create_ad_set.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
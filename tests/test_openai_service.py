@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.models.openai_service import OpenAIService
+
+def _embedding_response(texts, shuffle=False):
+    """Build a fake embeddings response with one item per input."""
+    data = [MagicMock(index=i, embedding=[float(len(text))]) for i, text in enumerate(texts)]
+    if shuffle:
+        data.reverse()
+    return MagicMock(headers={}, parse=MagicMock(return_value=MagicMock(data=data)))
+
+def _stream_chunk(content):
+    """Build a fake streamed chat completion chunk."""
+    return MagicMock(choices=[MagicMock(delta=MagicMock(content=content))])
+
+class TestOpenAIServiceStreaming(unittest.TestCase):
+    
+    @patch('src.models.openai_service.openai')
+    def test_stream_completion_yields_content(self, mock_openai):
+        stream = MagicMock()
+        stream.__iter__.return_value = iter([
+            _stream_chunk("Hel"), MagicMock(choices=[]), _stream_chunk(None), _stream_chunk("lo")
+        ])
+        mock_openai.chat.completions.with_raw_response.create.return_value = MagicMock(
+            headers={}, parse=MagicMock(return_value=stream)
+        )
+        
+        pieces = list(OpenAIService().stream_completion([{"role": "user", "content": "Hi"}], max_tokens=10))
+        
+        self.assertEqual(pieces, ["Hel", "lo"])
+        self.assertTrue(mock_openai.chat.completions.with_raw_response.create.call_args.kwargs["stream"])
+        stream.close.assert_called_once()
+
+class TestOpenAIServiceEmbeddings(unittest.TestCase):
+    
+    def setUp(self):
+        self.service = OpenAIService()
+        self.service.embedding_cache = None
+        # Count one token per character so tests don't need tiktoken data files
+        self.service.num_tokens_from_string = lambda text, model=None: len(text)
+        self.service.num_tokens_from_strings = lambda texts, model=None: [len(text) for text in texts]
+    
+    @patch('src.models.openai_service.openai')
+    def test_get_embeddings_batches_by_input_count(self, mock_openai):
+        mock_openai.embeddings.with_raw_response.create.side_effect = lambda input, model: _embedding_response(input)
+        self.service.embedding_batch_size = 2
+        
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+        result = self.service.get_embeddings(texts)
+        
+        self.assertEqual(result, [[1.0], [2.0], [3.0], [4.0], [5.0]])
+        self.assertEqual(mock_openai.embeddings.with_raw_response.create.call_count, 3)
+    
+    @patch('src.models.openai_service.openai')
+    def test_get_embeddings_batches_by_token_count(self, mock_openai):
+        mock_openai.embeddings.with_raw_response.create.side_effect = lambda input, model: _embedding_response(input)
+        self.service.embedding_batch_max_tokens = 5
+        
+        batches = self.service._plan_embedding_batches(["aaa", "bb", "c", "dddddd"])
+        
+        self.assertEqual(batches, [[0, 1], [2], [3]])
+    
+    @patch('src.models.openai_service.openai')
+    def test_get_embeddings_preserves_input_order(self, mock_openai):
+        mock_openai.embeddings.with_raw_response.create.side_effect = lambda input, model: _embedding_response(input, shuffle=True)
+        
+        result = self.service.get_embeddings(["a", "bb", "ccc"])
+        
+        self.assertEqual(result, [[1.0], [2.0], [3.0]])
+        mock_openai.embeddings.with_raw_response.create.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
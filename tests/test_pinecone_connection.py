@@ -0,0 +1,128 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from pinecone import NotFoundException
+from src.database.pinecone_connection import IndexStateCache, PineconeConnection
+from src.database.vector_backends import PineconeBackend
+
+class FakePineconeClient:
+    """Counts control-plane calls and hands out index handles by host."""
+    
+    def __init__(self, indexes=None):
+        self.indexes = dict(indexes or {})
+        self.list_calls = 0
+        self.created = []
+        self.opened = []
+    
+    def list_indexes(self):
+        self.list_calls += 1
+        return [_index_model(name, host) for name, host in self.indexes.items()]
+    
+    def create_index(self, name, dimension, metric, spec):
+        self.created.append((name, dimension))
+        self.indexes[name] = f"{name}.svc.pinecone.io"
+    
+    def describe_index(self, name):
+        return _index_model(name, self.indexes[name])
+    
+    def Index(self, host):
+        self.opened.append(host)
+        return MagicMock(host=host)
+
+def _index_model(name, host):
+    model = MagicMock(host=host)
+    model.name = name
+    return model
+
+class TestPineconeConnection(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "pinecone_indexes.json")
+        self.clock = 1000.0
+        patcher = patch('src.database.pinecone_connection.time.time', lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _connection(self, client):
+        connection = PineconeConnection("key", IndexStateCache(self.path, ttl_seconds=60))
+        connection._client = client
+        return connection
+    
+    def test_index_is_checked_once_and_opened_lazily(self):
+        client = FakePineconeClient({"ads": "ads.svc.pinecone.io"})
+        connection = self._connection(client)
+        backend = PineconeBackend("ads", connection=connection)
+        
+        self.assertEqual(client.list_calls, 0)
+        backend.query([0.1], top_k=1, namespace="default")
+        backend.upsert([], namespace="default")
+        
+        self.assertEqual(client.list_calls, 1)
+        self.assertEqual(client.opened, ["ads.svc.pinecone.io"])
+    
+    def test_state_file_skips_lookup_until_ttl_expires(self):
+        self._connection(FakePineconeClient({"ads": "ads.svc.pinecone.io"})).index("ads", 1536)
+        
+        client = FakePineconeClient({"ads": "ads.svc.pinecone.io"})
+        self._connection(client).index("ads", 1536)
+        self.assertEqual(client.list_calls, 0)
+        self.assertEqual(client.opened, ["ads.svc.pinecone.io"])
+        
+        self.clock += 61
+        self._connection(client).index("ads", 1536)
+        self.assertEqual(client.list_calls, 1)
+    
+    def test_missing_index_is_created(self):
+        client = FakePineconeClient()
+        
+        self._connection(client).index("ads", 8)
+        
+        self.assertEqual(client.created, [("ads", 8)])
+        self.assertEqual(client.opened, ["ads.svc.pinecone.io"])
+    
+    def test_not_found_errors_invalidate_cached_state(self):
+        client = FakePineconeClient({"ads": "ads.svc.pinecone.io"})
+        connection = self._connection(client)
+        backend = PineconeBackend("ads", connection=connection)
+        backend.index.query.side_effect = NotFoundException("Index not found")
+        
+        with self.assertRaises(NotFoundException):
+            backend.query([0.1], top_k=1, namespace="default")
+        
+        self.assertIsNone(connection.state.get("key", "ads"))
+        backend.index
+        self.assertEqual(client.list_calls, 2)
+    
+    def test_delete_invalidates_only_on_not_found(self):
+        connection = self._connection(FakePineconeClient({"ads": "ads.svc.pinecone.io"}))
+        backend = PineconeBackend("ads", connection=connection)
+        
+        # A message that merely mentions 404 is not a missing index
+        backend.index.delete.side_effect = RuntimeError("Vector 404 Not Found in batch")
+        with self.assertRaises(RuntimeError):
+            backend.delete(["v1"], namespace="default")
+        self.assertIsNotNone(connection.state.get("key", "ads"))
+        
+        backend.index.delete.side_effect = NotFoundException("Index not found")
+        with self.assertRaises(NotFoundException):
+            backend.delete(["v1"], namespace="default")
+        self.assertIsNone(connection.state.get("key", "ads"))
+    
+    def test_shared_connection_per_api_key(self):
+        self.addCleanup(PineconeConnection.reset)
+        
+        self.assertIs(PineconeConnection.get("a"), PineconeConnection.get("a"))
+        self.assertIsNot(PineconeConnection.get("a"), PineconeConnection.get("b"))
+
+if __name__ == '__main__':
+    unittest.main()
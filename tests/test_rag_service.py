@@ -15,8 +15,8 @@ from src.database.vector_store import VectorStore
 
 class TestRAGService(unittest.TestCase):
     
-    @patch('src.models.openai_service.OpenAIService')
-    @patch('src.database.vector_store.VectorStore')
+    @patch('src.core.rag_service.OpenAIService')
+    @patch('src.core.rag_service.VectorStore')
     def setUp(self, mock_vector_store, mock_openai_service):
         # Set up mocks
         self.mock_openai = mock_openai_service.return_value
@@ -26,6 +26,7 @@ class TestRAGService(unittest.TestCase):
         self.rag_service = RAGService()
         self.rag_service.openai = self.mock_openai
         self.rag_service.vector_store = self.mock_vector_store
+        self.rag_service.response_cache = None
         
         # Set up test data
         self.test_campaign_brief = {
@@ -139,6 +140,33 @@ class TestRAGService(unittest.TestCase):
         self.assertEqual(result["campaign"]["objective"], "OUTCOME_AWARENESS")
         self.mock_vector_store.query.assert_called_once()
         self.mock_openai.get_completion.assert_called_once()
+    
+    def test_generate_campaign_streams_sections(self):
+        self.mock_openai.get_embedding.return_value = [0.1, 0.2, 0.3]
+        self.mock_vector_store.query.return_value = {"matches": []}
+        response = json.dumps(self.mock_campaign_spec)
+        # Stream the completion in small pieces
+        self.mock_openai.stream_completion.return_value = iter(
+            [response[i:i + 7] for i in range(0, len(response), 7)]
+        )
+        
+        sections = []
+        result = self.rag_service.generate_campaign(
+            self.test_campaign_brief, on_section=lambda name, value: sections.append(name)
+        )
+        
+        self.assertEqual(result, self.mock_campaign_spec)
+        self.assertEqual(sections, ["campaign", "ad_set", "ad"])
+        self.mock_openai.get_completion.assert_not_called()
+    
+    def test_query_stream_yields_pieces(self):
+        self.mock_openai.get_embedding.return_value = [0.1, 0.2, 0.3]
+        self.mock_vector_store.query.return_value = {"matches": []}
+        self.mock_openai.stream_completion.return_value = iter(["Use ", "broad ", "targeting."])
+        
+        pieces = list(self.rag_service.query_stream("How should I target?"))
+        
+        self.assertEqual(pieces, ["Use ", "broad ", "targeting."])
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,86 @@
+import unittest
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.models.rate_limiter import RateLimiter, parse_reset_duration
+
+class TestRateLimiter(unittest.TestCase):
+    
+    def setUp(self):
+        self.now = 0.0
+        self.limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, clock=lambda: self.now)
+    
+    def test_admits_within_limits_then_spaces_requests(self):
+        self.assertEqual(self.limiter.reserve(3000), 0.0)
+        self.assertEqual(self.limiter.reserve(3000), 0.0)
+        
+        # Tokens refill at 100/s, so the next 1000 tokens are 10s away
+        self.assertAlmostEqual(self.limiter.reserve(1000), 10.0)
+        # Queued callers wait behind earlier reservations
+        self.assertAlmostEqual(self.limiter.reserve(1000), 20.0)
+    
+    def test_request_bucket_limits_small_calls(self):
+        for _ in range(60):
+            self.assertEqual(self.limiter.reserve(1), 0.0)
+        
+        self.assertAlmostEqual(self.limiter.reserve(1), 1.0)
+    
+    def test_headers_lower_balance_and_adopt_server_limits(self):
+        self.limiter.update_from_headers({
+            "x-ratelimit-limit-tokens": "12000",
+            "x-ratelimit-remaining-tokens": "200",
+            "x-ratelimit-limit-requests": "120",
+            "x-ratelimit-remaining-requests": "119"
+        })
+        
+        self.assertEqual(self.limiter.tokens.capacity, 12000)
+        # 200 tokens left and a refill rate of 200/s
+        self.assertAlmostEqual(self.limiter.reserve(600), 2.0)
+    
+    def test_exhausted_limit_waits_for_reset(self):
+        self.limiter.update_from_headers({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "6s"
+        })
+        
+        self.assertAlmostEqual(self.limiter.reserve(1), 7.0)
+    
+    def test_budget_caps_server_limits(self):
+        limiter = RateLimiter(60, 6000, clock=lambda: self.now, token_budget_per_minute=3000)
+        limiter.update_from_headers({"x-ratelimit-limit-tokens": "12000", "x-ratelimit-remaining-tokens": "12000"})
+        
+        self.assertEqual(limiter.tokens.capacity, 3000)
+        self.assertEqual(limiter.reserve(3000), 0.0)
+        # Refilling at 50/s under the budget, not the server's 200/s
+        self.assertAlmostEqual(limiter.reserve(500), 10.0)
+    
+    def test_acquire_async_waits_for_refill(self):
+        slept = []
+        
+        async def fake_sleep(seconds):
+            slept.append(seconds)
+            self.now += seconds
+        
+        async def spend():
+            await self.limiter.acquire_async(6000)
+            await self.limiter.acquire_async(1000)
+        
+        with patch('src.models.rate_limiter.asyncio.sleep', fake_sleep):
+            asyncio.run(spend())
+        
+        self.assertAlmostEqual(sum(slept), 10.0)
+    
+    def test_parse_reset_duration(self):
+        self.assertEqual(parse_reset_duration("20ms"), 0.02)
+        self.assertEqual(parse_reset_duration("6m0s"), 360.0)
+        self.assertEqual(parse_reset_duration("1.5s"), 1.5)
+        self.assertIsNone(parse_reset_duration(""))
+
+if __name__ == '__main__':
+    unittest.main()
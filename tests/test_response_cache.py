@@ -0,0 +1,135 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.response_cache import ResponseCache, make_key, normalize_brief
+from src.core.rag_service import RAGService
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+class TestResponseCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "responses.sqlite3")
+        self.clock = FakeClock()
+        patcher = patch('src.database.response_cache.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache(self.path, ttl_seconds=60, max_entries=3, memory_entries=2)
+    
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+    
+    def test_normalized_briefs_share_a_key(self):
+        first = normalize_brief({"request_id": "a", "product_name": "  Running   Shoes", "budget": 10})
+        second = normalize_brief({"budget": 10, "product_name": "running shoes", "request_id": "b"})
+        
+        self.assertEqual(make_key(request=first), make_key(request=second))
+        self.assertNotEqual(make_key(request=first), make_key(request=normalize_brief({"budget": 20})))
+    
+    def test_round_trip_returns_independent_copies(self):
+        self.cache.put("key", {"campaign": {"name": "A"}})
+        
+        cached = self.cache.get("key")
+        cached["campaign"]["name"] = "changed"
+        
+        self.assertEqual(self.cache.get("key"), {"campaign": {"name": "A"}})
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+    
+    def test_entries_expire_after_ttl(self):
+        self.cache.put("key", "answer")
+        self.clock.now += 61
+        
+        self.assertIsNone(self.cache.get("key"))
+        reopened = ResponseCache(self.path, ttl_seconds=60)
+        self.assertIsNone(reopened.get("key"))
+        reopened.close()
+    
+    def test_evicts_least_recently_used_rows(self):
+        for i in range(3):
+            self.cache.put(f"key {i}", i)
+            self.clock.now += 1
+        self.cache.get("key 0")
+        self.clock.now += 1
+        self.cache.put("key 3", 3)
+        
+        fresh = ResponseCache(self.path, ttl_seconds=60)
+        self.assertIsNone(fresh.get("key 1"))
+        self.assertEqual(fresh.get("key 0"), 0)
+        self.assertEqual(fresh.get("key 3"), 3)
+        fresh.close()
+    
+    def test_semantic_lookup_respects_threshold_and_scope(self):
+        self.cache.put("key", {"spec": 1}, scope="campaign", embedding=[1.0, 0.0])
+        
+        self.assertEqual(self.cache.get_similar("campaign", [0.99, 0.05], 0.95), {"spec": 1})
+        self.assertIsNone(self.cache.get_similar("campaign", [0.5, 0.5], 0.95))
+        self.assertIsNone(self.cache.get_similar("query", [1.0, 0.0], 0.95))
+        self.assertEqual(self.cache.stats()["semantic_hits"], 1)
+
+class TestRAGServiceResponseCache(unittest.TestCase):
+    
+    @patch('src.core.rag_service.OpenAIService')
+    @patch('src.core.rag_service.VectorStore')
+    def setUp(self, mock_vector_store, mock_openai_service):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rag_service = RAGService()
+        self.rag_service.response_cache = ResponseCache(os.path.join(self.tmp_dir.name, "responses.sqlite3"))
+        self.mock_openai = self.rag_service.openai
+        self.mock_openai.model = "gpt-4o-mini"
+        self.mock_openai.temperature = 0.2
+        self.mock_openai.get_completion.return_value = '{"campaign": {}, "ad_set": {}, "ad": {}}'
+        self.rag_service.retrieve_relevant_context = MagicMock(return_value=[
+            {"id": "chunk-1", "text": "Doc", "metadata": {"source": "a.md"}, "score": 0.9}
+        ])
+        self.rag_service._campaign_messages = MagicMock(return_value=[{"role": "user", "content": "brief"}])
+        self.rag_service._validate_meta_api_structure = MagicMock(return_value=True)
+    
+    def tearDown(self):
+        self.rag_service.response_cache.close()
+        self.tmp_dir.cleanup()
+    
+    def test_repeated_brief_is_served_from_cache(self):
+        first = self.rag_service.generate_campaign({"product_name": "Shoes", "request_id": "1"})
+        second = self.rag_service.generate_campaign({"product_name": "shoes", "request_id": "2"})
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.mock_openai.get_completion.call_count, 1)
+    
+    def test_different_chunks_or_bypass_regenerate(self):
+        self.rag_service.generate_campaign({"product_name": "Shoes"})
+        self.rag_service.generate_campaign({"product_name": "Shoes"}, use_cache=False)
+        self.rag_service.retrieve_relevant_context.return_value = [
+            {"id": "chunk-2", "text": "Other", "metadata": {}, "score": 0.9}
+        ]
+        self.rag_service.generate_campaign({"product_name": "Shoes"})
+        
+        self.assertEqual(self.mock_openai.get_completion.call_count, 3)
+    
+    def test_failed_generations_are_not_cached(self):
+        self.mock_openai.get_completion.side_effect = [RuntimeError("boom"), '{"campaign": {}}']
+        
+        failed = self.rag_service.generate_campaign({"product_name": "Shoes"})
+        succeeded = self.rag_service.generate_campaign({"product_name": "Shoes"})
+        
+        self.assertEqual(failed["status"], "failed")
+        self.assertEqual(succeeded, {"campaign": {}})
+
+if __name__ == '__main__':
+    unittest.main()
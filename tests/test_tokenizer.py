@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.models import tokenizer
+
+class FakeEncoding:
+    """Whitespace tokenizer standing in for a tiktoken encoding."""
+    
+    def __init__(self):
+        self.batch_calls = 0
+    
+    def encode_ordinary(self, text):
+        return text.split()
+    
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        self.batch_calls += 1
+        return [text.split() for text in texts]
+
+class TestTokenizer(unittest.TestCase):
+    
+    def setUp(self):
+        tokenizer.get_encoding.cache_clear()
+        self.encoding = FakeEncoding()
+        patcher = patch('src.models.tokenizer.tiktoken')
+        self.mock_tiktoken = patcher.start()
+        self.mock_tiktoken.encoding_for_model.return_value = self.encoding
+        self.addCleanup(patcher.stop)
+        self.addCleanup(tokenizer.get_encoding.cache_clear)
+    
+    def test_encoder_is_resolved_once_per_model(self):
+        for _ in range(3):
+            self.assertEqual(tokenizer.count_tokens("one two three", "gpt-4o-mini"), 3)
+        tokenizer.count_tokens("one", "text-embedding-ada-002")
+        
+        self.assertEqual(self.mock_tiktoken.encoding_for_model.call_count, 2)
+    
+    def test_unknown_model_falls_back_to_default_encoding(self):
+        self.mock_tiktoken.encoding_for_model.side_effect = KeyError("unknown")
+        self.mock_tiktoken.get_encoding.return_value = self.encoding
+        
+        self.assertEqual(tokenizer.count_tokens("a b", "my-finetune"), 2)
+        self.mock_tiktoken.get_encoding.assert_called_once_with(tokenizer.DEFAULT_ENCODING)
+    
+    def test_batch_counts_use_batch_encoder_for_large_inputs(self):
+        texts = [" ".join(["w"] * i) for i in range(40)]
+        
+        self.assertEqual(tokenizer.count_tokens_batch(texts, "gpt-4o-mini"), list(range(40)))
+        self.assertEqual(tokenizer.count_tokens_batch(texts[:3], "gpt-4o-mini"), [0, 1, 2])
+        self.assertEqual(self.encoding.batch_calls, 1)
+    
+    def test_estimate_is_an_upper_bound_in_bytes(self):
+        self.assertEqual(tokenizer.estimate_tokens("abc"), 3)
+        self.assertEqual(tokenizer.estimate_tokens("é"), 2)
+
+if __name__ == '__main__':
+    unittest.main()
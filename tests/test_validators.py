@@ -0,0 +1,158 @@
+import copy
+import unittest
+import sys
+from pathlib import Path
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.fakes.openai_server import canned_campaign_spec
+from src.utils.validators import CampaignValidator, ValidationIssue, parse_timestamp
+
+class TestCampaignValidator(unittest.TestCase):
+    
+    def setUp(self):
+        self.spec = canned_campaign_spec({"product_name": "Trail shoes", "objective": "OUTCOME_SALES"})
+    
+    def validate(self):
+        return CampaignValidator.validate_campaign_specification(self.spec)
+    
+    def test_valid_spec_has_no_issues(self):
+        is_valid, results = self.validate()
+        
+        self.assertTrue(is_valid)
+        self.assertEqual(results["issues"], [])
+        self.assertEqual(results["issue_codes"], [])
+    
+    def test_reports_codes_with_messages_in_rule_order(self):
+        self.spec["campaign"]["name"] = "x" * 300
+        self.spec["ad_set"]["budget"]["amount"] = 5
+        self.spec["ad"]["creative"]["link"] = "ftp://example.com"
+        
+        is_valid, results = self.validate()
+        
+        self.assertFalse(is_valid)
+        self.assertEqual(
+            results["issue_codes"],
+            ["campaign.name.too_long", "budget.amount.too_low", "creative.link.invalid"]
+        )
+        self.assertEqual(results["issues"], [
+            "Campaign name exceeds maximum length of 255 characters",
+            "Budget amount must be at least 100 cents",
+            "Link URL must start with http:// or https://"
+        ])
+    
+    def test_messages_are_formatted_lazily(self):
+        self.spec["ad_set"]["targeting"]["genders"] = [1, 3]
+        
+        issues = CampaignValidator.check(self.spec)
+        
+        self.assertEqual(issues, [ValidationIssue("targeting.genders.invalid", (3, (1, 2)))])
+        self.assertEqual(str(issues[0]), "Invalid gender value: 3. Must be one of: [1, 2]")
+    
+    def test_missing_fields_skip_the_section_and_its_children(self):
+        del self.spec["ad_set"]["bid_strategy"]
+        self.spec["ad_set"]["budget"]["amount"] = 5
+        
+        issues = CampaignValidator.check(self.spec)
+        
+        self.assertEqual(issues, [ValidationIssue("ad_set.missing_fields", (("ad_set.bid_strategy",),))])
+        self.assertEqual(issues[0].message, "Missing required ad set fields: ad_set.bid_strategy")
+    
+    def test_missing_sections(self):
+        del self.spec["ad"]
+        
+        is_valid, results = self.validate()
+        
+        self.assertFalse(is_valid)
+        self.assertEqual(results["missing_required_sections"], ["ad"])
+        self.assertEqual(results["issue_codes"], ["spec.missing_sections"])
+    
+    def test_goal_mismatch_reported_once(self):
+        self.spec["ad_set"]["optimization_goal"] = "APP_INSTALLS"
+        
+        _, results = self.validate()
+        
+        self.assertEqual(results["issues"], [
+            "Invalid optimization goal 'APP_INSTALLS' for campaign objective 'OUTCOME_SALES'"
+        ])
+    
+    def test_invalid_objective_not_reported_again_on_the_ad_set(self):
+        self.spec["campaign"]["objective"] = "BAD"
+        
+        _, results = self.validate()
+        self.assertEqual(results["issue_codes"], ["campaign.objective.invalid"])
+        
+        # With the campaign incomplete its objective goes unchecked, so the ad set reports it
+        del self.spec["campaign"]["status"]
+        _, results = self.validate()
+        self.assertEqual(
+            results["issue_codes"],
+            ["campaign.missing_fields", "ad_set.optimization_goal.incompatible"]
+        )
+    
+    def test_unhashable_values_are_invalid_not_errors(self):
+        self.spec["campaign"]["status"] = ["ACTIVE"]
+        self.spec["ad"]["creative"]["call_to_action"] = {"type": "SHOP_NOW"}
+        
+        _, results = self.validate()
+        
+        self.assertEqual(
+            results["issue_codes"],
+            ["campaign.status.invalid", "creative.call_to_action.invalid"]
+        )
+    
+    def test_non_dict_section_reports_its_fields_missing(self):
+        self.spec["ad_set"]["budget"] = "100"
+        
+        issues = CampaignValidator.check(self.spec)
+        
+        self.assertEqual([issue.code for issue in issues], ["budget.missing_fields"])
+    
+    def schedule_issues(self, start, end, now="2025-05-01T00:00:00Z"):
+        self.spec["ad_set"]["schedule"] = {"start_time": start, "end_time": end}
+        return CampaignValidator.check(self.spec, parse_timestamp(now))
+    
+    def test_parse_timestamp_handles_offsets(self):
+        self.assertEqual(parse_timestamp("2025-05-12T00:00:00-0700"), parse_timestamp("2025-05-12T07:00:00Z"))
+        self.assertEqual(parse_timestamp("2025-05-12T07:00:00+00:00"), parse_timestamp("2025-05-12T07:00:00"))
+        self.assertEqual(parse_timestamp("2025-05-12"), parse_timestamp("2025-05-12T00:00:00Z"))
+        self.assertIsNone(parse_timestamp("next tuesday"))
+        self.assertIsNone(parse_timestamp(20250512))
+    
+    def test_schedule_compares_instants_not_strings(self):
+        # As strings the start sorts first, but 00:00 at -0700 is 07:00 UTC
+        issues = self.schedule_issues("2025-05-12T00:00:00-0700", "2025-05-12T05:00:00+0000")
+        
+        self.assertEqual(issues, [ValidationIssue("schedule.end_before_start")])
+    
+    def test_schedule_issues(self):
+        self.assertEqual(self.schedule_issues("2025-05-12T00:00:00-0700", "2025-06-11T23:59:59-0700"), [])
+        self.assertEqual(
+            self.schedule_issues("2025-05-12T00:00:00-0700", "2025-05-12T12:00:00-0700"),
+            [ValidationIssue("schedule.flight.too_short", (24,))]
+        )
+        self.assertEqual(
+            self.schedule_issues("2025-04-30T00:00:00Z", "2025-06-01T00:00:00Z"),
+            [ValidationIssue("schedule.start_time.past", ("2025-04-30T00:00:00Z",))]
+        )
+        self.assertEqual(
+            [issue.code for issue in self.schedule_issues("soon", "2025-13-01")],
+            ["schedule.start_time.invalid", "schedule.end_time.invalid"]
+        )
+    
+    def test_recompile_picks_up_changed_constants(self):
+        original = CampaignValidator.VALID_CAMPAIGN_STATUSES
+        self.addCleanup(CampaignValidator.compile)
+        self.addCleanup(setattr, CampaignValidator, "VALID_CAMPAIGN_STATUSES", original)
+        
+        CampaignValidator.VALID_CAMPAIGN_STATUSES = ["ACTIVE"]
+        CampaignValidator.compile()
+        spec = copy.deepcopy(self.spec)
+        spec["campaign"]["status"] = "PAUSED"
+        
+        self.assertEqual([issue.code for issue in CampaignValidator.check(spec)], ["campaign.status.invalid"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import threading
+import sys
+from pathlib import Path
+
+from unittest.mock import patch
+from tenacity import wait_none
+
+# Add the project root to sys.path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.vector_backends import VectorBackend
+from src.database.vector_store import VectorStore, plan_upsert_batches, estimate_payload_bytes
+
+class ApiError(Exception):
+    """SDK-style API error carrying an HTTP status."""
+    
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+class FlakyBackend(VectorBackend):
+    """Records upsert calls and fails the first attempt of chosen batches."""
+    
+    def __init__(self, fail_ids=(), always_fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.always_fail_ids = set(always_fail_ids)
+        self.calls = []
+        self.lock = threading.Lock()
+    
+    def upsert(self, vectors, namespace):
+        ids = {vector["id"] for vector in vectors}
+        with self.lock:
+            self.calls.append(sorted(ids))
+            if ids & self.always_fail_ids:
+                raise ApiError("payload too large", 413)
+            if ids & self.fail_ids:
+                self.fail_ids -= ids
+                raise ApiError("Service Unavailable", 503)
+    
+    def query(self, vector, top_k, namespace, filter=None):
+        return {"matches": []}
+    
+    def delete(self, ids, namespace):
+        pass
+    
+    def delete_all(self, namespace):
+        pass
+
+def make_vectors(count, dimension=8):
+    return [{"id": f"v{i:02d}", "values": [0.1] * dimension, "metadata": {"text": "x"}} for i in range(count)]
+
+class TestVectorStoreUpsert(unittest.TestCase):
+    
+    def _store(self, backend, batch_size=10, max_bytes=10 ** 6):
+        store = VectorStore(backend=backend)
+        store.upsert_batch_size = batch_size
+        store.upsert_max_bytes = max_bytes
+        store.upsert_concurrency = 4
+        store.upsert_wait = wait_none()
+        return store
+    
+    def test_batches_are_bounded_by_count_and_bytes(self):
+        vectors = make_vectors(25)
+        size = estimate_payload_bytes(vectors[0])
+        
+        self.assertEqual([len(b) for b in plan_upsert_batches(vectors, 10, 10 ** 6)], [10, 10, 5])
+        self.assertEqual([len(b) for b in plan_upsert_batches(vectors, 100, size * 7)], [7, 7, 7, 4])
+    
+    def test_upsert_reports_every_id(self):
+        backend = FlakyBackend()
+        report = self._store(backend).upsert(make_vectors(25))
+        
+        self.assertTrue(report)
+        self.assertEqual(sorted(report.upserted), sorted(f"v{i:02d}" for i in range(25)))
+        self.assertEqual(report.batches, 3)
+        self.assertEqual(len(backend.calls), 3)
+    
+    def test_only_failed_batches_are_retried(self):
+        backend = FlakyBackend(fail_ids={"v12"})
+        report = self._store(backend).upsert(make_vectors(25))
+        
+        self.assertTrue(report)
+        self.assertEqual(report.retries, 1)
+        self.assertEqual(len(backend.calls), 4)
+        self.assertEqual(sum("v12" in call for call in backend.calls), 2)
+    
+    def test_persistent_failure_is_reported_per_id(self):
+        backend = FlakyBackend(always_fail_ids={"v03"})
+        report = self._store(backend).upsert(make_vectors(25))
+        
+        self.assertFalse(report)
+        self.assertEqual(sorted(report.failed), sorted(f"v{i:02d}" for i in range(10)))
+        self.assertEqual(len(report.upserted), 15)
+        self.assertIn("payload too large", report.failed["v03"])
+        # Request errors are not retried
+        self.assertEqual(sum("v03" in call for call in backend.calls), 1)
+        self.assertEqual(report.retries, 0)
+    
+    def test_transient_errors(self):
+        backend = FlakyBackend()
+        
+        self.assertTrue(backend.is_transient_error(ConnectionResetError()))
+        self.assertTrue(backend.is_transient_error(ApiError("Too Many Requests", 429)))
+        self.assertTrue(backend.is_transient_error(ApiError("Bad Gateway", 502)))
+        self.assertFalse(backend.is_transient_error(ApiError("Bad Request", 400)))
+        self.assertFalse(backend.is_transient_error(ValueError("Vector dimension 8 does not match 1536")))
+
+class TestVectorStoreBackend(unittest.TestCase):
+    
+    @patch('src.database.vector_store.create_backend')
+    def test_backend_is_created_on_first_use(self, mock_create_backend):
+        mock_create_backend.return_value = FlakyBackend()
+        store = VectorStore()
+        
+        mock_create_backend.assert_not_called()
+        store.query([0.1], top_k=1)
+        store.query([0.1], top_k=1)
+        
+        mock_create_backend.assert_called_once()
+        self.assertIs(store.backend, mock_create_backend.return_value)
+
+if __name__ == '__main__':
+    unittest.main()